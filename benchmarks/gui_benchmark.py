@@ -0,0 +1,333 @@
+"""
+Benchmarks rendering of the history and stats panels
+on Qt's offscreen platform, so no display is needed
+
+For every history size ApplicationWindow is built against a database
+seeded by the storage benchmark, then history refresh, activity list refresh,
+activity selector refresh and the "Show more" path are timed together
+with the event processing and repaint they trigger
+Opening the statistics window is timed both with computed
+and with cached statistics
+Every size runs in a separate process, so that its peak memory
+isn't affected by the other sizes
+
+Usage:
+    python -m benchmarks.gui_benchmark
+    python -m benchmarks.gui_benchmark --sizes 1000 --output results.json
+    python -m benchmarks.gui_benchmark --baseline results.json
+Exits with code 1 if any benchmark is slower than the baseline
+by more than the allowed threshold
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from time import perf_counter
+
+# Must be set before the QApplication is created
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+from PyQt6.QtWidgets import QApplication
+
+from src.controllers.statistics_controller import StatisticsController
+from src.controllers.time_tracking_controller import TimeTrackingController
+from src.controllers.user_stats_controller import UserStatsController
+from src.models.database import Database
+from src.models.statistics_model import StatisticsModel
+from src.models.time_tracking_model import TimeTrackingModel
+from src.models.user_model import UserModel
+from src.models.user_stats_model import UserStatsModel
+from src.utils.constants import TIME_FORMAT
+from src.utils.process_stats import get_peak_rss_mb, get_rss_mb
+from src.views.main_window import ApplicationWindow
+
+from .storage_benchmark import (
+    DEFAULT_SEED,
+    DEFAULT_THRESHOLD_PERCENT,
+    compare_with_baseline,
+    generate_dataset,
+    time_calls,
+)
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000)
+DEFAULT_REPEAT = 20
+DEFAULT_ACTIVITIES = 50
+DEFAULT_OUTPUT = "gui_benchmark.json"
+# How many times "Show more" is clicked after a history refresh
+SHOW_MORE_PAGES = 20
+WINDOW_SIZE = (1000, 700)
+
+
+def add_activities(database: Database, activities_count: int) -> None:
+    """Adds activities until the user has activities_count of them"""
+    user_id = database.initialize_default_user()
+    existing_count = len(database.get_user_activities(user_id) or [])
+
+    conn = database.connection_manager.get_connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO activities (user_id, name) VALUES (?, ?);",
+            [
+                (user_id, f"Activity {number}")
+                for number in range(existing_count, activities_count)
+            ],
+        )
+
+
+def build_application_window(database: Database) -> tuple:
+    """
+    Builds the main window the same way main.py does,
+    without the database worker so that every operation
+    finishes before its timing stops
+    """
+    user_model = UserModel(database)
+    time_tracking_model = TimeTrackingModel(database, user_model, xp_seed=DEFAULT_SEED)
+    user_stats_model = UserStatsModel(database, user_model)
+    statistics_model = StatisticsModel(database, user_model)
+
+    app_window = ApplicationWindow()
+    time_tracking_controller = TimeTrackingController(app_window, time_tracking_model)
+    user_stats_controller = UserStatsController(app_window, user_stats_model)
+    statistics_controller = StatisticsController(app_window, statistics_model)
+
+    app_window.register_controllers(
+        time_tracking_controller, user_stats_controller, statistics_controller
+    )
+    app_window.initUI()
+    app_window.resize(*WINDOW_SIZE)
+    app_window.show()
+
+    user_stats_controller.load_initial_data()
+    time_tracking_controller.load_initial_data()
+
+    return app_window, time_tracking_controller
+
+
+def benchmark_size(entries_count: int, activities_count: int, repeat: int) -> dict:
+    """
+    Returns timings of a single history size
+    together with its widget count and memory usage
+    """
+    app = QApplication.instance() or QApplication([])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, f"synthetic_{entries_count}.db")
+        generate_dataset(db_path, entries_count, DEFAULT_SEED)
+
+        database = Database(db_path)
+        try:
+            add_activities(database, activities_count)
+
+            start = perf_counter()
+            app_window, time_tracking_controller = build_application_window(database)
+            app.processEvents()
+            window_build_ms = (perf_counter() - start) * 1000
+
+            def rendered(function):
+                """Includes the layout and painting caused by the operation"""
+
+                def run(iteration):
+                    function()
+                    app.processEvents()
+                    app_window.repaint()
+
+                return run
+
+            def refresh_and_show_more(iteration):
+                time_tracking_controller.refresh_time_entries_history()
+                for _ in range(SHOW_MORE_PAGES):
+                    time_tracking_controller.load_more_time_entries()
+                app.processEvents()
+                app_window.repaint()
+
+            statistics_controller = app_window.statistics_controller
+
+            def show_computed_statistics(iteration):
+                # Forgetting the cache key makes the model compute them again
+                statistics_controller.model.cached_statistics_key = None
+                statistics_controller.show_statistics()
+                app.processEvents()
+                statistics_controller.view.repaint()
+
+            def show_cached_statistics(iteration):
+                statistics_controller.show_statistics()
+                app.processEvents()
+                statistics_controller.view.repaint()
+
+            cases = [
+                (
+                    "refresh_time_entries_history",
+                    rendered(time_tracking_controller.refresh_time_entries_history),
+                ),
+                (
+                    "refresh_activity_list",
+                    rendered(app_window.user_stats_panel.refresh_activity_list),
+                ),
+                (
+                    "refresh_activity_selector",
+                    rendered(time_tracking_controller.refresh_activity_selector),
+                ),
+                (f"show_more_x{SHOW_MORE_PAGES}", refresh_and_show_more),
+                ("show_statistics[computed]", show_computed_statistics),
+                ("show_statistics[cached]", show_cached_statistics),
+            ]
+
+            timings = {}
+            for name, function in cases:
+                timings[name] = time_calls(function, repeat)
+
+            history_model = app_window.time_tracking_panel.history_model
+            resources = {
+                "window_build_ms": window_build_ms,
+                "history_rows": history_model.rowCount(),
+                "widget_count": len(QApplication.allWidgets()),
+                "rss_mb": get_rss_mb(),
+                "peak_rss_mb": get_peak_rss_mb(),
+            }
+
+            app_window.close()
+        finally:
+            database.close()
+
+    return {"timings": timings, "resources": resources}
+
+
+def run_size_in_subprocess(
+    entries_count: int, activities_count: int, repeat: int
+) -> dict:
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.gui_benchmark",
+            "--single-size",
+            str(entries_count),
+            "--activities",
+            str(activities_count),
+            "--repeat",
+            str(repeat),
+        ],
+        stdout=subprocess.PIPE,
+        check=True,
+        text=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def run_benchmarks(sizes, activities_count: int, repeat: int) -> dict:
+    results = {
+        "metadata": {
+            "created_at": datetime.now().strftime(TIME_FORMAT),
+            "python_version": platform.python_version(),
+            "qt_version": QT_VERSION_STR,
+            "pyqt_version": PYQT_VERSION_STR,
+            "platform": platform.platform(),
+            "qpa_platform": os.environ["QT_QPA_PLATFORM"],
+            "activities": activities_count,
+            "repeat": repeat,
+            "seed": DEFAULT_SEED,
+        },
+        "results": {},
+        "resources": {},
+    }
+
+    for entries_count in sizes:
+        print(f"Benchmarking {entries_count} history entries..", file=sys.stderr)
+        size_results = run_size_in_subprocess(entries_count, activities_count, repeat)
+
+        for name, stats in size_results["timings"].items():
+            print(
+                f"{entries_count:>9} {name:<55} {stats['median_ms']:>9.3f} ms",
+                file=sys.stderr,
+            )
+
+        resources = size_results["resources"]
+        print(
+            f"{entries_count:>9} widgets: {resources['widget_count']},"
+            f" peak RSS: {resources['peak_rss_mb']} MB",
+            file=sys.stderr,
+        )
+        results["results"][str(entries_count)] = size_results["timings"]
+        results["resources"][str(entries_count)] = resources
+
+    return results
+
+
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the history and stats panels on the offscreen platform"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="numbers of history entries of generated databases",
+    )
+    parser.add_argument(
+        "--activities",
+        type=int,
+        default=DEFAULT_ACTIVITIES,
+        help="number of activities of the user",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="how many times every operation is timed",
+    )
+    parser.add_argument(
+        "--output", default=DEFAULT_OUTPUT, help="file the JSON results are written to"
+    )
+    parser.add_argument(
+        "--baseline", help="JSON results of a previous run to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD_PERCENT,
+        help="allowed slowdown of the median against the baseline in percent",
+    )
+    # Used internally to benchmark one size per process
+    parser.add_argument("--single-size", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None) -> int:
+    args = parse_arguments(arguments)
+
+    if args.single_size is not None:
+        results = benchmark_size(args.single_size, args.activities, args.repeat)
+        print(json.dumps(results))
+        return 0
+
+    results = run_benchmarks(args.sizes, args.activities, args.repeat)
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+
+    if not regressions:
+        print("No regressions found")
+        return 0
+
+    print(f"Found {len(regressions)} regression(s)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
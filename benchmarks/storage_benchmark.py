@@ -0,0 +1,461 @@
+"""
+Benchmarks the storage layer against synthetic databases
+
+For every dataset size a database with that many time entries
+and XP transactions is generated from a fixed seed, then every public
+Database method and the model operations built on them are timed
+
+Usage:
+    python -m benchmarks.storage_benchmark
+    python -m benchmarks.storage_benchmark --sizes 10000 --output results.json
+    python -m benchmarks.storage_benchmark --baseline results.json
+Exits with code 1 if any benchmark is slower than the baseline
+by more than the allowed threshold
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from src.models.database import Database
+from src.models.records import TimeEntryRecord
+from src.models.time_tracking_model import TimeTrackingModel
+from src.models.user_model import UserModel
+from src.models.xp_engine import XpEngine
+from src.utils.constants import MOB_XP_RATES, TIME_FORMAT
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_REPEAT = 50
+DEFAULT_SEED = 42
+DEFAULT_OUTPUT = "storage_benchmark.json"
+# Median slower than the baseline by more than this is a regression
+DEFAULT_THRESHOLD_PERCENT = 20.0
+# Slowdowns smaller than this are timer noise of sub-millisecond operations
+MIN_REGRESSION_MS = 0.05
+
+ACTIVITY_NAMES = ("Programming", "Reading", "Exercise", "Music", "Writing")
+# Synthetic entries start at 2024-01-01 00:00 UTC, one every GAP_SECONDS
+FIRST_START_TIMESTAMP = 1704067200
+GAP_SECONDS = 30 * 60
+MAX_DURATION_SECONDS = 25 * 60
+# Rows are inserted in chunks to keep memory usage flat on large datasets
+INSERT_CHUNK_SIZE = 50_000
+HISTORY_PAGE_SIZE = 10
+# Entries inserted by every call of the import benchmark
+IMPORT_BATCH_SIZE = 10_000
+
+
+def generate_dataset(db_path: str, entries_count: int, seed: int) -> None:
+    """
+    Creates a database with entries_count finished time entries,
+    one XP transaction per entry and user stats matching them
+    The same seed always produces the same database
+    """
+    rng = random.Random(seed)
+    xp_engine = XpEngine(seed)
+    xp_rate = MOB_XP_RATES["Chicken"]
+
+    database = Database(db_path)
+    try:
+        user_id = database.initialize_default_user()
+        activity_ids = [
+            database.add_new_activity(activity_name, user_id)
+            for activity_name in ACTIVITY_NAMES
+        ]
+
+        conn = database.connection_manager.get_connection()
+        total_xp = 0
+
+        for chunk_start in range(0, entries_count, INSERT_CHUNK_SIZE):
+            chunk_ids = range(
+                chunk_start + 1, min(chunk_start + INSERT_CHUNK_SIZE, entries_count) + 1
+            )
+            durations = [rng.randint(1, MAX_DURATION_SECONDS) for _ in chunk_ids]
+            xp_amounts = xp_engine.batch_session_xp(
+                durations, [xp_rate] * len(durations)
+            )
+            total_xp += sum(xp_amounts)
+
+            time_entries = []
+            for entry_id, duration in zip(chunk_ids, durations):
+                start_timestamp = FIRST_START_TIMESTAMP + entry_id * GAP_SECONDS
+                end_timestamp = start_timestamp + duration
+                start_datetime = datetime.fromtimestamp(start_timestamp)
+
+                time_entries.append(
+                    (
+                        entry_id,
+                        user_id,
+                        rng.choice(activity_ids),
+                        start_datetime.strftime(TIME_FORMAT),
+                        # Same H:MM:SS format as durations of tracked entries
+                        str(timedelta(seconds=duration)),
+                        duration,
+                        datetime.fromtimestamp(end_timestamp).strftime(TIME_FORMAT),
+                        start_timestamp,
+                        end_timestamp,
+                        Database.get_day_key(start_datetime),
+                    )
+                )
+
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT INTO time_entries
+                    (id, user_id, activity_id, start_time, duration,
+                    duration_seconds, end_time, start_timestamp,
+                    end_timestamp, day_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);""",
+                    time_entries,
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO xp_transactions
+                    (user_id, xp_amount, source_type, source_id)
+                    VALUES (?, ?, 'time_session', ?);""",
+                    [
+                        (user_id, xp_amount, entry_id)
+                        for entry_id, xp_amount in zip(chunk_ids, xp_amounts)
+                    ],
+                )
+
+        database.set_user_xp(total_xp, user_id)
+        database.set_user_level(UserModel.evaluate_level(total_xp), user_id)
+
+        # Give the query planner statistics of the generated tables
+        conn.execute("ANALYZE;")
+    finally:
+        database.close()
+
+
+def time_calls(function, repeat: int) -> dict:
+    """
+    Calls function(iteration) repeat times
+    Returns statistics of the call durations in milliseconds
+    """
+    durations_ms = []
+
+    for iteration in range(repeat):
+        start = perf_counter()
+        function(iteration)
+        durations_ms.append((perf_counter() - start) * 1000)
+
+    return {
+        "repeat": repeat,
+        "min_ms": min(durations_ms),
+        "median_ms": statistics.median(durations_ms),
+        "mean_ms": statistics.fmean(durations_ms),
+        "max_ms": max(durations_ms),
+    }
+
+
+def get_benchmark_cases(database: Database, entries_count: int, repeat: int) -> list:
+    """
+    Returns (name, function) tuples of every benchmarked operation
+    Read-only operations come first, so that every read
+    runs against the untouched generated dataset
+    """
+    user_model = UserModel(database)
+    time_tracking_model = TimeTrackingModel(database, user_model, xp_seed=DEFAULT_SEED)
+    user_id = user_model.current_user_id
+
+    # Cursor of a page in the middle of the history,
+    # generated entries start GAP_SECONDS apart in order of their IDs
+    middle_entry_id = entries_count // 2
+    middle_entry = TimeEntryRecord(
+        middle_entry_id,
+        None,
+        None,
+        FIRST_START_TIMESTAMP + middle_entry_id * GAP_SECONDS,
+        None,
+    )
+    # The oldest entries are deleted, a separate range per delete benchmark
+    database_delete_ids = range(1, repeat + 1)
+    model_delete_ids = range(repeat + 1, 2 * repeat + 1)
+
+    # The first activity added by generate_dataset
+    activity_id = database.get_user_activities(user_id)[-1].id
+
+    def start_and_stop_time_entry(iteration):
+        entry_id = database.start_time_entry(activity_id, 1704103200, user_id)
+        database.stop_time_entry(entry_id, 1704103200, 1704103260, 60, "0:01:00")
+
+    def start_and_finish_time_session(iteration):
+        entry_id = database.start_time_entry(activity_id, 1704103200, user_id)
+        database.finish_time_session(
+            entry_id, 1704103200, 1704103260, 60, "0:01:00", 5, user_id
+        )
+
+    # Entry of a running timer, checkpointed by its benchmark
+    open_entry_id = database.start_time_entry(activity_id, 1704103200, user_id)
+
+    # Imported entries follow the generated ones,
+    # every call imports the same batch again
+    import_start_timestamp = FIRST_START_TIMESTAMP + (entries_count + 1) * GAP_SECONDS
+    import_entries = [
+        (activity_id, start_timestamp, start_timestamp + 60, 60, "0:01:00", 5)
+        for start_timestamp in range(
+            import_start_timestamp,
+            import_start_timestamp + IMPORT_BATCH_SIZE * GAP_SECONDS,
+            GAP_SECONDS,
+        )
+    ]
+
+    def add_and_delete_activity(iteration):
+        new_activity_id = database.add_new_activity("Benchmark", user_id)
+        database.delete_user_activity(new_activity_id, user_id)
+
+    return [
+        # Startup of an existing database
+        ("Database.create_tables", lambda i: database.create_tables()),
+        ("Database.apply_migrations", lambda i: database.apply_migrations()),
+        (
+            "Database.initialize_default_user",
+            lambda i: database.initialize_default_user(),
+        ),
+        # Reads
+        ("Database.get_generation", lambda i: database.get_generation()),
+        ("Database.get_user_level", lambda i: database.get_user_level(user_id)),
+        ("Database.get_user_xp", lambda i: database.get_user_xp(user_id)),
+        ("Database.get_user_total_xp", lambda i: database.get_user_total_xp(user_id)),
+        (
+            "Database.get_user_total_time_spent",
+            lambda i: database.get_user_total_time_spent(user_id),
+        ),
+        (
+            "Database.count_user_history_entries",
+            lambda i: database.count_user_history_entries(user_id),
+        ),
+        (
+            "Database.get_history_time_entries[first_page]",
+            lambda i: database.get_history_time_entries(HISTORY_PAGE_SIZE, user_id),
+        ),
+        (
+            "Database.get_history_time_entries[middle_page]",
+            lambda i: database.get_history_time_entries(
+                HISTORY_PAGE_SIZE, user_id, middle_entry
+            ),
+        ),
+        (
+            "Database.get_user_activities",
+            lambda i: database.get_user_activities(user_id),
+        ),
+        (
+            "Database.get_activity_day_totals",
+            lambda i: database.get_activity_day_totals(user_id),
+        ),
+        (
+            "Database.get_activity_totals",
+            lambda i: database.get_activity_totals(user_id),
+        ),
+        ("Database.get_daily_totals", lambda i: database.get_daily_totals(user_id)),
+        (
+            "Database.get_open_time_entries",
+            lambda i: database.get_open_time_entries(user_id),
+        ),
+        (
+            "Database.iter_finished_time_entries[full_history]",
+            lambda i: sum(1 for _ in database.iter_finished_time_entries(user_id)),
+        ),
+        (
+            "TimeTrackingModel.count_history_time_entries",
+            lambda i: time_tracking_model.count_history_time_entries(),
+        ),
+        (
+            "TimeTrackingModel.get_history_time_entries",
+            lambda i: time_tracking_model.get_history_time_entries(HISTORY_PAGE_SIZE),
+        ),
+        ("UserModel.reconcile_user_stats", lambda i: user_model.reconcile_user_stats()),
+        # Writes
+        ("Database.set_user_level", lambda i: database.set_user_level(0, user_id)),
+        ("Database.set_user_xp", lambda i: database.set_user_xp(0, user_id)),
+        (
+            "Database.insert_into_xp_transactions",
+            lambda i: database.insert_into_xp_transactions(
+                0, "benchmark", i + 1, user_id
+            ),
+        ),
+        ("Database.start_time_entry+stop_time_entry", start_and_stop_time_entry),
+        (
+            "Database.start_time_entry+finish_time_session",
+            start_and_finish_time_session,
+        ),
+        (
+            "Database.checkpoint_time_entry",
+            lambda i: database.checkpoint_time_entry(
+                open_entry_id, 1704103200 + (i + 1) * 60, (i + 1) * 60, 2 * (i + 1)
+            ),
+        ),
+        ("Database.add_new_activity+delete_user_activity", add_and_delete_activity),
+        (
+            "Database.delete_time_entry",
+            lambda i: database.delete_time_entry(database_delete_ids[i], user_id),
+        ),
+        (
+            "TimeTrackingModel.delete_history_time_entry",
+            lambda i: time_tracking_model.delete_history_time_entry(
+                model_delete_ids[i]
+            ),
+        ),
+        # Imports grow the tables the most, so they run last
+        (
+            f"Database.import_time_entries[{IMPORT_BATCH_SIZE}]",
+            lambda i: database.import_time_entries(import_entries, user_id),
+        ),
+    ]
+
+
+def run_benchmarks(sizes, repeat: int, seed: int) -> dict:
+    results = {
+        "metadata": {
+            "created_at": datetime.now().strftime(TIME_FORMAT),
+            "python_version": platform.python_version(),
+            "sqlite_version": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for entries_count in sizes:
+            db_path = os.path.join(temp_dir, f"synthetic_{entries_count}.db")
+
+            print(f"Generating {entries_count} time entries..", file=sys.stderr)
+            start = perf_counter()
+            generate_dataset(db_path, entries_count, seed)
+            print(f"Generated in {perf_counter() - start:.1f} s", file=sys.stderr)
+
+            database = Database(db_path)
+            try:
+                size_results = {}
+                for name, function in get_benchmark_cases(
+                    database, entries_count, repeat
+                ):
+                    size_results[name] = time_calls(function, repeat)
+                    print(
+                        f"{entries_count:>9} {name:<55}"
+                        f" {size_results[name]['median_ms']:>9.3f} ms",
+                        file=sys.stderr,
+                    )
+            finally:
+                database.close()
+
+            results["results"][str(entries_count)] = size_results
+
+    return results
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold_percent: float):
+    """
+    Prints median of every benchmark next to its baseline
+    Returns a list of (size, name, baseline ms, current ms) of regressions
+    """
+    regressions = []
+
+    for size, size_results in results["results"].items():
+        baseline_results = baseline["results"].get(size, {})
+
+        for name, stats in size_results.items():
+            baseline_stats = baseline_results.get(name)
+
+            if baseline_stats is None:
+                print(f"{size:>9} {name:<55} {'new':>9}")
+                continue
+
+            baseline_ms = baseline_stats["median_ms"]
+            current_ms = stats["median_ms"]
+            change_percent = (
+                (current_ms - baseline_ms) / baseline_ms * 100 if baseline_ms else 0.0
+            )
+            is_regression = (
+                change_percent > threshold_percent
+                and current_ms - baseline_ms > MIN_REGRESSION_MS
+            )
+
+            print(
+                f"{size:>9} {name:<55} {baseline_ms:>9.3f} -> {current_ms:>9.3f} ms"
+                f" ({change_percent:+.1f}%){' REGRESSION' if is_regression else ''}"
+            )
+
+            if is_regression:
+                regressions.append((size, name, baseline_ms, current_ms))
+
+    return regressions
+
+
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the storage layer against synthetic databases"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="numbers of time entries of generated databases",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="how many times every operation is timed",
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument(
+        "--output", default=DEFAULT_OUTPUT, help="file the JSON results are written to"
+    )
+    parser.add_argument(
+        "--baseline", help="JSON results of a previous run to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD_PERCENT,
+        help="allowed slowdown of the median against the baseline in percent",
+    )
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None) -> int:
+    args = parse_arguments(arguments)
+
+    for entries_count in args.sizes:
+        # Every delete benchmark needs its own range of existing entries
+        if entries_count < 2 * args.repeat:
+            print(f"Dataset size must be at least {2 * args.repeat}")
+            return 1
+
+    results = run_benchmarks(args.sizes, args.repeat, args.seed)
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+
+    if not regressions:
+        print("No regressions found")
+        return 0
+
+    print(f"Found {len(regressions)} regression(s)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
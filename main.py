@@ -1,62 +1,201 @@
+from time import perf_counter
+
+# Taken before the other imports, so that they are included in the startup time
+STARTUP_START_TIME = perf_counter()
+
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
 
 from src.views.main_window import ApplicationWindow
 from src.models.database import Database
+from src.models.database_worker import DatabaseWorker
+from src.models.startup_snapshot import StartupSnapshot
+from src.models.statistics_model import StatisticsModel
 from src.models.user_model import UserModel
 from src.models.time_tracking_model import TimeTrackingModel
 from src.models.user_stats_model import UserStatsModel
 from src.controllers.time_tracking_controller import TimeTrackingController
 from src.controllers.user_stats_controller import UserStatsController
-from src.views.debug_window import DebugWindow
-from src.utils.constants import DEBUG_MODE
+from src.controllers.statistics_controller import StatisticsController
+from src.utils.constants import DEBUG_MODE, METRICS_FILE_NAME, SNAPSHOT_FILE_NAME
+from src.utils.instrumentation import metrics
+from src.utils.startup_timer import StartupTimer
 
 
-def initialize_models(database: Database) -> tuple:
-    user_model = UserModel(database)
-    time_tracking_model = TimeTrackingModel(database, user_model)
+def initialize_models(
+    database: Database,
+    database_worker: DatabaseWorker,
+    snapshot: StartupSnapshot = None,
+) -> tuple:
+    user_model = UserModel(database, database_worker, snapshot)
+    time_tracking_model = TimeTrackingModel(database, user_model, database_worker)
     user_stats_model = UserStatsModel(database, user_model)
-    return time_tracking_model, user_stats_model
+    statistics_model = StatisticsModel(database, user_model, database_worker)
+    return time_tracking_model, user_stats_model, statistics_model
 
 
 def initialize_controllers(
     app_window: ApplicationWindow,
     time_tracking_model: TimeTrackingModel,
     user_stats_model: UserStatsModel,
+    statistics_model: StatisticsModel,
 ) -> tuple:
     time_tracking_controller = TimeTrackingController(app_window, time_tracking_model)
     user_stats_controller = UserStatsController(app_window, user_stats_model)
-    return time_tracking_controller, user_stats_controller
-
+    statistics_controller = StatisticsController(app_window, statistics_model)
+    return time_tracking_controller, user_stats_controller, statistics_controller
+
+
+def load_initial_data(
+    time_tracking_controller: TimeTrackingController,
+    user_stats_controller: UserStatsController,
+    startup_timer: StartupTimer,
+) -> None:
+    """
+    Fills the already shown window with user's data,
+    then offers to recover time entries left open by a previous run
+    """
+    user_stats_controller.load_initial_data()
+    time_tracking_controller.load_initial_data()
+
+    startup_timer.mark("initial_data")
+    startup_timer.report()
+
+    time_tracking_controller.recover_open_time_entries()
+
+
+def reconcile_snapshot(
+    snapshot: StartupSnapshot,
+    generation: int,
+    time_tracking_controller: TimeTrackingController,
+    user_stats_controller: UserStatsController,
+    startup_timer: StartupTimer,
+) -> None:
+    """
+    Reloads user's data from the database
+    if it has changed since the displayed snapshot was written
+    """
+    if snapshot.is_current(generation):
+        startup_timer.mark("snapshot_check")
+        startup_timer.report()
+        # Quitting while tracking leaves an open entry in a current snapshot
+        time_tracking_controller.recover_open_time_entries()
+        return
+
+    user_model = time_tracking_controller.model.user_model
+    user_model.clear_activities_cache()
+    user_model.initialize_user()
+    user_stats_controller.refresh_user_statistics()
+
+    load_initial_data(time_tracking_controller, user_stats_controller, startup_timer)
+
+
+def save_startup_snapshot(database: Database, user_model: UserModel) -> None:
+    """Writes user's data for the next startup, called after the last write"""
+    snapshot = StartupSnapshot.capture(database, user_model.current_user_id)
+
+    if snapshot is not None:
+        snapshot.save(SNAPSHOT_FILE_NAME)
+
+
+def run_debug_window(time_tracking_model, app_window):
+    # Only imported in debug mode
+    from src.views.debug_window import DebugWindow
 
-def run_debug_window(time_tracking_model):
     debug_window = DebugWindow()
     debug_window.initialize_model_access(time_tracking_model)
+    debug_window.initialize_window_access(app_window)
     debug_window.initUI()
     debug_window.show()
+    return debug_window
 
 
 def main():
+    startup_timer = StartupTimer(STARTUP_START_TIME)
+    startup_timer.mark("imports")
+
     # Initialize application and database
     app = QApplication([])
+    startup_timer.mark("qapplication")
+
     database = Database()
+    database_worker = DatabaseWorker()
+    # Last known data is displayed right away if there is a snapshot
+    snapshot = StartupSnapshot.load(SNAPSHOT_FILE_NAME, database)
+    startup_timer.mark("database")
 
     # Create main window
     app_window = ApplicationWindow()
 
     # Initialize models and controllers
-    time_tracking_model, user_stats_model = initialize_models(database)
-    time_tracking_controller, user_stats_controller = initialize_controllers(
-        app_window, time_tracking_model, user_stats_model
+    time_tracking_model, user_stats_model, statistics_model = initialize_models(
+        database, database_worker, snapshot
+    )
+    time_tracking_controller, user_stats_controller, statistics_controller = (
+        initialize_controllers(
+            app_window, time_tracking_model, user_stats_model, statistics_model
+        )
     )
 
+    # Checkpoint the running timer, so it can be recovered on the next start,
+    # finish queued writes, save the snapshot of the written data,
+    # then close long-lived database connections on shutdown
+    app.aboutToQuit.connect(time_tracking_model.checkpoint_time_tracking)
+    app.aboutToQuit.connect(database_worker.shutdown)
+    app.aboutToQuit.connect(
+        lambda: save_startup_snapshot(database, time_tracking_model.user_model)
+    )
+    app.aboutToQuit.connect(database.close)
+
+    if metrics.enabled:
+        # Save collected hot path metrics for later analysis
+        app.aboutToQuit.connect(lambda: metrics.dump_json(METRICS_FILE_NAME))
+
+    startup_timer.mark("models")
+
     # Setup main window
-    app_window.register_controllers(time_tracking_controller, user_stats_controller)
+    app_window.register_controllers(
+        time_tracking_controller, user_stats_controller, statistics_controller
+    )
     app_window.initUI()
 
+    app_window.first_painted.connect(lambda: startup_timer.mark("first_paint"))
+
+    if snapshot is None:
+        # Show the empty window shell first,
+        # data is loaded by the event loop right after the first paint
+        app_window.first_painted.connect(
+            lambda: QTimer.singleShot(
+                0,
+                lambda: load_initial_data(
+                    time_tracking_controller, user_stats_controller, startup_timer
+                ),
+            )
+        )
+    else:
+        # Snapshot is displayed with the first paint,
+        # then checked against the database in the background
+        user_stats_controller.load_initial_data()
+        time_tracking_controller.load_initial_data(snapshot)
+        app_window.first_painted.connect(
+            lambda: database_worker.submit(
+                database.get_generation,
+                callback=lambda generation: reconcile_snapshot(
+                    snapshot,
+                    generation,
+                    time_tracking_controller,
+                    user_stats_controller,
+                    startup_timer,
+                ),
+            )
+        )
+
     app_window.show()
+    startup_timer.mark("window_shell")
 
     if DEBUG_MODE:
-        run_debug_window(time_tracking_model)
+        # Keep a reference so the window isn't garbage collected
+        debug_window = run_debug_window(time_tracking_model, app_window)
 
     app.exec()
 
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from ..utils.instrumentation import instrumented
+
+# How dates are displayed in the statistics window
+STATISTICS_DATE_FORMAT = "%d %b %Y"
+
+
+class StatisticsController:
+    """
+    Opens the statistics window and fills it with user's statistics
+    The window is only created once it is opened for the first time
+    """
+
+    def __init__(self, app_window, statistics_model):
+        self.app_window = app_window
+        self.model = statistics_model
+        self.view = None
+        # Cached statistics are the same object, so they aren't displayed twice
+        self.displayed_statistics = None
+
+        # Number of requested statistics that haven't been displayed yet
+        self.pending_loads_count = 0
+
+    # Public interface methods
+
+    def show_statistics(self) -> None:
+        """Brings the statistics window to front and refreshes it"""
+        if self.view is None:
+            self.view = self.app_window.create_statistics_window()
+
+        self.view.show()
+        self.view.raise_()
+        self.view.activateWindow()
+
+        self.refresh_statistics()
+
+    @instrumented()
+    def refresh_statistics(self) -> None:
+        """
+        Reloads statistics if the window is open
+        Statistics are computed in the background,
+        cached ones are displayed right away if nothing has changed
+        """
+        if self.view is None or not self.view.isVisible():
+            return
+
+        self.pending_loads_count += 1
+        self.view.display_loading(True)
+        self.model.load_statistics(self._on_statistics_loaded)
+
+    # Private helper methods
+
+    @instrumented()
+    def _on_statistics_loaded(self, statistics) -> None:
+        self.pending_loads_count -= 1
+
+        if self.pending_loads_count == 0:
+            self.view.display_loading(False)
+
+        if statistics is None:
+            self.view.display_error("Failed to load statistics")
+            return
+
+        if statistics is self.displayed_statistics:
+            return
+
+        self.displayed_statistics = statistics
+
+        self.view.display_summary(
+            self._format_hours(statistics.total_seconds),
+            statistics.total_sessions,
+            statistics.total_xp,
+            statistics.current_streak,
+            statistics.longest_streak,
+        )
+        self.view.display_activity_totals(
+            [
+                (
+                    activity.activity_name,
+                    self._format_hours(activity.total_seconds),
+                    activity.sessions_count,
+                    activity.total_xp,
+                )
+                for activity in statistics.activity_totals
+            ]
+        )
+        self.view.display_heatmaps(
+            statistics.daily_heatmap,
+            statistics.weekly_heatmap,
+            f"since {statistics.heatmap_start.strftime(STATISTICS_DATE_FORMAT)}",
+        )
+
+        xp_over_time = statistics.xp_over_time
+        if xp_over_time:
+            period = (
+                f"{self._format_day_key(xp_over_time[0][0])}"
+                f" - {self._format_day_key(xp_over_time[-1][0])}"
+            )
+        else:
+            period = ""
+
+        self.view.display_xp_over_time([xp for _, xp in xp_over_time], period)
+
+    @staticmethod
+    def _format_hours(seconds: int) -> str:
+        """Converts seconds to hours and minutes: "12h 05m" """
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+    @staticmethod
+    def _format_day_key(day_key: int) -> str:
+        return datetime.strptime(str(day_key), "%Y%m%d").strftime(
+            STATISTICS_DATE_FORMAT
+        )
@@ -1,7 +1,15 @@
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtWidgets import QWidget, QListWidgetItem
+from datetime import datetime
 
-from ..utils.constants import DEFAULT_HISTORY_ENTRIES_DISPLAYED
+from PyQt6.QtCore import Qt, QTimer, QModelIndex
+
+from ..utils.constants import (
+    CHECKPOINT_INTERVAL_MINUTES,
+    DEFAULT_HISTORY_ENTRIES_DISPLAYED,
+    OPEN_ENTRY_CLOSE,
+    OPEN_ENTRY_RESUME,
+    OPEN_ENTRY_TIME_FORMAT,
+)
+from ..utils.instrumentation import instrumented
 
 
 class TimeTrackingController:
@@ -25,76 +33,134 @@ class TimeTrackingController:
         self.model = time_tracking_model
         # Stores QTimer for elapsed time updates
         self.qtimer = None
+        # Stores QTimer saving checkpoints of the tracked entry
+        self.checkpoint_qtimer = None
+        # State of the loaded history pages,
+        # used to append the next page after the last loaded one
+        self.last_loaded_entry = None
+        self.last_displayed_day_key = None
+        self.loaded_entries_count = 0
         self.app_window.ui_initialized.connect(self._on_ui_initialized)
 
     # Public interface methods
 
     def get_history_time_entries(
-        self, entries_quantity: int = DEFAULT_HISTORY_ENTRIES_DISPLAYED
+        self,
+        page_size: int = DEFAULT_HISTORY_ENTRIES_DISPLAYED,
+        after_entry=None,
     ) -> list:
-        """Retrieves the list of history time entries"""
-        return self.model.get_history_time_entries(entries_quantity)
+        """Retrieves one page of history time entries"""
+        return self.model.get_history_time_entries(page_size, after_entry)
 
-    def delete_history_time_entry(self, entry_id: int, entry_widget: QWidget) -> None:
+    def delete_history_time_entry(self, entry_id: int) -> None:
         """
         Delete a time entry and update all relevant views
 
         Args:
             entry_id: ID of the time entry to delete in the database
-            entry_widget: Widget representing the history entry in the UI
 
         Side Effects:
-            - Removes the history entry from database
+            - Removes the history entry from database in the background
             - Updates UI
-            - Refreshes statistics
+            - Refreshes statistics once the entry is deleted
         """
-        # Delete from database and UI
-        self.model.delete_history_time_entry(entry_id)
-        entry_widget.deleteLater()
-
-        # Update statistics and views
-        self.model.user_model.reevaluate_user_stats()
-        self.app_window.user_stats_controller.refresh_user_statistics()
+        # Delete from UI right away, database is updated in the background
+        if self.view.remove_history_time_entry(entry_id):
+            self.loaded_entries_count -= 1
+            self.last_displayed_day_key = self.view.history_model.last_day_key()
 
-        # Reset selection state
-        self.model.current_selected_item = None
-        self.model.current_delete_btn = None
-
-        # Refresh entry list
-        self.refresh_time_entries_history()
+        self.model.delete_history_time_entry(
+            entry_id, on_finished=self._refresh_views_after_delete
+        )
 
     def get_activities(self):
         return self.model.get_user_activities()
 
-    def refresh_time_entries_history(
-        self, entries_quantity: int = DEFAULT_HISTORY_ENTRIES_DISPLAYED
-    ):
-        """Updates the time entries history list"""
-        self.view.time_entries_history_list.clear()
+    @instrumented()
+    def load_initial_data(self, snapshot=None) -> None:
+        """
+        Fills the panel with activities and history
+        Called once the window is shown, so loading doesn't delay the first paint
 
-        time_entries = self.get_history_time_entries(entries_quantity)
+        Args:
+            snapshot: If provided, data is taken from the startup snapshot
+                instead of the database and the panel can be filled
+                before the window is shown
+        """
+        self.model.load_history_entries_count(snapshot)
+        self.refresh_activity_selector()
+
+        if snapshot is None:
+            self.refresh_time_entries_history()
+        else:
+            # Empty list instead of None, so the history isn't queried
+            self.refresh_time_entries_history(snapshot.history_entries or [])
+
+    @instrumented()
+    def refresh_time_entries_history(self, time_entries: list = None) -> None:
+        """
+        Reloads the time entries history list starting from the first page
+
+        Args:
+            time_entries: First page to display, queried if not provided
+        """
+        self.view.clear_history()
+
+        self.last_loaded_entry = None
+        self.last_displayed_day_key = None
+        self.loaded_entries_count = 0
+
+        if time_entries is None:
+            time_entries = self.get_history_time_entries()
 
         if not time_entries:
             self.view.show_empty_history_message()
             return
 
-        previous_entry_date = None
-        for entry in time_entries:
-            # If time entry has duration (meaning it was completed)
-            if entry["duration"]:
-                entry_date = self.model.convert_start_time_to_history_date(
-                    entry["start_time"]
-                )
+        self._append_time_entries(time_entries)
 
-                if entry_date != previous_entry_date:
-                    self.view.create_date_item_for_time_entries_history(entry_date)
+    @instrumented()
+    def load_more_time_entries(self) -> None:
+        """
+        Appends the next page of history time entries to the list
+        Already displayed entries are kept as they are
+        """
+        self.view.remove_show_more_entries_button()
 
-                self.view.create_history_time_entry(entry)
+        time_entries = self.get_history_time_entries(
+            DEFAULT_HISTORY_ENTRIES_DISPLAYED, self.last_loaded_entry
+        )
 
-                previous_entry_date = entry_date
+        if not time_entries:
+            return
 
-        if self.is_show_more_entries_button_needed(len(time_entries)):
-            self.view.display_show_more_entries_button()
+        self._append_time_entries(time_entries)
+
+    @instrumented()
+    def recover_open_time_entries(self) -> None:
+        """
+        Offers to resume, close or discard time entries left open
+        by a previous run (e.g. after a crash or quitting while tracking)
+        Called once the initial data is displayed
+        """
+        for open_entry in self.model.get_open_time_entries():
+            action = self.app_window.ask_open_time_entry_action(
+                open_entry.activity_name,
+                datetime.fromtimestamp(open_entry.start_timestamp).strftime(
+                    OPEN_ENTRY_TIME_FORMAT
+                ),
+                self.model.format_duration(open_entry.checkpoint_seconds or 0),
+                can_resume=not self.model.is_timer_running,
+            )
+
+            if action == OPEN_ENTRY_RESUME:
+                self._resume_open_time_entry(open_entry)
+            elif action == OPEN_ENTRY_CLOSE:
+                self.model.close_open_time_entry(
+                    open_entry, on_finished=self._refresh_views_after_recovery
+                )
+            else:
+                self.model.discard_open_time_entry(open_entry)
 
     def is_show_more_entries_button_needed(self, current_entries_count: int) -> bool:
         total_entries_count = self.model.total_history_entries_count
@@ -104,6 +170,7 @@ class TimeTrackingController:
 
         return False
 
+    @instrumented()
     def refresh_activity_selector(self):
         """
         Refreshes activity selector with fresh data
@@ -127,9 +194,10 @@ class TimeTrackingController:
 
     # Event handlers
 
-    def handle_start_stop_button_clicked(self, activity_name: str) -> bool:
+    def handle_start_stop_button_clicked(self, activity) -> bool:
         """
         Handle the start/stop button click event in the timer view
+        activity is the ActivityRecord selected in the activity selector
 
         If the timer is not running, starts a new time entry
         If the timer is running, stops the current time entry
@@ -144,32 +212,20 @@ class TimeTrackingController:
             - Updates dashboard statistics (when stopped)
         """
         if not self.model.is_timer_running:
-            return self._start_new_time_entry(activity_name)
+            return self._start_new_time_entry(activity)
         else:
             return self._stop_current_time_entry()
 
-    def handle_time_entry_selection(self, item: QListWidgetItem) -> None:
+    def handle_history_row_click(self, index: QModelIndex) -> None:
         """
-        Handle when user selects a time entry in the history list
+        Handle when user clicks a row in the history list
+        Clicks on entries are handled by the history delegate
 
         Args:
-            item: The selected list widget item
+            index: Index of the clicked row
         """
-        item_data = item.data(Qt.ItemDataRole.UserRole)
-
-        # If item data is empty
-        if not item_data:
-            return
-
-        if item_data == "show_more_entries":
-            entries_count = self.view.time_entries_history_list.count()
-
-            # (entries_count - 1) excludes the "Show more" button itself
-            self.refresh_time_entries_history(
-                (entries_count - 1) + DEFAULT_HISTORY_ENTRIES_DISPLAYED
-            )
-        else:
-            self.model.show_delete_button(item)
+        if index.data(Qt.ItemDataRole.UserRole) == "show_more_entries":
+            self.load_more_time_entries()
 
     # Private helper methods
 
@@ -179,10 +235,40 @@ class TimeTrackingController:
         the app window UI is initialized
         """
         self.view = self.app_window.time_tracking_panel
-        # Display first time entries in the history list
-        self.refresh_time_entries_history(DEFAULT_HISTORY_ENTRIES_DISPLAYED)
 
-    def _start_new_time_entry(self, activity_name: str) -> bool:
+    def _append_time_entries(self, time_entries: list) -> None:
+        """
+        Adds a page of time entries to the end of the history list
+        Adds date items where a new day starts
+        and "Show more" button if not all entries are loaded
+        """
+        history_model = self.view.history_model
+        rows = []
+
+        # Only finished entries are returned by the database
+        for entry in time_entries:
+            # Entries are grouped by their integer day key,
+            # date text is only formatted once per group
+            if entry.day_key != self.last_displayed_day_key:
+                entry_date = self.model.convert_timestamp_to_history_date(
+                    entry.start_timestamp
+                )
+                rows.append(history_model.date_row(entry_date, entry.day_key))
+
+            rows.append(history_model.entry_row(entry))
+
+            self.last_displayed_day_key = entry.day_key
+
+        # All rows of the page are inserted at once
+        self.view.append_history_rows(rows)
+
+        self.last_loaded_entry = time_entries[-1]
+        self.loaded_entries_count += len(time_entries)
+
+        if self.is_show_more_entries_button_needed(self.loaded_entries_count):
+            self.view.display_show_more_entries_button()
+
+    def _start_new_time_entry(self, activity) -> bool:
         """
         Start time tracking
 
@@ -197,8 +283,9 @@ class TimeTrackingController:
             return False
 
         # Attempt to start the timer
-        if self.model.start_time_tracking(activity_name):
+        if self.model.start_time_tracking(activity):
             self._start_elapsed_time_updates()
+            self._start_checkpoints()
             self.view.update_timer_state(True)
             return True
         else:
@@ -207,12 +294,38 @@ class TimeTrackingController:
             )
             return False
 
+    def _resume_open_time_entry(self, open_entry) -> None:
+        """Continues tracking an open entry as if it was never interrupted"""
+        if not self.model.resume_time_tracking(open_entry):
+            return
+
+        self.view.select_activity(open_entry.activity_id)
+        self._start_elapsed_time_updates()
+        self._start_checkpoints()
+        self._update_elapsed_time_display()
+        self.view.update_timer_state(True)
+
     def _start_elapsed_time_updates(self) -> None:
         """Start the timer that updates the elapsed time display"""
         self.qtimer = QTimer()
         self.qtimer.timeout.connect(self._update_elapsed_time_display)
         self.qtimer.start(1000)  # Update every second
 
+    def _start_checkpoints(self) -> None:
+        """
+        Start the timer that saves the tracked entry every few minutes
+        Separate from the display timer, so its ticks stay cheap
+        """
+        self.checkpoint_qtimer = QTimer()
+        self.checkpoint_qtimer.timeout.connect(self.model.checkpoint_time_tracking)
+        self.checkpoint_qtimer.start(int(CHECKPOINT_INTERVAL_MINUTES * 60 * 1000))
+
+    def _stop_checkpoints(self) -> None:
+        if self.checkpoint_qtimer:
+            self.checkpoint_qtimer.stop()
+            self.checkpoint_qtimer.deleteLater()
+            self.checkpoint_qtimer = None
+
     def _update_elapsed_time_display(self) -> None:
         """Update the elapsed time shown in the time tracking panel"""
         current_duration = self.model.get_formatted_elapsed_time_since_start()
@@ -230,10 +343,12 @@ class TimeTrackingController:
             - Updates user's statistic
             - Stops updating the elapsed time display
         """
-        self.model.stop_time_tracking()
+        # Session is saved in the background,
+        # views are refreshed once it's saved
+        self.model.stop_time_tracking(on_finished=self._refresh_views_after_stop)
+        self._stop_checkpoints()
         self._stop_elapsed_time_updates()
         self.view.update_timer_state(False)
-        self._refresh_views_after_stop()
 
     def _stop_elapsed_time_updates(self) -> None:
         """Stop and cleanup the QTimer for elapsed time updates"""
@@ -244,7 +359,68 @@ class TimeTrackingController:
             # Reset elapsed time to 0:00:00
             self._update_elapsed_time_display()
 
-    def _refresh_views_after_stop(self) -> None:
-        """Update relevant views after stopping time tracking"""
+    def _refresh_views_after_stop(self, finished_entry) -> None:
+        """
+        Update relevant views after stopping time tracking
+        Only the finished entry is added to the history list
+        """
+        if finished_entry is None:
+            # Session wasn't saved, reload what is actually in the database
+            self.app_window.display_error_message(
+                "Something went wrong when saving the time entry"
+            )
+            self.refresh_time_entries_history()
+        else:
+            self._insert_finished_time_entry(finished_entry)
+
+        self.app_window.user_stats_controller.refresh_user_statistics()
+        self.app_window.statistics_controller.refresh_statistics()
+
+    def _insert_finished_time_entry(self, finished_entry) -> None:
+        """Adds just finished entry to the top of the history list"""
+        # The list could have been reloaded after the entry was saved
+        if self.view.history_model.find_entry_row(finished_entry.id) != -1:
+            return
+
+        entry_date = self.model.convert_timestamp_to_history_date(
+            finished_entry.start_timestamp
+        )
+        self.view.insert_history_time_entry_at_top(finished_entry, entry_date)
+
+        self.loaded_entries_count += 1
+        if self.last_displayed_day_key is None:
+            self.last_displayed_day_key = finished_entry.day_key
+
+    def _refresh_views_after_recovery(self, finished_entry) -> None:
+        """
+        Update relevant views after closing an open time entry
+        The entry can be older than displayed ones, so the history is reloaded
+        """
+        if finished_entry is None:
+            self.app_window.display_error_message(
+                "Something went wrong when saving the time entry"
+            )
+
         self.refresh_time_entries_history()
         self.app_window.user_stats_controller.refresh_user_statistics()
+        self.app_window.statistics_controller.refresh_statistics()
+
+    def _refresh_views_after_delete(self, is_deleted: bool) -> None:
+        """
+        Update relevant views after deleting a history time entry
+        The entry itself is already removed from the history list,
+        it is displayed again if deleting failed
+        """
+        if not is_deleted:
+            self.app_window.display_error_message(
+                "Something went wrong when deleting the time entry"
+            )
+            self.refresh_time_entries_history()
+            return
+
+        self.app_window.user_stats_controller.refresh_user_statistics()
+        self.app_window.statistics_controller.refresh_statistics()
+
+        # Keep the list filled if the last displayed entry was deleted
+        if self.view.history_model.entry_count == 0:
+            self.refresh_time_entries_history()
@@ -6,6 +6,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 
+from ..utils.instrumentation import instrumented
+
 
 class UserStatsController:
     def __init__(self, app_window, user_stats_model):
@@ -30,6 +32,7 @@ class UserStatsController:
 
         self.view.update_user_xp(user_xp, total_xp_needed)
 
+    @instrumented()
     def refresh_user_statistics(self) -> None:
         """Updates level and XP in dashboard GUI"""
         self.update_user_level()
@@ -41,6 +44,9 @@ class UserStatsController:
         selected_mob = button.text()
         self.set_selected_mob(selected_mob)
 
+    def handle_statistics_button_clicked(self) -> None:
+        self.app_window.statistics_controller.show_statistics()
+
     def handle_activity_item_selection(self, item: QListWidgetItem) -> None:
         if item.data(Qt.ItemDataRole.UserRole) == "add_activity":
             # Save references to "Add new activity" item
@@ -183,17 +189,22 @@ class UserStatsController:
 
         self.refresh_after_activity_update()
 
+    @instrumented()
     def refresh_after_activity_update(self) -> None:
         """
         Updates activity list and activity selector
         Preserves "Add new activity" item
         """
-        add_new_activity_item = self.view.activity_list.takeItem(0)
-
-        self.view.refresh_activity_list()
+        self._refresh_activity_list()
         self.app_window.time_tracking_panel.controller.refresh_time_entries_history()
 
-        self.view.activity_list.insertItem(0, add_new_activity_item)
+    @instrumented()
+    def load_initial_data(self) -> None:
+        """
+        Fills the activity list
+        Called once the window is shown, so loading doesn't delay the first paint
+        """
+        self._refresh_activity_list()
 
     # XP rate manipulations
 
@@ -205,3 +216,11 @@ class UserStatsController:
     def _on_ui_initialized(self):
         self.view = self.app_window.user_stats_panel
         self.refresh_user_statistics()
+
+    def _refresh_activity_list(self) -> None:
+        """Reloads activities keeping "Add new activity" item at the top"""
+        add_new_activity_item = self.view.activity_list.takeItem(0)
+
+        self.view.refresh_activity_list()
+
+        self.view.activity_list.insertItem(0, add_new_activity_item)
@@ -0,0 +1,71 @@
+import sqlite3
+import threading
+
+from ..utils.logger import setup_logger
+
+
+class ConnectionManager:
+    """
+    Keeps long-lived SQLite connections to a single database file
+
+    Every thread gets its own connection which is opened on first use
+    and reused for every following query made from that thread
+    All opened connections are closed together on shutdown
+    """
+
+    def __init__(self, db_name: str):
+        self.db_name = db_name
+        self.logger = setup_logger("database")
+
+        # Holds the connection of the current thread
+        self._local = threading.local()
+        # Every connection ever handed out, so they can be closed on shutdown
+        self._connections = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    # Public interface methods
+
+    def get_connection(self) -> sqlite3.Connection:
+        """
+        Returns the connection owned by the calling thread
+        Opens a new one if the thread doesn't have it yet
+        """
+        conn = getattr(self._local, "connection", None)
+
+        if conn is not None:
+            return conn
+
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection manager is closed")
+
+            # Connections are only used by the thread that opened them,
+            # the flag is disabled so that close_all() can run from any thread
+            conn = sqlite3.connect(self.db_name, check_same_thread=False)
+            # Lets readers on the GUI thread work
+            # while the database worker is writing
+            conn.execute("PRAGMA journal_mode=WAL;")
+            self._connections.append(conn)
+
+        self._local.connection = conn
+        self.logger.debug(
+            "Opened database connection for thread: %s", threading.current_thread().name
+        )
+        return conn
+
+    def close_all(self) -> None:
+        """Closes every connection opened by this manager"""
+        with self._lock:
+            self._closed = True
+            connections = self._connections
+            self._connections = []
+
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                self.logger.error("Database error while closing connection: %s", e)
+
+        self._local = threading.local()
+        self.logger.debug("Closed %s database connection(s)", len(connections))
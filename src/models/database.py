@@ -1,16 +1,53 @@
 import sqlite3
-
-from ..utils.constants import DB_NAME
+from datetime import datetime
+
+from .connection_manager import ConnectionManager
+from .migrations import (
+    ACTIVITY_DAY_TOTALS_QUERY,
+    REBUILD_ACTIVITY_DAY_TOTALS,
+    apply_migrations,
+)
+from .records import (
+    ActivityDayTotalRecord,
+    ActivityRecord,
+    OpenTimeEntryRecord,
+    TimeEntryRecord,
+)
+from .xp_engine import evaluate_level
+from ..utils.constants import DB_NAME, TIME_FORMAT
+from ..utils.instrumentation import instrumented
 from ..utils.logger import setup_logger
 
+# Columns of the time entries returned by iter_finished_time_entries,
+# the last one is the XP earned for the entry
+EXPORT_COLUMNS = (
+    "id",
+    "activity_name",
+    "start_time",
+    "end_time",
+    "duration",
+    "duration_seconds",
+    "start_timestamp",
+    "end_timestamp",
+    "day_key",
+    "xp_amount",
+)
+
 
 class Database:
-    def __init__(self):
-        self.logger = setup_logger()
+    def __init__(self, db_name: str = DB_NAME):
+        self.logger = setup_logger("database")
+        self.connection_manager = ConnectionManager(db_name)
         self.create_tables()
+        self.apply_migrations()
 
     # Database Setup and Utilities
 
+    def close(self) -> None:
+        """Closes all database connections, should be called on shutdown"""
+        self.connection_manager.close_all()
+
+    @instrumented()
     def create_tables(self) -> None:
         """Creates the necessary database tables if they don't exist"""
         time_entries = """
@@ -54,12 +91,65 @@ class Database:
         queries = [time_entries, users, xp, activities]
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
                 for query in queries:
                     cur.execute(query)
         except sqlite3.Error as e:
-            self.logger.error(f"Database error while creating tables: {e}")
+            self.logger.error("Database error while creating tables: %s", e)
+
+        self.create_indexes()
+
+    @instrumented()
+    def apply_migrations(self) -> None:
+        """Upgrades the database schema to the latest version"""
+        try:
+            conn = self._get_connection()
+            schema_version = apply_migrations(conn, self.logger)
+            self.logger.debug("Database schema version: %s", schema_version)
+        except sqlite3.Error as e:
+            self.logger.error("Database error while applying migrations: %s", e)
+
+    @instrumented()
+    def create_indexes(self) -> None:
+        """
+        Creates indexes used by the queries below if they don't exist
+        Every query filtering by user or source must be served by one of them,
+        this is verified by src/models/query_plan.py
+        """
+        # History list of a user
+        time_entries_user = """
+            CREATE INDEX IF NOT EXISTS idx_time_entries_user_id
+            ON time_entries (user_id);"""
+
+        # Covers both lookup of a transaction by its source
+        # and summarizing XP amount of a user
+        xp_transactions_source = """
+            CREATE INDEX IF NOT EXISTS idx_xp_transactions_user_source
+            ON xp_transactions (user_id, source_type, source_id, xp_amount);"""
+
+        activities_user = """
+            CREATE INDEX IF NOT EXISTS idx_activities_user_id
+            ON activities (user_id);"""
+
+        queries = [time_entries_user, xp_transactions_source, activities_user]
+
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                for query in queries:
+                    cur.execute(query)
+        except sqlite3.Error as e:
+            self.logger.error("Database error while creating indexes: %s", e)
+
+    @instrumented()
+    def get_generation(self) -> int:
+        """
+        Returns the counter incremented on every change of user's data
+        Returns None if an error occured
+        """
+        query = "SELECT generation FROM database_generation WHERE id = ?;"
+        return self._select_and_fetchone(query, (1,))
 
     def _select_and_fetchone(self, query: str, parameters: tuple):
         """
@@ -67,7 +157,7 @@ class Database:
         Returs None if nothing were found or an error occured
         """
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
                 cur.execute(query, parameters)
                 result = cur.fetchone()
@@ -78,12 +168,13 @@ class Database:
                 return result[0]
         except sqlite3.Error as e:
             self.logger.error(
-                f"Database error while executing and fetching one result: {e}"
+                "Database error while executing and fetching one result: %s", e
             )
             return None
 
     # User Management
 
+    @instrumented()
     def initialize_default_user(self) -> int:
         """
         Creates default user if it doesn't exist
@@ -98,15 +189,16 @@ class Database:
         select_user_id_query = "SELECT id FROM users WHERE username = ?"
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
                 cur.execute(insert_default_user_query)
                 cur.execute(select_user_id_query, ("default_user",))
                 return cur.fetchone()[0]
         except sqlite3.Error as e:
-            self.logger.error(f"Database error while initializing default user: {e}")
+            self.logger.error("Database error while initializing default user: %s", e)
             return -1
 
+    @instrumented()
     def get_user_level(self, user_id: int = 1) -> int:
         """
         Fetches user's level by user's ID
@@ -128,11 +220,13 @@ class Database:
 
         return user_level
 
+    @instrumented()
     def get_user_total_time_spent(self, user_id: int = 1) -> int:
-        """Returns total tracked time in seconds"""
+        """Returns total tracked time of finished entries in seconds"""
+        # A row per day and activity instead of every time entry
         query = """
-            SELECT SUM(duration_seconds)
-            FROM time_entries
+            SELECT SUM(total_seconds)
+            FROM activity_day_totals
             WHERE user_id = ?;"""
 
         total_duration = self._select_and_fetchone(query, (user_id,))
@@ -142,18 +236,20 @@ class Database:
 
         return total_duration
 
+    @instrumented()
     def set_user_level(self, level: int, user_id: int = 1) -> None:
         query = "UPDATE users SET level = ? WHERE id = ?;"
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
                 cur.execute(query, (level, user_id))
         except sqlite3.Error as e:
-            self.logger.error(f"Database error while retrieving user's XP: {e}")
+            self.logger.error("Database error while retrieving user's XP: %s", e)
 
     # User's XP Management
 
+    @instrumented()
     def get_user_xp(self, user_id: int = 1) -> int:
         """
         Fetches user's XP by user's ID
@@ -182,6 +278,7 @@ class Database:
 
         return user_xp
 
+    @instrumented()
     def get_user_total_xp(self, user_id: int = 1) -> int:
         """
         Summorazies all XP transactions of one user and returns it
@@ -213,6 +310,7 @@ class Database:
 
         return total_xp
 
+    @instrumented()
     def insert_into_xp_transactions(
         self, xp_amount: int, source_type: str, source_id: int, user_id: int = 1
     ):
@@ -223,226 +321,744 @@ class Database:
         values = (user_id, xp_amount, source_type, source_id)
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
                 cur.execute(query, values)
         except sqlite3.Error as e:
             self.logger.error(
-                f"Database error while inserting into xp_transactions table: {e}"
+                "Database error while inserting into xp_transactions table: %s", e
             )
 
+    @instrumented()
     def set_user_xp(self, xp: int, user_id: int = 1) -> None:
         query = "UPDATE users SET total_xp = ? WHERE id = ?;"
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
                 cur.execute(query, (xp, user_id))
         except sqlite3.Error as e:
-            self.logger.error(f"Database error while updating user's XP: {e}")
+            self.logger.error("Database error while updating user's XP: %s", e)
 
     # Time Entry Management
 
-    def start_time_entry(self, activity_name: str, user_id: int = 1) -> int:
-        """Creates a new entry and returns its ID"""
+    @instrumented()
+    def start_time_entry(
+        self, activity_id: int, start_timestamp: int, user_id: int = 1
+    ) -> int:
+        """
+        Creates a new open entry of the activity and returns its ID
+        Start time is saved right away, so the entry can be recovered
+        if the application exits before it is finished
+        """
         query = """
             INSERT INTO time_entries
-            (user_id, activity_name)
-            VALUES (?, ?);"""
+            (user_id, activity_id, start_time, start_timestamp, day_key)
+            VALUES (?, ?, ?, ?, ?);"""
+
+        start_datetime = datetime.fromtimestamp(start_timestamp)
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
-                cur.execute(query, (user_id, activity_name))
+                cur.execute(
+                    query,
+                    (
+                        user_id,
+                        activity_id,
+                        start_datetime.strftime(TIME_FORMAT),
+                        start_timestamp,
+                        self.get_day_key(start_datetime),
+                    ),
+                )
                 # Return entry ID
                 return cur.lastrowid
         except sqlite3.Error as e:
-            self.logger.error(f"Database error while adding time entry: {e}")
+            self.logger.error("Database error while adding time entry: %s", e)
             return -1
 
+    @instrumented()
     def stop_time_entry(
         self,
         entry_id: int,
-        formatted_start_time: str,
+        start_timestamp: int,
+        end_timestamp: int,
         seconds_duration: int,
         formatted_duration: str,
-        formatted_end_time: str,
     ) -> None:
         """
         Finishes entry by adding start and end time
         along with durations
         """
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                self._finish_time_entry(
+                    cur,
+                    entry_id,
+                    start_timestamp,
+                    end_timestamp,
+                    seconds_duration,
+                    formatted_duration,
+                )
+        except sqlite3.Error as e:
+            self.logger.error("Database error while finishing time entry: %s", e)
+            return
+
+    @instrumented()
+    def checkpoint_time_entry(
+        self,
+        entry_id: int,
+        checkpoint_timestamp: int,
+        seconds_duration: int,
+        provisional_xp: int,
+    ) -> bool:
+        """
+        Saves progress of an open entry, so if the application exits
+        before it is finished, only the time since the checkpoint is lost
+        Duration and XP are written by a single UPDATE of a constant query,
+        which the connection keeps prepared between checkpoints
+        Finished entries are left untouched
+        Returns True if the checkpoint was saved
+        """
         query = """
             UPDATE time_entries
-            SET start_time = ?,
-            duration = ?,
-            duration_seconds = ?,
-            end_time = ? WHERE id = ?;"""
+            SET checkpoint_timestamp = ?,
+            checkpoint_seconds = ?,
+            provisional_xp = ?
+            WHERE id = ?
+            AND end_timestamp IS NULL;"""
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
                 cur.execute(
                     query,
+                    (checkpoint_timestamp, seconds_duration, provisional_xp, entry_id),
+                )
+                return True
+        except sqlite3.Error as e:
+            self.logger.error("Database error while saving checkpoint: %s", e)
+            return False
+
+    @instrumented()
+    def finish_time_session(
+        self,
+        entry_id: int,
+        start_timestamp: int,
+        end_timestamp: int,
+        seconds_duration: int,
+        formatted_duration: str,
+        earned_xp: int,
+        user_id: int = 1,
+    ) -> bool:
+        """
+        Finishes time entry and gives its XP reward in a single transaction
+        Either all of the writes are saved or none of them
+        XP is added to the stored total, so writes queued before this one
+        (e.g. deleting an entry) are kept, the level is evaluated from the result
+        Returns True if the transaction was committed
+        """
+        insert_xp_transaction_query = """
+            INSERT INTO xp_transactions (
+            user_id, xp_amount, source_type, source_id)
+            VALUES(?, ?, 'time_session', ?);"""
+        add_user_xp_query = """
+            UPDATE users
+            SET total_xp = total_xp + ?
+            WHERE id = ?;"""
+        select_user_xp_query = """
+            SELECT total_xp
+            FROM users
+            WHERE id = ?;"""
+        update_user_level_query = """
+            UPDATE users
+            SET level = ?
+            WHERE id = ?;"""
+
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                self._finish_time_entry(
+                    cur,
+                    entry_id,
+                    start_timestamp,
+                    end_timestamp,
+                    seconds_duration,
+                    formatted_duration,
+                )
+                cur.execute(insert_xp_transaction_query, (user_id, earned_xp, entry_id))
+                cur.execute(add_user_xp_query, (earned_xp, user_id))
+                cur.execute(select_user_xp_query, (user_id,))
+                user_row = cur.fetchone()
+
+                if user_row is not None:
+                    cur.execute(
+                        update_user_level_query, (evaluate_level(user_row[0]), user_id)
+                    )
+                return True
+        except sqlite3.Error as e:
+            self.logger.error("Database error while finishing time session: %s", e)
+            return False
+
+    @instrumented()
+    def import_time_entries(self, entries: list, user_id: int = 1) -> int:
+        """
+        Inserts finished time entries together with their XP transactions
+        in a single transaction, used for bulk imports
+        User's total XP and level aren't updated,
+        they should be reconciled once every batch is imported
+        Returns number of inserted entries, 0 if an error occured
+
+        Args:
+            entries: List of (activity_id, start_timestamp, end_timestamp,
+                seconds_duration, formatted_duration, earned_xp) tuples
+        """
+        insert_time_entries_query = """
+            INSERT INTO time_entries
+            (id, user_id, activity_id, start_time, duration,
+            duration_seconds, end_time, start_timestamp, end_timestamp, day_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"""
+        insert_xp_transactions_query = """
+            INSERT INTO xp_transactions (
+            user_id, xp_amount, source_type, source_id)
+            VALUES(?, ?, 'time_session', ?);"""
+
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                # executemany doesn't return inserted IDs,
+                # so they are assigned explicitly within the transaction,
+                # which holds the write lock before the last used ID is read
+                cur.execute("BEGIN IMMEDIATE;")
+                # Continues the AUTOINCREMENT sequence,
+                # so IDs of deleted entries stay unused
+                cur.execute(
+                    """
+                    SELECT COALESCE(MAX(seq), 0)
+                    FROM sqlite_sequence
+                    WHERE name = 'time_entries';"""
+                )
+                first_entry_id = cur.fetchone()[0] + 1
+
+                time_entries = []
+                xp_transactions = []
+
+                for entry_id, entry in enumerate(entries, first_entry_id):
                     (
-                        formatted_start_time,
-                        formatted_duration,
+                        activity_id,
+                        start_timestamp,
+                        end_timestamp,
                         seconds_duration,
-                        formatted_end_time,
-                        entry_id,
-                    ),
-                )
+                        formatted_duration,
+                        earned_xp,
+                    ) = entry
+                    start_time, end_time, day_key = self._get_time_columns(
+                        start_timestamp, end_timestamp
+                    )
+
+                    time_entries.append(
+                        (
+                            entry_id,
+                            user_id,
+                            activity_id,
+                            start_time,
+                            formatted_duration,
+                            seconds_duration,
+                            end_time,
+                            start_timestamp,
+                            end_timestamp,
+                            day_key,
+                        )
+                    )
+                    xp_transactions.append((user_id, earned_xp, entry_id))
+
+                cur.executemany(insert_time_entries_query, time_entries)
+                cur.executemany(insert_xp_transactions_query, xp_transactions)
+                return len(time_entries)
         except sqlite3.Error as e:
-            self.logger.error(f"Database error while finishing time entry: {e}")
-            return
+            self.logger.error("Database error while importing time entries: %s", e)
+            return 0
 
-    def get_history_time_entries(self, limit: int, user_id: int = 1) -> list:
+    @instrumented()
+    def get_history_time_entries(
+        self, page_size: int, user_id: int = 1, after_entry: TimeEntryRecord = None
+    ) -> list:
         """
-        Gets history time entries
-        Returns them in descending order (starting with the most recent)
-        As a list of dictionaries
+        Gets one page of history time entries
+        Returns them in descending order of start time (starting with the most recent),
+        so imported entries are placed by when they happened, not by their ID
+        As a list of TimeEntryRecord
+
+        Args:
+            page_size: Maximum number of entries to return
+            user_id: ID of the entries owner
+            after_entry: Last entry of the previous page,
+                the first page is returned if None
         """
-        query = """
-            SELECT * FROM time_entries
-            WHERE user_id = ?
-            ORDER BY id DESC
-            LIMIT ?"""
+        # Activity names are looked up for the entries of the page only
+        columns = "te.id, a.name, te.duration, te.start_timestamp, te.day_key"
+
+        if after_entry is None:
+            query = f"""
+                SELECT {columns}
+                FROM time_entries AS te
+                CROSS JOIN activities AS a ON a.id = te.activity_id
+                WHERE te.user_id = ?
+                AND te.end_timestamp IS NOT NULL
+                ORDER BY te.start_timestamp DESC, te.id DESC
+                LIMIT ?"""
+            parameters = (user_id, page_size)
+        else:
+            # Continues right after the previous page using the index
+            # instead of skipping already loaded rows with OFFSET,
+            # the ID breaks ties between entries started at the same second
+            query = f"""
+                SELECT {columns}
+                FROM time_entries AS te
+                CROSS JOIN activities AS a ON a.id = te.activity_id
+                WHERE te.user_id = ?
+                AND (te.start_timestamp, te.id) < (?, ?)
+                AND te.end_timestamp IS NOT NULL
+                ORDER BY te.start_timestamp DESC, te.id DESC
+                LIMIT ?"""
+            parameters = (
+                user_id,
+                after_entry.start_timestamp,
+                after_entry.id,
+                page_size,
+            )
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
-                cur.execute(query, (user_id, limit))
+                cur.execute(query, parameters)
 
                 history_entries = cur.fetchall()
 
                 if not history_entries:
                     return None
 
-                result = self._convert_into_list_of_dicts(
-                    cur.description, history_entries
-                )
-
-                return result
+                return [TimeEntryRecord(*row) for row in history_entries]
 
         except sqlite3.Error as e:
-            self.logger.error(f"Database error while getting recent entries: {e}")
+            self.logger.error("Database error while getting recent entries: %s", e)
             return []  # Return empty list on error
 
+    def iter_finished_time_entries(
+        self,
+        user_id: int = 1,
+        start_day_key: int = None,
+        end_day_key: int = None,
+        activity_name: str = None,
+    ):
+        """
+        Yields finished time entries with their earned XP one by one
+        as tuples of EXPORT_COLUMNS values, ordered by day and ID
+        Rows are read from the cursor lazily, so memory usage
+        doesn't depend on the number of entries
+        Unlike other methods, errors are logged and raised,
+        so a failed export can't be mistaken for a complete one
+
+        Args:
+            start_day_key, end_day_key: Inclusive range of days (YYYYMMDD)
+            activity_name: Only entries of this activity are returned if provided
+        """
+        columns = ", ".join(f"te.{column}" for column in EXPORT_COLUMNS[2:-1])
+        query = f"""
+            SELECT te.id, a.name, {columns}, xt.xp_amount
+            FROM time_entries AS te
+            CROSS JOIN activities AS a ON a.id = te.activity_id
+            LEFT JOIN xp_transactions AS xt
+            ON xt.user_id = te.user_id
+            AND xt.source_type = 'time_session'
+            AND xt.source_id = te.id
+            WHERE te.user_id = ?
+            AND te.day_key BETWEEN ? AND ?
+            AND te.end_timestamp IS NOT NULL"""
+        # Open range ends are replaced with day keys outside of any real date,
+        # so the range is always served by the (user_id, day_key) index
+        parameters = [
+            user_id,
+            0 if start_day_key is None else start_day_key,
+            99999999 if end_day_key is None else end_day_key,
+        ]
+
+        if activity_name is not None:
+            query += " AND a.name = ?"
+            parameters.append(activity_name)
+
+        # Same order as the index, so rows aren't sorted in memory
+        query += " ORDER BY te.day_key, te.id;"
+
+        try:
+            # Separate cursor, so other queries can run while it is iterated
+            cur = self._get_connection().cursor()
+            try:
+                yield from cur.execute(query, parameters)
+            finally:
+                cur.close()
+        except sqlite3.Error as e:
+            self.logger.error("Database error while reading time entries: %s", e)
+            raise
+
+    @instrumented()
     def count_user_history_entries(self, user_id: int = 1):
+        """Counts finished entries, open entries aren't part of the history"""
+        # A row per day and activity instead of every time entry
         query = """
-            SELECT COUNT(*)
-            FROM time_entries
+            SELECT COALESCE(SUM(sessions_count), 0)
+            FROM activity_day_totals
             WHERE user_id = ?"""
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
                 cur.execute(query, (user_id,))
                 return cur.fetchone()
         except sqlite3.Error as e:
-            self.logger.error(f"Database error while counting history entries: {e}")
+            self.logger.error("Database error while counting history entries: %s", e)
             return None
 
-    def delete_time_entry(self, entry_id: int, user_id: int = 1) -> None:
+    @instrumented()
+    def get_open_time_entries(self, user_id: int = 1) -> list:
+        """
+        Gets entries that were started but never finished,
+        e.g. because the application crashed while tracking
+        Returns them as a list of OpenTimeEntryRecord, the most recent first
+        """
+        # Served by the partial index of open entries,
+        # finished entries are never read
+        query = """
+            SELECT te.id, te.activity_id, a.name, te.start_timestamp,
+            te.checkpoint_timestamp, te.checkpoint_seconds, te.provisional_xp
+            FROM time_entries AS te
+            CROSS JOIN activities AS a ON a.id = te.activity_id
+            WHERE te.user_id = ?
+            AND te.end_timestamp IS NULL
+            ORDER BY te.id DESC"""
+
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(query, (user_id,))
+                return [OpenTimeEntryRecord(*row) for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            self.logger.error("Database error while getting open time entries: %s", e)
+            return []
+
+    @instrumented()
+    def delete_time_entry(self, entry_id: int, user_id: int = 1) -> int:
         """
         Deletes time entry of a user
         In both time_entries and xp_transactions tables
+        Subtracts XP of the entry from user's total XP in the same transaction
+        Returns amount of removed XP (0 if the entry had no XP or didn't exist),
+        None if an error occured
         """
         delete_time_entry = """
             DELETE FROM time_entries
             WHERE user_id = ?
             AND id = ?"""
+        select_entry_xp = """
+            SELECT COALESCE(SUM(xp_amount), 0)
+            FROM xp_transactions
+            WHERE user_id = ?
+            AND source_type = 'time_session'
+            AND source_id = ?"""
         delete_xp_transaction = """
             DELETE FROM xp_transactions
             WHERE user_id = ? 
             AND source_type = 'time_session'
             AND source_id = ?"""
+        update_user_xp = """
+            UPDATE users
+            SET total_xp = total_xp - ?
+            WHERE id = ?"""
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
                 cur.execute(delete_time_entry, (user_id, entry_id))
+                cur.execute(select_entry_xp, (user_id, entry_id))
+                removed_xp = cur.fetchone()[0]
                 cur.execute(delete_xp_transaction, (user_id, entry_id))
+                # Open entries have no XP yet, user's stats stay untouched
+                if removed_xp:
+                    cur.execute(update_user_xp, (removed_xp, user_id))
+                return removed_xp
         except sqlite3.Error as e:
-            self.logger.error(f"Database error while deleting time entry: {e}")
-            return
+            self.logger.error("Database error while deleting time entry: %s", e)
+            return None
 
     # Activity Management
 
-    def add_new_activity(self, activity_name: str, user_id: int = 1) -> bool:
+    @instrumented()
+    def add_new_activity(self, activity_name: str, user_id: int = 1) -> int:
         """
         Inserts new activity into the activities table
-        Return True if successfully inserted
+        Returns ID of the inserted activity, None if an error occured
         """
         query = "INSERT INTO activities (user_id, name) VALUES(?, ?);"
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
                 cur.execute(query, (user_id, activity_name))
-                return True
+                return cur.lastrowid
         except sqlite3.Error as e:
             self.logger.error(
-                f"Database error while inserting into activities table: {e}"
+                "Database error while inserting into activities table: %s", e
             )
-            return False
+            return None
 
+    @instrumented()
     def delete_user_activity(self, activity_id: int, user_id: int = 1) -> None:
+        """
+        Archives the activity, so it is no longer offered
+        while its time entries keep referencing it
+        """
         query = """
-            DELETE FROM activities
+            UPDATE activities
+            SET is_archived = 1
             WHERE id = ?
             AND user_id = ?;"""
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
                 cur.execute(query, (activity_id, user_id))
         except sqlite3.Error as e:
-            self.logger.error(f"Database error while deleting activity: {e}")
+            self.logger.error("Database error while deleting activity: %s", e)
 
-    def get_user_activities(self, user_id: int = 1) -> list:
+    @instrumented()
+    def get_user_activities(
+        self, user_id: int = 1, include_archived: bool = False
+    ) -> list:
         """
         Gets pre-defined user activities
-        Returns them as a list of dictionaries
+        Returns them as a list of ActivityRecord
+
+        Args:
+            include_archived: Deleted activities are returned too if True
         """
-        query = """
-            SELECT * FROM activities
+        query = f"""
+            SELECT {ActivityRecord.COLUMNS} FROM activities
             WHERE user_id = ?
+            AND is_archived IN (0, ?)
             ORDER BY id DESC"""
 
         try:
-            with sqlite3.connect(DB_NAME) as conn:
+            with self._get_connection() as conn:
                 cur = conn.cursor()
-                cur.execute(query, (user_id,))
+                cur.execute(query, (user_id, int(include_archived)))
 
                 activities = cur.fetchall()
 
                 if not activities:
                     return None
 
-                result = self._convert_into_list_of_dicts(cur.description, activities)
+                return [ActivityRecord(*row) for row in activities]
+
+        except sqlite3.Error as e:
+            self.logger.error("Database error while getting user activities: %s", e)
+            return []
+
+    # Statistics
+
+    @instrumented()
+    def get_activity_day_totals(
+        self, user_id: int = 1, start_day_key: int = None, end_day_key: int = None
+    ) -> list:
+        """
+        Gets tracked seconds, finished sessions and earned XP
+        per day and activity, ordered by day
+        Returns them as a list of ActivityDayTotalRecord
+
+        Args:
+            start_day_key, end_day_key: Inclusive range of days,
+                every day is returned if not provided
+        """
+        query = f"""
+            SELECT t.day_key, a.name, t.total_seconds, t.sessions_count, t.total_xp
+            FROM activity_day_totals AS t
+            CROSS JOIN activities AS a ON a.id = t.activity_id
+            WHERE t.user_id = ?
+            AND t.day_key BETWEEN ? AND ?
+            ORDER BY t.day_key"""
+        parameters = (
+            user_id,
+            0 if start_day_key is None else start_day_key,
+            99999999 if end_day_key is None else end_day_key,
+        )
+
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(query, parameters)
+                return [ActivityDayTotalRecord(*row) for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            self.logger.error("Database error while getting activity totals: %s", e)
+            return []
+
+    @instrumented()
+    def get_activity_totals(self, user_id: int = 1) -> list:
+        """
+        Gets tracked seconds, finished sessions and earned XP per activity,
+        ordered from the most tracked activity
+        Returns them as a list of ActivityDayTotalRecord without a day key
+        """
+        query = """
+            SELECT NULL, a.name, SUM(t.total_seconds) AS total_seconds,
+            SUM(t.sessions_count), SUM(t.total_xp)
+            FROM activity_day_totals AS t
+            CROSS JOIN activities AS a ON a.id = t.activity_id
+            WHERE t.user_id = ?
+            GROUP BY t.activity_id
+            ORDER BY total_seconds DESC, a.name"""
+
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(query, (user_id,))
+                return [ActivityDayTotalRecord(*row) for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            self.logger.error("Database error while getting activity totals: %s", e)
+            return []
 
-                return result
+    @instrumented()
+    def get_daily_totals(self, user_id: int = 1) -> list:
+        """
+        Gets tracked seconds, finished sessions and earned XP per day,
+        ordered by day, days without finished entries are missing
+        Returns them as a list of ActivityDayTotalRecord without an activity name
+        """
+        query = """
+            SELECT day_key, NULL, SUM(total_seconds),
+            SUM(sessions_count), SUM(total_xp)
+            FROM activity_day_totals
+            WHERE user_id = ?
+            GROUP BY day_key
+            ORDER BY day_key"""
 
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(query, (user_id,))
+                return [ActivityDayTotalRecord(*row) for row in cur.fetchall()]
         except sqlite3.Error as e:
-            self.logger.error(f"Database error while getting user activities: {e}")
+            self.logger.error("Database error while getting daily totals: %s", e)
             return []
 
+    @instrumented()
+    def rebuild_activity_day_totals(self) -> int:
+        """
+        Recomputes activity day totals of every user
+        from time entries and XP transactions
+        Returns number of rebuilt rows, -1 if an error occured
+        """
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                for query in REBUILD_ACTIVITY_DAY_TOTALS:
+                    cur.execute(query)
+
+                cur.execute("SELECT COUNT(*) FROM activity_day_totals;")
+                return cur.fetchone()[0]
+        except sqlite3.Error as e:
+            self.logger.error("Database error while rebuilding activity totals: %s", e)
+            return -1
+
+    @instrumented()
+    def count_activity_day_totals_mismatches(self) -> int:
+        """
+        Compares activity day totals with totals recomputed from raw data
+        Returns number of rows that differ, -1 if an error occured
+        """
+        query = f"""
+            WITH expected AS ({ACTIVITY_DAY_TOTALS_QUERY})
+            SELECT
+            (SELECT COUNT(*) FROM (
+                SELECT * FROM expected
+                EXCEPT SELECT * FROM activity_day_totals))
+            + (SELECT COUNT(*) FROM (
+                SELECT * FROM activity_day_totals
+                EXCEPT SELECT * FROM expected));"""
+
+        mismatches_count = self._select_and_fetchone(query, ())
+
+        if mismatches_count is None:
+            return -1
+
+        return mismatches_count
+
     # Private helper methods
 
-    @staticmethod
-    def _convert_into_list_of_dicts(cur_desc, query_result):
+    def _get_connection(self) -> sqlite3.Connection:
+        """
+        Returns long-lived connection of the calling thread
+        Used as a context manager it commits on success
+        and rolls back on error without closing the connection
+        """
+        return self.connection_manager.get_connection()
+
+    def _finish_time_entry(
+        self,
+        cur: sqlite3.Cursor,
+        entry_id: int,
+        start_timestamp: int,
+        end_timestamp: int,
+        seconds_duration: int,
+        formatted_duration: str,
+    ) -> None:
+        """
+        Writes start and end time of an entry
+        both as TIME_FORMAT text and as integer timestamps
+        Runs in the transaction of the passed cursor
+        """
+        query = """
+            UPDATE time_entries
+            SET start_time = ?,
+            duration = ?,
+            duration_seconds = ?,
+            end_time = ?,
+            start_timestamp = ?,
+            end_timestamp = ?,
+            day_key = ? WHERE id = ?;"""
+
+        start_time, end_time, day_key = self._get_time_columns(
+            start_timestamp, end_timestamp
+        )
+
+        cur.execute(
+            query,
+            (
+                start_time,
+                formatted_duration,
+                seconds_duration,
+                end_time,
+                start_timestamp,
+                end_timestamp,
+                day_key,
+                entry_id,
+            ),
+        )
+
+    def _get_time_columns(self, start_timestamp: int, end_timestamp: int) -> tuple:
         """
-        Maps SQLite query column names to their respective values
-        Returns a list of dictionaries
+        Returns start and end time as TIME_FORMAT text
+        and the day key of the start, as stored in time_entries
         """
-        column_names = []
-        for column in cur_desc:
-            name = column[0]
-            column_names.append(name)
+        start_datetime = datetime.fromtimestamp(start_timestamp)
+        end_datetime = datetime.fromtimestamp(end_timestamp)
 
-        result = []
-        for row in query_result:
-            result.append(dict(zip(column_names, row)))
+        return (
+            start_datetime.strftime(TIME_FORMAT),
+            end_datetime.strftime(TIME_FORMAT),
+            self.get_day_key(start_datetime),
+        )
 
-        return result
+    @staticmethod
+    def get_day_key(date: datetime) -> int:
+        """Converts date to an integer of YYYYMMDD format"""
+        return date.year * 10000 + date.month * 100 + date.day
@@ -0,0 +1,84 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from ..utils.logger import setup_logger
+
+
+class DatabaseWorker(QObject):
+    """
+    Runs database work on a dedicated background thread
+
+    Submitted tasks are queued and executed one by one in submission order,
+    so writes never run concurrently with each other
+    Callbacks are delivered back on the thread that owns the worker
+    (the GUI thread), which makes it safe to update views from them
+
+    Attributes:
+        _task_finished: Emitted from the worker thread with
+            the callback and the finished future
+    """
+
+    _task_finished = pyqtSignal(object, object)
+
+    def __init__(self):
+        super().__init__()
+        self.logger = setup_logger("database")
+        # Single thread keeps the order of writes
+        # and owns one long-lived database connection
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="database_worker"
+        )
+        # Signal is emitted from another thread,
+        # so the slot is queued to the event loop of this object's thread
+        self._task_finished.connect(self._on_task_finished)
+
+    # Public interface methods
+
+    def submit(self, function, *args, callback=None) -> Future:
+        """
+        Queues function call to the worker thread
+
+        Args:
+            function: Function to call, usually a Database method
+            args: Arguments passed to the function
+            callback: Called with the function's result on the GUI thread,
+                or with None if the function raised an exception,
+                so that callers always learn that the task has finished
+
+        Returns:
+            Future of the function's result, can be waited on by scripts
+        """
+        future = self._executor.submit(function, *args)
+
+        if callback is not None:
+            future.add_done_callback(
+                lambda finished_future: self._task_finished.emit(
+                    callback, finished_future
+                )
+            )
+
+        return future
+
+    def run_sync(self, function, *args):
+        """
+        Runs function on the worker thread and waits for its result
+        Keeps the order with previously submitted tasks
+        """
+        return self.submit(function, *args).result()
+
+    def shutdown(self) -> None:
+        """Waits for queued tasks to finish and stops the worker thread"""
+        self._executor.shutdown(wait=True)
+        self.logger.debug("Database worker has been shut down")
+
+    # Private helper methods
+
+    def _on_task_finished(self, callback, future: Future) -> None:
+        try:
+            result = future.result()
+        except Exception as e:
+            self.logger.error("Database worker task failed: %s", e)
+            result = None
+
+        callback(result)
@@ -0,0 +1,180 @@
+"""
+Streaming export of finished time entries
+
+Entries are read from the database cursor and written one by one,
+so memory usage stays flat regardless of the history size
+The format is taken from the file extension: *.csv or *.jsonl,
+optionally followed by .gz for a gzip-compressed file
+
+Usage:
+    python -m src.models.exporter history.csv
+    python -m src.models.exporter history.jsonl.gz --from 2024-01-01 --to 2024-12-31
+    python -m src.models.exporter - --format csv --activity Reading > history.csv
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import sqlite3
+import sys
+from contextlib import nullcontext
+from datetime import datetime
+
+from .database import EXPORT_COLUMNS, Database
+from ..utils.constants import DB_NAME
+
+EXPORT_FORMATS = ("csv", "jsonl", "csv.gz", "jsonl.gz")
+# Date format of the --from and --to options
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def export_time_entries(
+    database: Database,
+    file,
+    export_format: str,
+    user_id: int = 1,
+    start_date: datetime = None,
+    end_date: datetime = None,
+    activity_name: str = None,
+) -> int:
+    """
+    Writes finished time entries to an open text file
+    Returns number of written entries
+
+    Args:
+        export_format: "csv" or "jsonl"
+        start_date, end_date: Inclusive range of days to export
+        activity_name: Only entries of this activity are exported if provided
+    """
+    rows = database.iter_finished_time_entries(
+        user_id,
+        None if start_date is None else Database.get_day_key(start_date),
+        None if end_date is None else Database.get_day_key(end_date),
+        activity_name,
+    )
+
+    if export_format == "csv":
+        return _write_csv(rows, file)
+    if export_format == "jsonl":
+        return _write_jsonl(rows, file)
+
+    raise ValueError(f"Unsupported export format: {export_format}")
+
+
+def export_time_entries_to_file(
+    database: Database, file_path: str, export_format: str = None, **filters
+) -> int:
+    """
+    Writes finished time entries to a file, "-" writes them to stdout
+    Format is taken from the file extension if not provided,
+    formats ending with ".gz" are gzip-compressed
+    Accepts the same filters as export_time_entries
+    Returns number of written entries
+    """
+    if export_format is None:
+        export_format = get_export_format(file_path)
+
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    is_compressed = export_format.endswith(".gz")
+    text_format = export_format[:-3] if is_compressed else export_format
+
+    if file_path == "-":
+        if is_compressed:
+            output = gzip.open(sys.stdout.buffer, "wt", newline="", encoding="utf-8")
+        else:
+            # stdout isn't closed after the export
+            output = nullcontext(sys.stdout)
+    elif is_compressed:
+        output = gzip.open(file_path, "wt", newline="", encoding="utf-8")
+    else:
+        output = open(file_path, "w", newline="", encoding="utf-8")
+
+    with output as file:
+        return export_time_entries(database, file, text_format, **filters)
+
+
+def get_export_format(file_path: str) -> str:
+    for export_format in EXPORT_FORMATS:
+        if file_path.endswith(f".{export_format}"):
+            return export_format
+
+    raise ValueError(f"Can't tell the export format of {file_path}")
+
+
+def _write_csv(rows, file) -> int:
+    writer = csv.writer(file)
+    writer.writerow(EXPORT_COLUMNS)
+
+    written_count = 0
+    for row in rows:
+        writer.writerow(row)
+        written_count += 1
+
+    return written_count
+
+
+def _write_jsonl(rows, file) -> int:
+    written_count = 0
+    for row in rows:
+        file.write(json.dumps(dict(zip(EXPORT_COLUMNS, row))))
+        file.write("\n")
+        written_count += 1
+
+    return written_count
+
+
+def _parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD date, got {value!r}")
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(description="Export finished time entries")
+    parser.add_argument("file", help='output file, "-" writes to stdout')
+    parser.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        help="taken from the file extension if not provided",
+    )
+    parser.add_argument("--db", default=DB_NAME, help="database to export from")
+    parser.add_argument(
+        "--from", dest="start_date", type=_parse_date, help="first day (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--to", dest="end_date", type=_parse_date, help="last day (YYYY-MM-DD)"
+    )
+    parser.add_argument("--activity", help="export only entries of this activity")
+    args = parser.parse_args(arguments)
+
+    if args.file == "-" and args.format is None:
+        parser.error("--format is required when writing to stdout")
+
+    database = Database(args.db)
+    try:
+        user_id = database.initialize_default_user()
+        exported_count = export_time_entries_to_file(
+            database,
+            args.file,
+            args.format,
+            user_id=user_id,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            activity_name=args.activity,
+        )
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Failed to export time entries: {e}", file=sys.stderr)
+        return 1
+    finally:
+        database.close()
+
+    print(f"Exported {exported_count} time entries", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""
+Bulk import of time logs exported from other time trackers
+
+Input is streamed row by row from CSV (with a header row) or JSON Lines,
+gzip-compressed files (*.gz) are decompressed on the fly
+Every row needs an activity name, a start time and either an end time
+or a duration:
+    activity_name (or activity)
+    start_time (or start): epoch seconds, TIME_FORMAT or ISO 8601 text
+    end_time (or end): same formats as start_time
+    duration_seconds, or duration as H:MM:SS text
+    mob (optional): XP rate from MOB_XP_RATES, defaults to the --mob option
+
+Rows are inserted in batches, one transaction per batch,
+and user's total XP and level are reconciled once at the end
+
+Usage:
+    python -m src.models.importer history.csv
+    python -m src.models.importer history.jsonl.gz --mob Chicken --db test.db
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import sys
+from collections import namedtuple
+from datetime import datetime
+
+from .database import Database
+from .time_tracking_model import TimeTrackingModel
+from .user_model import UserModel
+from .xp_engine import XpEngine
+from ..utils.constants import DB_NAME, MAX_ACTIVITY_NAME_SIZE, MOB_XP_RATES
+from ..utils.logger import setup_logger
+
+DEFAULT_BATCH_SIZE = 50_000
+DEFAULT_MOB = "Zombie"
+
+ACTIVITY_COLUMNS = ("activity_name", "activity")
+START_COLUMNS = ("start_time", "start")
+END_COLUMNS = ("end_time", "end")
+
+ImportSummary = namedtuple(
+    "ImportSummary", ["imported", "skipped", "created_activities", "total_xp"]
+)
+
+
+class TimeLogImporter:
+    """
+    Imports time logs into the database of a single user
+
+    Activity names are normalized (surrounding and repeated whitespace
+    removed, truncated to MAX_ACTIVITY_NAME_SIZE) and matched
+    case-insensitively with the user's activities,
+    activities that don't exist yet are created
+
+    Args:
+        database: Database to import into
+        default_mob: XP rate used for rows without a mob
+        batch_size: Number of rows inserted in one transaction
+        xp_seed: Seed of the XP random generator to make rewards reproducible
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        default_mob: str = DEFAULT_MOB,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        xp_seed=None,
+    ):
+        if default_mob not in MOB_XP_RATES:
+            raise ValueError(f"Unknown mob: {default_mob}")
+
+        self.db = database
+        self.default_mob = default_mob
+        self.batch_size = batch_size
+        self.xp_engine = XpEngine(xp_seed)
+        self.logger = setup_logger("models")
+
+        self.user_model = UserModel(database)
+        self.user_id = self.user_model.current_user_id
+
+        # Normalized lowercase name -> ID of the activity,
+        # deleted (archived) activities are reused only if no active one matches
+        self.activity_ids = {}
+        for activities in (
+            self.user_model.get_user_activities(),
+            self.db.get_user_activities(self.user_id, include_archived=True),
+        ):
+            for activity in activities or []:
+                name = self.normalize_activity_name(activity.name)
+                self.activity_ids.setdefault(name.casefold(), activity.id)
+
+    # Public interface methods
+
+    def import_file(self, file_path: str) -> ImportSummary:
+        """Imports a CSV or JSON Lines file, the format is taken from its extension"""
+        return self.import_rows(read_rows(file_path))
+
+    def import_rows(self, rows) -> ImportSummary:
+        """
+        Imports rows (dictionaries) from any iterable, reading it only once
+        User's total XP and level are reconciled after the last batch
+        """
+        imported_count = 0
+        skipped_count = 0
+        created_activities = 0
+        total_xp = 0
+        batch = []
+
+        try:
+            for row_number, row in enumerate(rows, 1):
+                try:
+                    batch_item, is_new_activity = self._convert_row(row)
+                except (KeyError, TypeError, ValueError) as e:
+                    self.logger.warning("Skipping row %s: %s", row_number, e)
+                    skipped_count += 1
+                    continue
+
+                created_activities += is_new_activity
+                batch.append(batch_item)
+
+                if len(batch) >= self.batch_size:
+                    inserted_count, inserted_xp = self._insert_batch(batch)
+                    imported_count += inserted_count
+                    total_xp += inserted_xp
+                    batch = []
+
+            if batch:
+                inserted_count, inserted_xp = self._insert_batch(batch)
+                imported_count += inserted_count
+                total_xp += inserted_xp
+        finally:
+            # Single full reconciliation instead of updating totals per row,
+            # also done if reading fails after some batches were imported
+            self.user_model.reconcile_user_stats()
+
+        return ImportSummary(
+            imported_count, skipped_count, created_activities, total_xp
+        )
+
+    @staticmethod
+    def normalize_activity_name(name: str) -> str:
+        return " ".join(str(name).split())[:MAX_ACTIVITY_NAME_SIZE].strip()
+
+    # Private helper methods
+
+    def _convert_row(self, row: dict) -> tuple:
+        """
+        Converts an input row into the tuple taken by Database.import_time_entries
+        without its earned XP, paired with the XP rate the row is scored with
+        Returns it together with a flag telling if a new activity was created
+        """
+        if not isinstance(row, dict):
+            raise ValueError("row is not an object")
+
+        start_timestamp = parse_timestamp(_get_column(row, START_COLUMNS))
+
+        end_time = _get_column(row, END_COLUMNS, required=False)
+        if end_time is not None:
+            end_timestamp = parse_timestamp(end_time)
+        else:
+            end_timestamp = start_timestamp + parse_duration(row)
+
+        seconds_duration = end_timestamp - start_timestamp
+        if seconds_duration < 0:
+            raise ValueError("end time is before start time")
+
+        mob = row.get("mob") or self.default_mob
+        if mob not in MOB_XP_RATES:
+            raise ValueError(f"unknown mob {mob!r}")
+
+        # Looked up last, so that activities of invalid rows aren't created
+        activity_id, is_new_activity = self._get_activity_id(
+            _get_column(row, ACTIVITY_COLUMNS)
+        )
+
+        # Earned XP is appended once the whole batch is scored
+        entry = (
+            activity_id,
+            start_timestamp,
+            end_timestamp,
+            seconds_duration,
+            TimeTrackingModel.format_duration(seconds_duration),
+        )
+        return (entry, MOB_XP_RATES[mob]), is_new_activity
+
+    def _get_activity_id(self, name: str) -> tuple:
+        """
+        Returns ID of the activity, creating it if it doesn't exist,
+        and a flag telling if it was created
+        """
+        name = self.normalize_activity_name(name)
+
+        if not name:
+            raise ValueError("empty activity name")
+
+        activity_id = self.activity_ids.get(name.casefold())
+
+        if activity_id is not None:
+            return activity_id, False
+
+        activity_id = self.db.add_new_activity(name, self.user_id)
+        if activity_id is None:
+            raise ValueError(f"failed to create activity {name!r}")
+
+        self.activity_ids[name.casefold()] = activity_id
+        self.user_model.clear_activities_cache()
+        return activity_id, True
+
+    def _insert_batch(self, batch: list) -> tuple:
+        """
+        Scores (entry, XP rate) tuples of a batch at once and inserts them
+        Returns number of inserted entries and their total XP
+        """
+        earned_xps = self.xp_engine.batch_session_xp(
+            [entry[3] for entry, _ in batch], [xp_rate for _, xp_rate in batch]
+        )
+        batch = [
+            entry + (earned_xp,) for (entry, _), earned_xp in zip(batch, earned_xps)
+        ]
+
+        inserted_count = self.db.import_time_entries(batch, self.user_id)
+
+        if inserted_count == 0:
+            self.logger.error("Failed to import a batch of %s time entries", len(batch))
+            return 0, 0
+
+        self.logger.info("Imported a batch of %s time entries", inserted_count)
+        # Earned XP is the last item of an entry
+        return inserted_count, sum(entry[-1] for entry in batch)
+
+
+def read_rows(file_path: str):
+    """Yields rows of a CSV or JSON Lines file one by one as dictionaries"""
+    is_compressed = file_path.endswith(".gz")
+    base_path = file_path[:-3] if is_compressed else file_path
+    opener = gzip.open if is_compressed else open
+
+    with opener(file_path, "rt", newline="", encoding="utf-8") as file:
+        if base_path.endswith(".csv"):
+            yield from csv.DictReader(file)
+        elif base_path.endswith((".jsonl", ".ndjson")):
+            for line in file:
+                if not line.strip():
+                    continue
+
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Rejected as an invalid row by the importer
+                    yield None
+        else:
+            raise ValueError(f"Unsupported file format: {file_path}")
+
+
+def parse_timestamp(value) -> int:
+    """Converts epoch seconds, TIME_FORMAT or ISO 8601 text to epoch seconds"""
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    value = str(value).strip()
+
+    if value.isdigit():
+        return int(value)
+
+    # TIME_FORMAT is a subset of ISO 8601,
+    # text without a timezone is taken as local time
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def parse_duration(row: dict) -> int:
+    """Returns duration of a row given in seconds or as H:MM:SS text"""
+    duration_seconds = row.get("duration_seconds")
+
+    if duration_seconds not in (None, ""):
+        return int(float(duration_seconds))
+
+    hours, minutes, seconds = str(_get_column(row, ("duration",))).split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + int(float(seconds))
+
+
+def _get_column(row: dict, names: tuple, required: bool = True):
+    """Returns value of the first of the column names present in the row"""
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ""):
+            return value
+
+    if required:
+        raise KeyError(f"missing {' or '.join(names)}")
+
+    return None
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Import CSV or JSON Lines time logs into the database"
+    )
+    parser.add_argument("files", nargs="+", help="*.csv, *.jsonl or gzipped files")
+    parser.add_argument("--db", default=DB_NAME, help="database to import into")
+    parser.add_argument(
+        "--mob",
+        default=DEFAULT_MOB,
+        choices=list(MOB_XP_RATES),
+        help="XP rate of rows without a mob column",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="rows inserted in one transaction",
+    )
+    parser.add_argument("--seed", type=int, help="seed of XP rewards")
+    args = parser.parse_args(arguments)
+
+    database = Database(args.db)
+    try:
+        importer = TimeLogImporter(database, args.mob, args.batch_size, args.seed)
+
+        for file_path in args.files:
+            try:
+                summary = importer.import_file(file_path)
+            except (OSError, ValueError) as e:
+                print(f"Failed to import {file_path}: {e}")
+                return 1
+
+            print(
+                f"{file_path}: imported {summary.imported}, skipped {summary.skipped},"
+                f" created {summary.created_activities} activities,"
+                f" {summary.total_xp} XP"
+            )
+    finally:
+        database.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
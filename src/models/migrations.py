@@ -0,0 +1,478 @@
+"""
+Versioned schema migrations
+
+The schema version is stored in PRAGMA user_version
+Migration at index N of MIGRATIONS upgrades the schema from version N to N + 1
+and runs in the same transaction as the version bump
+New migrations must only be appended to the end of the list
+"""
+
+import sqlite3
+
+
+def _add_epoch_timestamps(cur: sqlite3.Cursor) -> None:
+    """
+    Adds integer start/end timestamps (seconds since epoch)
+    and an indexed day key (YYYYMMDD in local time) to time entries
+    Backfills them from the existing TIME_FORMAT text columns
+    """
+    cur.execute("ALTER TABLE time_entries ADD COLUMN start_timestamp INTEGER;")
+    cur.execute("ALTER TABLE time_entries ADD COLUMN end_timestamp INTEGER;")
+    cur.execute("ALTER TABLE time_entries ADD COLUMN day_key INTEGER;")
+
+    # Text columns are stored in local time,
+    # the 'utc' modifier converts them to UTC before taking the epoch
+    cur.execute(
+        """
+        UPDATE time_entries
+        SET start_timestamp = CAST(strftime('%s', start_time, 'utc') AS INTEGER),
+        end_timestamp = CAST(strftime('%s', end_time, 'utc') AS INTEGER),
+        day_key = CAST(strftime('%Y%m%d', start_time) AS INTEGER)
+        WHERE start_time IS NOT NULL;"""
+    )
+
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_time_entries_user_day
+        ON time_entries (user_id, day_key);"""
+    )
+
+
+# Tables whose changes invalidate data cached outside of the database
+GENERATION_TRACKED_TABLES = ("time_entries", "xp_transactions", "users", "activities")
+
+
+def _create_generation_triggers(cur: sqlite3.Cursor, table: str) -> None:
+    for operation in ("INSERT", "UPDATE", "DELETE"):
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS
+            trg_{table}_{operation.lower()}_generation
+            AFTER {operation} ON {table}
+            BEGIN
+                UPDATE database_generation
+                SET generation = generation + 1 WHERE id = 1;
+            END;"""
+        )
+
+
+def _add_database_generation(cur: sqlite3.Cursor) -> None:
+    """
+    Adds a generation counter incremented by triggers
+    on every change of the tracked tables
+    Data cached outside of the database (e.g. the startup snapshot)
+    stores the generation it was read at and is stale once it differs
+    """
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS database_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        );"""
+    )
+    cur.execute("INSERT OR IGNORE INTO database_generation VALUES (1, 0);")
+
+    for table in GENERATION_TRACKED_TABLES:
+        _create_generation_triggers(cur, table)
+
+
+# Activity day totals are keyed by the activity column of time entries,
+# activity_name up to schema version 3 and activity_id since version 4
+ACTIVITY_COLUMN = "activity_id"
+
+# XP earned for the time entry with the given ID
+_ENTRY_XP = """
+    (SELECT COALESCE(SUM(xp_amount), 0) FROM xp_transactions
+    WHERE user_id = {entry}.user_id
+    AND source_type = 'time_session'
+    AND source_id = {entry}.id)"""
+
+# Adds (sign 1) or removes (sign -1) a finished time entry from its totals,
+# entries without an end timestamp are still running and aren't counted
+_APPLY_ENTRY_TO_TOTALS = """
+    INSERT INTO activity_day_totals (
+    user_id, day_key, {activity}, total_seconds, sessions_count, total_xp)
+    SELECT {entry}.user_id, {entry}.day_key, {entry}.{activity},
+    {sign} * COALESCE({entry}.duration_seconds, 0), {sign}, {sign} * {entry_xp}
+    WHERE {entry}.end_timestamp IS NOT NULL
+    ON CONFLICT (user_id, day_key, {activity}) DO UPDATE
+    SET total_seconds = total_seconds + excluded.total_seconds,
+    sessions_count = sessions_count + excluded.sessions_count,
+    total_xp = total_xp + excluded.total_xp;"""
+
+_DELETE_EMPTY_TOTALS = """
+    DELETE FROM activity_day_totals
+    WHERE user_id = {entry}.user_id
+    AND day_key = {entry}.day_key
+    AND {activity} = {entry}.{activity}
+    AND sessions_count = 0;"""
+
+# Adds (sign 1) or removes (sign -1) XP of a transaction
+# from the totals of the finished time entry it was given for
+_APPLY_XP_TO_TOTALS = """
+    UPDATE activity_day_totals
+    SET total_xp = total_xp + {sign} * {transaction}.xp_amount
+    WHERE {transaction}.source_type = 'time_session'
+    AND (user_id, day_key, {activity}) = (
+        SELECT user_id, day_key, {activity} FROM time_entries
+        WHERE id = {transaction}.source_id
+        AND end_timestamp IS NOT NULL);"""
+
+# Computes activity day totals of every user from time entries
+# and XP transactions, used to fill and to verify the totals
+_ACTIVITY_DAY_TOTALS_QUERY = """
+    SELECT te.user_id, te.day_key, te.{activity},
+    SUM(COALESCE(te.duration_seconds, 0)), COUNT(*), SUM(COALESCE(xp.xp_amount, 0))
+    FROM time_entries te
+    LEFT JOIN (
+        SELECT user_id, source_id, SUM(xp_amount) AS xp_amount
+        FROM xp_transactions
+        WHERE source_type = 'time_session'
+        GROUP BY user_id, source_id
+    ) xp ON xp.user_id = te.user_id AND xp.source_id = te.id
+    WHERE te.end_timestamp IS NOT NULL
+    GROUP BY te.user_id, te.day_key, te.{activity}"""
+
+
+def _get_rebuild_queries(activity: str) -> tuple:
+    return (
+        "DELETE FROM activity_day_totals;",
+        f"""
+        INSERT INTO activity_day_totals (
+        user_id, day_key, {activity}, total_seconds, sessions_count, total_xp)
+        {_ACTIVITY_DAY_TOTALS_QUERY.format(activity=activity)};""",
+    )
+
+
+ACTIVITY_DAY_TOTALS_QUERY = _ACTIVITY_DAY_TOTALS_QUERY.format(activity=ACTIVITY_COLUMN)
+REBUILD_ACTIVITY_DAY_TOTALS = _get_rebuild_queries(ACTIVITY_COLUMN)
+
+ACTIVITY_DAY_TOTALS_TRIGGERS = (
+    "trg_time_entries_insert_totals",
+    "trg_time_entries_delete_totals",
+    "trg_time_entries_update_totals",
+    "trg_xp_transactions_insert_totals",
+    "trg_xp_transactions_delete_totals",
+    "trg_xp_transactions_update_totals",
+)
+
+
+def _create_activity_day_totals(
+    cur: sqlite3.Cursor, activity: str, activity_type: str
+) -> None:
+    """
+    Creates and fills activity day totals keyed by the activity column
+    together with the triggers keeping them current
+    """
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS activity_day_totals (
+            user_id INTEGER NOT NULL,
+            day_key INTEGER NOT NULL,
+            {activity} {activity_type} NOT NULL,
+            total_seconds INTEGER NOT NULL,
+            sessions_count INTEGER NOT NULL,
+            total_xp INTEGER NOT NULL,
+            PRIMARY KEY (user_id, day_key, {activity})
+        ) WITHOUT ROWID;"""
+    )
+
+    def apply_entry(entry: str, sign: int) -> str:
+        return _APPLY_ENTRY_TO_TOTALS.format(
+            entry=entry,
+            sign=sign,
+            activity=activity,
+            entry_xp=_ENTRY_XP.format(entry=entry),
+        )
+
+    def delete_empty(entry: str) -> str:
+        return _DELETE_EMPTY_TOTALS.format(entry=entry, activity=activity)
+
+    def apply_xp(transaction: str, sign: int) -> str:
+        return _APPLY_XP_TO_TOTALS.format(
+            transaction=transaction, sign=sign, activity=activity
+        )
+
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_time_entries_insert_totals
+        AFTER INSERT ON time_entries
+        BEGIN
+            {apply_entry("NEW", 1)}
+        END;"""
+    )
+    # XP of a deleted entry is removed too if its transaction still exists
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_time_entries_delete_totals
+        AFTER DELETE ON time_entries
+        BEGIN
+            {apply_entry("OLD", -1)}
+            {delete_empty("OLD")}
+        END;"""
+    )
+    # Finishing an entry, or moving it to another day or activity,
+    # moves its seconds and XP to the new totals
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_time_entries_update_totals
+        AFTER UPDATE OF user_id, {activity}, duration_seconds,
+        end_timestamp, day_key ON time_entries
+        BEGIN
+            {apply_entry("OLD", -1)}
+            {delete_empty("OLD")}
+            {apply_entry("NEW", 1)}
+        END;"""
+    )
+
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_xp_transactions_insert_totals
+        AFTER INSERT ON xp_transactions
+        BEGIN
+            {apply_xp("NEW", 1)}
+        END;"""
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_xp_transactions_delete_totals
+        AFTER DELETE ON xp_transactions
+        BEGIN
+            {apply_xp("OLD", -1)}
+        END;"""
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_xp_transactions_update_totals
+        AFTER UPDATE OF user_id, xp_amount, source_type, source_id
+        ON xp_transactions
+        BEGIN
+            {apply_xp("OLD", -1)}
+            {apply_xp("NEW", 1)}
+        END;"""
+    )
+
+    for query in _get_rebuild_queries(activity):
+        cur.execute(query)
+
+
+def _add_activity_day_totals(cur: sqlite3.Cursor) -> None:
+    """
+    Adds totals of tracked seconds, finished sessions and earned XP
+    per user, day and activity, kept current by triggers
+    on time entries and XP transactions
+    Statistics read a row per day and activity
+    instead of summarizing the whole history
+    """
+    _create_activity_day_totals(cur, "activity_name", "TEXT")
+
+
+def _reference_activities_by_id(cur: sqlite3.Cursor) -> None:
+    """
+    Replaces activity names of time entries with activity IDs
+    Names of entries without an activity (e.g. of deleted activities)
+    get archived activities, entries of activities sharing a name
+    reference the oldest of them
+    Activities are archived instead of being deleted from now on,
+    so that their entries keep the name
+    """
+    cur.execute(
+        "ALTER TABLE activities ADD COLUMN is_archived INTEGER NOT NULL DEFAULT 0;"
+    )
+    cur.execute(
+        """
+        INSERT INTO activities (user_id, name, is_archived)
+        SELECT DISTINCT te.user_id, te.activity_name, 1
+        FROM time_entries te
+        WHERE NOT EXISTS (
+            SELECT 1 FROM activities a
+            WHERE a.user_id = te.user_id
+            AND a.name = te.activity_name
+        );"""
+    )
+
+    # Triggers referencing time entries can't outlive the table,
+    # the totals are rebuilt keyed by activity ID below
+    for trigger in ACTIVITY_DAY_TOTALS_TRIGGERS:
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger};")
+    cur.execute("DROP TABLE IF EXISTS activity_day_totals;")
+
+    # SQLite can't change columns in place, so the table is copied
+    cur.execute(
+        """
+        CREATE TABLE time_entries_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            activity_id INTEGER NOT NULL,
+            start_time TEXT,
+            duration TEXT,
+            duration_seconds INTEGER,
+            end_time TEXT,
+            start_timestamp INTEGER,
+            end_timestamp INTEGER,
+            day_key INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (activity_id) REFERENCES activities(id)
+        );"""
+    )
+    cur.execute(
+        """
+        INSERT INTO time_entries_new (
+        id, user_id, activity_id, start_time, duration, duration_seconds,
+        end_time, start_timestamp, end_timestamp, day_key)
+        SELECT te.id, te.user_id, a.id, te.start_time, te.duration,
+        te.duration_seconds, te.end_time, te.start_timestamp,
+        te.end_timestamp, te.day_key
+        FROM time_entries te
+        JOIN (
+            SELECT user_id, name, MIN(id) AS id
+            FROM activities
+            GROUP BY user_id, name
+        ) a ON a.user_id = te.user_id AND a.name = te.activity_name;"""
+    )
+    # Last used ID is kept, so IDs of deleted entries stay unused
+    cur.execute("DELETE FROM sqlite_sequence WHERE name = 'time_entries_new';")
+    cur.execute(
+        """
+        UPDATE sqlite_sequence SET name = 'time_entries_new'
+        WHERE name = 'time_entries';"""
+    )
+    cur.execute("DROP TABLE time_entries;")
+    cur.execute("ALTER TABLE time_entries_new RENAME TO time_entries;")
+
+    # Indexes and triggers are dropped together with the old table
+    cur.execute("CREATE INDEX idx_time_entries_user_id ON time_entries (user_id);")
+    cur.execute(
+        "CREATE INDEX idx_time_entries_user_day ON time_entries (user_id, day_key);"
+    )
+    cur.execute(
+        "CREATE INDEX idx_time_entries_activity_id ON time_entries (activity_id);"
+    )
+    _create_generation_triggers(cur, "time_entries")
+
+    _create_activity_day_totals(cur, "activity_id", "INTEGER")
+
+
+def _index_open_time_entries(cur: sqlite3.Cursor) -> None:
+    """
+    Adds a partial index of entries that were started but not finished,
+    so they can be found at startup without reading the finished ones
+    Open entries created before start times were saved at start
+    can't be recovered and are removed
+    """
+    cur.execute(
+        """
+        DELETE FROM time_entries
+        WHERE end_timestamp IS NULL
+        AND start_timestamp IS NULL;"""
+    )
+    cur.execute(
+        """
+        CREATE INDEX idx_time_entries_open
+        ON time_entries (user_id)
+        WHERE end_timestamp IS NULL;"""
+    )
+
+
+def _add_time_entry_checkpoints(cur: sqlite3.Cursor) -> None:
+    """
+    Adds the last checkpoint of open entries: when it was written,
+    seconds tracked until then and XP expected for them
+    Separate from the finished columns, so checkpoints don't touch
+    activity day totals and an entry is still finished by its end timestamp
+    """
+    cur.execute("ALTER TABLE time_entries ADD COLUMN checkpoint_timestamp INTEGER;")
+    cur.execute("ALTER TABLE time_entries ADD COLUMN checkpoint_seconds INTEGER;")
+    cur.execute("ALTER TABLE time_entries ADD COLUMN provisional_xp INTEGER;")
+
+
+def _skip_generation_for_open_entries(cur: sqlite3.Cursor) -> None:
+    """
+    Recreates generation triggers of time entries, so that starting,
+    checkpointing or discarding an open entry doesn't invalidate
+    cached data, which only ever contains finished entries
+    """
+    conditions = {
+        "INSERT": "NEW.end_timestamp IS NOT NULL",
+        "UPDATE": "OLD.end_timestamp IS NOT NULL OR NEW.end_timestamp IS NOT NULL",
+        "DELETE": "OLD.end_timestamp IS NOT NULL",
+    }
+
+    for operation, condition in conditions.items():
+        trigger = f"trg_time_entries_{operation.lower()}_generation"
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger};")
+        cur.execute(
+            f"""
+            CREATE TRIGGER {trigger}
+            AFTER {operation} ON time_entries
+            WHEN {condition}
+            BEGIN
+                UPDATE database_generation
+                SET generation = generation + 1 WHERE id = 1;
+            END;"""
+        )
+
+
+def _index_history_by_start_time(cur: sqlite3.Cursor) -> None:
+    """
+    Adds a partial index of finished entries ordered by start time,
+    history is paged by it, since imported entries get IDs
+    above the existing ones regardless of when they happened
+    """
+    cur.execute(
+        """
+        CREATE INDEX idx_time_entries_history
+        ON time_entries (user_id, start_timestamp)
+        WHERE end_timestamp IS NOT NULL;"""
+    )
+
+
+MIGRATIONS = [
+    _add_epoch_timestamps,
+    _add_database_generation,
+    _add_activity_day_totals,
+    _reference_activities_by_id,
+    _index_open_time_entries,
+    _add_time_entry_checkpoints,
+    _skip_generation_for_open_entries,
+    _index_history_by_start_time,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection, logger) -> int:
+    """
+    Applies every migration newer than the database schema version
+    Each migration is committed together with its version number,
+    so a failed migration leaves the database at the previous version
+    Returns the resulting schema version
+    """
+    version = get_schema_version(conn)
+
+    if version > SCHEMA_VERSION:
+        logger.warning(
+            "Database schema version %s is newer than the supported version %s",
+            version,
+            SCHEMA_VERSION,
+        )
+        return version
+
+    for migration in MIGRATIONS[version:]:
+        logger.info("Migrating database schema to version %s", version + 1)
+
+        with conn:
+            cur = conn.cursor()
+            # DDL statements don't open a transaction implicitly
+            cur.execute("BEGIN;")
+            migration(cur)
+            # PRAGMA doesn't accept parameters
+            cur.execute(f"PRAGMA user_version = {version + 1};")
+
+        version += 1
+
+    return version
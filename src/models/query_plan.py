@@ -0,0 +1,214 @@
+"""
+Verifies that no query made by Database scans a whole table
+
+Every public Database method is called against a temporary database
+while the executed statements are recorded, then each recorded statement
+is run through EXPLAIN QUERY PLAN. Statements in trigger bodies aren't
+recorded on their own, so they are read from sqlite_master and explained
+with their NEW and OLD column references bound as parameters
+
+Usage:
+    python -m src.models.query_plan
+Exits with code 1 if any query scans a table
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+from .database import Database
+
+# Statements that don't read tables and can't be explained
+SKIPPED_STATEMENT_PREFIXES = ("BEGIN", "COMMIT", "ROLLBACK", "CREATE", "PRAGMA")
+# Tables that may be scanned, sqlite_sequence only holds
+# a row per AUTOINCREMENT table and can't be indexed
+SCANNED_TABLES = ("sqlite_sequence",)
+# Plan details that start with SCAN but don't read a table,
+# a SELECT without FROM, as in the trigger upserts, scans a constant row
+NON_TABLE_SCANS = ("SCAN CONSTANT ROW",)
+# Older SQLite trace callbacks report each fired trigger
+# as a "-- TRIGGER <name>" comment line, which has no plan
+TRIGGER_TRACE_PREFIX = "--"
+# Body of a CREATE TRIGGER statement
+TRIGGER_BODY_PATTERN = re.compile(r"\bBEGIN\b(.*)\bEND\s*$", re.DOTALL | re.IGNORECASE)
+# NEW.column and OLD.column references inside a trigger body
+TRIGGER_ROW_REFERENCE_PATTERN = re.compile(r"\b(?:NEW|OLD)\.\w+", re.IGNORECASE)
+
+
+def exercise_database(database: Database) -> None:
+    """
+    Calls every public Database method at least once,
+    except rebuilding and verifying activity day totals
+    which read whole tables by design
+    """
+    user_id = database.initialize_default_user()
+
+    activity_id = database.add_new_activity("Query plan check", user_id)
+    database.get_user_activities(user_id)
+    database.get_user_activities(user_id, include_archived=True)
+
+    entry_id = database.start_time_entry(activity_id, 1704103200, user_id)
+    database.checkpoint_time_entry(entry_id, 1704103230, 30, 0)
+    database.get_open_time_entries(user_id)
+    database.stop_time_entry(entry_id, 1704103200, 1704103260, 60, "0:01:00")
+    database.insert_into_xp_transactions(5, "time_session", entry_id, user_id)
+
+    entry_id = database.start_time_entry(activity_id, 1704106800, user_id)
+    database.finish_time_session(
+        entry_id,
+        1704106800,
+        1704106860,
+        60,
+        "0:01:00",
+        5,
+        user_id,
+    )
+
+    database.import_time_entries(
+        [(activity_id, 1704110400, 1704110460, 60, "0:01:00", 5)], user_id
+    )
+
+    history_entries = database.get_history_time_entries(10, user_id)
+    database.get_history_time_entries(10, user_id, history_entries[0])
+    database.count_user_history_entries(user_id)
+    list(database.iter_finished_time_entries(user_id))
+    list(
+        database.iter_finished_time_entries(
+            user_id, 20240101, 20240131, "Query plan check"
+        )
+    )
+    database.get_user_total_time_spent(user_id)
+    database.get_activity_day_totals(user_id)
+    database.get_activity_day_totals(user_id, 20240101, 20240131)
+    database.get_activity_totals(user_id)
+    database.get_daily_totals(user_id)
+    database.get_user_total_xp(user_id)
+    database.get_user_xp(user_id)
+    database.get_user_level(user_id)
+    database.set_user_xp(10, user_id)
+    database.set_user_level(1, user_id)
+    database.get_generation()
+    database.delete_time_entry(entry_id, user_id)
+    database.delete_user_activity(activity_id, user_id)
+
+
+def record_statements(database: Database) -> list:
+    """
+    Runs exercise_database and returns every executed statement
+    with its parameters already bound
+    """
+    statements = []
+
+    conn = database.connection_manager.get_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        exercise_database(database)
+    finally:
+        conn.set_trace_callback(None)
+
+    return statements
+
+
+def get_trigger_statements(conn: sqlite3.Connection) -> list:
+    """
+    Returns a list of (trigger name, statement, parameter count) tuples
+    for every statement in the body of every trigger,
+    with NEW and OLD column references replaced by parameters
+    """
+    trigger_statements = []
+
+    triggers = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name;"
+    ).fetchall()
+
+    for name, sql in triggers:
+        body = TRIGGER_BODY_PATTERN.search(sql)
+        if body is None:
+            continue
+
+        # Trigger bodies don't contain string literals with semicolons
+        for statement in body.group(1).split(";"):
+            if not statement.strip():
+                continue
+            statement, parameter_count = TRIGGER_ROW_REFERENCE_PATTERN.subn(
+                "?", statement
+            )
+            trigger_statements.append((name, statement, parameter_count))
+
+    return trigger_statements
+
+
+def get_scan_details(
+    conn: sqlite3.Connection, statement: str, parameters: tuple = ()
+) -> list:
+    """
+    Returns the EXPLAIN QUERY PLAN details of a statement
+    that scan a table which isn't allowed to be scanned
+    """
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+
+    scan_details = []
+    for row in plan:
+        # Each row is (id, parent, notused, detail)
+        detail = row[3]
+        if not detail.startswith("SCAN") or detail.startswith(NON_TABLE_SCANS):
+            continue
+        if detail.split()[1] not in SCANNED_TABLES:
+            scan_details.append(detail)
+
+    return scan_details
+
+
+def find_table_scans(database: Database) -> list:
+    """
+    Returns a list of (statement, plan detail) tuples
+    for every recorded statement and every trigger body statement
+    that scans a table
+    """
+    conn = database.connection_manager.get_connection()
+    table_scans = []
+
+    for statement in record_statements(database):
+        statement_start = statement.strip().upper()
+        if statement_start.startswith(TRIGGER_TRACE_PREFIX):
+            continue
+        if statement_start.startswith(SKIPPED_STATEMENT_PREFIXES):
+            continue
+
+        for detail in get_scan_details(conn, statement):
+            table_scans.append((statement, detail))
+
+    for name, statement, parameter_count in get_trigger_statements(conn):
+        parameters = (0,) * parameter_count
+        for detail in get_scan_details(conn, statement, parameters):
+            table_scans.append((f"-- TRIGGER {name}\n{statement.strip()}", detail))
+
+    return table_scans
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database = Database(os.path.join(temp_dir, "query_plan.db"))
+        try:
+            table_scans = find_table_scans(database)
+        except sqlite3.Error as e:
+            print(f"Database error while checking query plans: {e}")
+            return 1
+        finally:
+            database.close()
+
+    if not table_scans:
+        print("No table scans found")
+        return 0
+
+    for statement, detail in table_scans:
+        print(f"{detail}:\n{statement.strip()}\n")
+
+    print(f"Found {len(table_scans)} table scan(s)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
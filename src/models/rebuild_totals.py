@@ -0,0 +1,63 @@
+"""
+Rebuilds activity day totals from time entries and XP transactions
+
+The totals are kept current by triggers, rebuilding them is only needed
+to verify the triggers or to repair totals changed by hand
+
+Usage:
+    python -m src.models.rebuild_totals
+    python -m src.models.rebuild_totals --check --db test.db
+With --check nothing is written and the command exits with code 1
+if the stored totals differ from the recomputed ones
+"""
+
+import argparse
+import sys
+
+from .database import Database
+from ..utils.constants import DB_NAME
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Rebuild activity day totals from raw time entries"
+    )
+    parser.add_argument("--db", default=DB_NAME, help="database to rebuild")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only compare stored totals with recomputed ones",
+    )
+    args = parser.parse_args(arguments)
+
+    database = Database(args.db)
+    try:
+        if args.check:
+            mismatches_count = database.count_activity_day_totals_mismatches()
+        else:
+            rows_count = database.rebuild_activity_day_totals()
+    finally:
+        database.close()
+
+    if args.check:
+        if mismatches_count == -1:
+            print("Failed to verify activity day totals")
+            return 1
+
+        if mismatches_count:
+            print(f"Found {mismatches_count} mismatched activity day total(s)")
+            return 1
+
+        print("Activity day totals match time entries")
+        return 0
+
+    if rows_count == -1:
+        print("Failed to rebuild activity day totals")
+        return 1
+
+    print(f"Rebuilt {rows_count} activity day totals")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
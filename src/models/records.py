@@ -0,0 +1,135 @@
+"""
+Lightweight records of rows read by the Database
+
+Records are built straight from the selected row tuples,
+their __slots__ define both the attributes and the order
+in which the Database selects the columns
+"""
+
+
+class TimeEntryRecord:
+    """Time entry as displayed in the history"""
+
+    __slots__ = ("id", "activity_name", "duration", "start_timestamp", "day_key")
+
+    def __init__(
+        self,
+        id: int,
+        activity_name: str,
+        duration: str,
+        start_timestamp: int,
+        day_key: int,
+    ):
+        self.id = id
+        self.activity_name = activity_name
+        self.duration = duration
+        self.start_timestamp = start_timestamp
+        self.day_key = day_key
+
+    def __repr__(self) -> str:
+        return f"TimeEntryRecord({self.id}, {self.activity_name!r}, {self.duration!r})"
+
+    # Public interface methods
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(*[data[name] for name in cls.__slots__])
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class OpenTimeEntryRecord:
+    """Time entry that was started but not finished yet"""
+
+    __slots__ = (
+        "id",
+        "activity_id",
+        "activity_name",
+        "start_timestamp",
+        "checkpoint_timestamp",
+        "checkpoint_seconds",
+        "provisional_xp",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        activity_id: int,
+        activity_name: str,
+        start_timestamp: int,
+        checkpoint_timestamp: int,
+        checkpoint_seconds: int,
+        provisional_xp: int,
+    ):
+        self.id = id
+        self.activity_id = activity_id
+        self.activity_name = activity_name
+        self.start_timestamp = start_timestamp
+        # Last checkpoint of the entry, None if there was none
+        self.checkpoint_timestamp = checkpoint_timestamp
+        self.checkpoint_seconds = checkpoint_seconds
+        self.provisional_xp = provisional_xp
+
+    def __repr__(self) -> str:
+        return (
+            f"OpenTimeEntryRecord({self.id}, {self.activity_name!r},"
+            f" {self.start_timestamp})"
+        )
+
+
+class ActivityRecord:
+    """User's pre-defined activity"""
+
+    __slots__ = ("id", "name")
+
+    # Columns to select, in the order taken by the constructor
+    COLUMNS = ", ".join(__slots__)
+
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"ActivityRecord({self.id}, {self.name!r})"
+
+    # Public interface methods
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(*[data[name] for name in cls.__slots__])
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ActivityDayTotalRecord:
+    """Tracked totals of an activity on a single day"""
+
+    __slots__ = (
+        "day_key",
+        "activity_name",
+        "total_seconds",
+        "sessions_count",
+        "total_xp",
+    )
+
+    def __init__(
+        self,
+        day_key: int,
+        activity_name: str,
+        total_seconds: int,
+        sessions_count: int,
+        total_xp: int,
+    ):
+        self.day_key = day_key
+        self.activity_name = activity_name
+        self.total_seconds = total_seconds
+        self.sessions_count = sessions_count
+        self.total_xp = total_xp
+
+    def __repr__(self) -> str:
+        return (
+            f"ActivityDayTotalRecord({self.day_key}, {self.activity_name!r},"
+            f" {self.total_seconds})"
+        )
@@ -0,0 +1,161 @@
+import json
+import os
+
+from .records import ActivityRecord, TimeEntryRecord
+from ..utils.constants import DEFAULT_HISTORY_ENTRIES_DISPLAYED
+from ..utils.logger import setup_logger
+
+# Snapshots of another format version are ignored
+SNAPSHOT_FORMAT_VERSION = 2
+
+
+class StartupSnapshot:
+    """
+    Last known user's data written to disk on shutdown,
+    so the next startup can display it before querying the database
+
+    The snapshot stores the database generation it was read at,
+    it is stale once the generation of the database differs
+
+    Attributes:
+        db_path: Absolute path of the database the snapshot was read from
+        generation: Database generation the snapshot was read at
+        user_id, user_xp, user_level: User's statistic
+        activities: User's activities as returned by Database.get_user_activities
+        history_entries: First page of the history time entries as returned
+            by Database.get_history_time_entries
+        history_entries_count: Total number of history time entries
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        generation: int,
+        user_id: int,
+        user_xp: int,
+        user_level: int,
+        activities: list,
+        history_entries: list,
+        history_entries_count: int,
+    ):
+        self.db_path = db_path
+        self.generation = generation
+        self.user_id = user_id
+        self.user_xp = user_xp
+        self.user_level = user_level
+        self.activities = activities
+        self.history_entries = history_entries
+        self.history_entries_count = history_entries_count
+
+    # Public interface methods
+
+    @classmethod
+    def capture(cls, database, user_id: int):
+        """
+        Reads a snapshot of the user's data from the database
+        Returns None if the database generation can't be read
+        """
+        generation = database.get_generation()
+
+        if generation is None:
+            return None
+
+        entries_count = database.count_user_history_entries(user_id)
+
+        return cls(
+            os.path.abspath(database.connection_manager.db_name),
+            generation,
+            user_id,
+            database.get_user_xp(user_id),
+            database.get_user_level(user_id),
+            database.get_user_activities(user_id),
+            database.get_history_time_entries(
+                DEFAULT_HISTORY_ENTRIES_DISPLAYED, user_id
+            ),
+            entries_count[0] if entries_count else 0,
+        )
+
+    @classmethod
+    def load(cls, file_path: str, database):
+        """
+        Reads the snapshot written for the database
+        Returns None if there is no snapshot or it can't be used
+        """
+        logger = setup_logger("models")
+
+        try:
+            with open(file_path) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to read startup snapshot: %s", e)
+            return None
+
+        if data.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            return None
+
+        db_path = os.path.abspath(database.connection_manager.db_name)
+
+        if data.get("db_path") != db_path:
+            logger.debug("Startup snapshot was written for another database")
+            return None
+
+        try:
+            return cls(
+                data["db_path"],
+                data["generation"],
+                data["user_id"],
+                data["user_xp"],
+                data["user_level"],
+                _load_records(ActivityRecord, data["activities"]),
+                _load_records(TimeEntryRecord, data["history_entries"]),
+                data["history_entries_count"],
+            )
+        except (KeyError, TypeError) as e:
+            logger.warning("Startup snapshot is invalid: %s", e)
+            return None
+
+    def save(self, file_path: str) -> None:
+        """Writes the snapshot, an existing one is replaced atomically"""
+        data = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "db_path": self.db_path,
+            "generation": self.generation,
+            "user_id": self.user_id,
+            "user_xp": self.user_xp,
+            "user_level": self.user_level,
+            "activities": _dump_records(self.activities),
+            "history_entries": _dump_records(self.history_entries),
+            "history_entries_count": self.history_entries_count,
+        }
+
+        temp_file_path = f"{file_path}.tmp"
+
+        try:
+            with open(temp_file_path, "w") as file:
+                # Compact, the snapshot is read on every startup
+                json.dump(data, file, separators=(",", ":"))
+            os.replace(temp_file_path, file_path)
+        except OSError as e:
+            setup_logger("models").warning("Failed to write startup snapshot: %s", e)
+
+    def is_current(self, generation: int) -> bool:
+        """Returns True if nothing has changed since the snapshot was read"""
+        return generation is not None and generation == self.generation
+
+
+def _dump_records(records):
+    """Converts records to JSON-compatible dictionaries, None is kept as is"""
+    if records is None:
+        return None
+
+    return [record.to_dict() for record in records]
+
+
+def _load_records(record_class, data):
+    """Converts dictionaries written by _dump_records back to records"""
+    if data is None:
+        return None
+
+    return [record_class.from_dict(item) for item in data]
@@ -0,0 +1,156 @@
+from datetime import date, timedelta
+
+from .database import Database
+from ..utils.constants import STATISTICS_HEATMAP_WEEKS
+from ..utils.instrumentation import instrumented
+from ..utils.logger import setup_logger
+
+
+class Statistics:
+    """
+    User's statistics displayed by the statistics window
+
+    Attributes:
+        activity_totals: ActivityDayTotalRecord per activity,
+            from the most tracked one
+        total_seconds, total_sessions, total_xp: Totals of every finished entry
+        current_streak: Days in a row with tracked time ending today,
+            or yesterday if nothing is tracked today yet
+        longest_streak: Most days in a row with tracked time
+        daily_heatmap: Tracked seconds of the last STATISTICS_HEATMAP_WEEKS weeks,
+            a list of weeks from Monday to Sunday, days after today are None
+        weekly_heatmap: Tracked seconds of the same weeks
+        heatmap_start: Monday of the first heatmap week
+        xp_over_time: (day_key, total XP earned up to that day) tuples
+            of every day with tracked time
+    """
+
+    def __init__(self, activity_totals: list, daily_totals: list, today: date):
+        self.activity_totals = activity_totals
+
+        self.total_seconds = sum(day.total_seconds for day in daily_totals)
+        self.total_sessions = sum(day.sessions_count for day in daily_totals)
+        self.total_xp = sum(day.total_xp for day in daily_totals)
+
+        seconds_by_day = {day.day_key: day.total_seconds for day in daily_totals}
+
+        self.current_streak, self.longest_streak = _compute_streaks(
+            seconds_by_day, today
+        )
+        self.heatmap_start, self.daily_heatmap = _build_daily_heatmap(
+            seconds_by_day, today
+        )
+        self.weekly_heatmap = [
+            sum(seconds or 0 for seconds in week) for week in self.daily_heatmap
+        ]
+
+        self.xp_over_time = []
+        earned_xp = 0
+        for day in daily_totals:
+            earned_xp += day.total_xp
+            self.xp_over_time.append((day.day_key, earned_xp))
+
+
+class StatisticsModel:
+    """
+    Computes user's statistics from activity day totals
+
+    Statistics are computed on the database worker if it is available
+    and cached together with the database generation they were read at,
+    so they are only computed again after time entries have changed
+    """
+
+    def __init__(self, database, user_model, database_worker=None):
+        self.db = database
+        self.user_model = user_model
+        self.db_worker = database_worker
+        self.logger = setup_logger("models")
+
+        self.cached_statistics = None
+        # (database generation, date) the cached statistics were computed at,
+        # streaks depend on the current date as well
+        self.cached_statistics_key = None
+
+    # Public interface methods
+
+    def load_statistics(self, on_loaded) -> None:
+        """
+        Calls on_loaded with the Statistics on the GUI thread,
+        or with None if they couldn't be loaded
+        Cached statistics are reused if the database hasn't changed
+        """
+        if self.db_worker is None:
+            on_loaded(self.get_statistics())
+            return
+
+        self.db_worker.submit(self.get_statistics, callback=on_loaded)
+
+    @instrumented()
+    def get_statistics(self) -> Statistics:
+        """Returns cached statistics or computes them if they are stale"""
+        generation = self.db.get_generation()
+        today = date.today()
+        statistics_key = (generation, today)
+
+        if generation is not None and statistics_key == self.cached_statistics_key:
+            return self.cached_statistics
+
+        self.logger.debug("Computing statistics at database generation %s", generation)
+
+        user_id = self.user_model.current_user_id
+        statistics = Statistics(
+            self.db.get_activity_totals(user_id),
+            self.db.get_daily_totals(user_id),
+            today,
+        )
+
+        self.cached_statistics = statistics
+        self.cached_statistics_key = statistics_key
+        return statistics
+
+
+def _compute_streaks(seconds_by_day: dict, today: date) -> tuple:
+    """Returns current and longest number of days in a row with tracked time"""
+    longest_streak = 0
+    streak = 0
+    previous_day = None
+
+    for day_key in sorted(seconds_by_day):
+        day = date(day_key // 10000, day_key // 100 % 100, day_key % 100)
+
+        if previous_day is not None and day - previous_day == timedelta(days=1):
+            streak += 1
+        else:
+            streak = 1
+
+        longest_streak = max(longest_streak, streak)
+        previous_day = day
+
+    # Streak isn't broken until a whole day passes without tracked time
+    if previous_day is None or (today - previous_day).days > 1:
+        return 0, longest_streak
+
+    return streak, longest_streak
+
+
+def _build_daily_heatmap(seconds_by_day: dict, today: date) -> tuple:
+    """Returns Monday of the first heatmap week and the heatmap weeks"""
+    heatmap_start = today - timedelta(
+        days=today.weekday(), weeks=STATISTICS_HEATMAP_WEEKS - 1
+    )
+
+    weeks = []
+    for week in range(STATISTICS_HEATMAP_WEEKS):
+        week_days = []
+
+        for weekday in range(7):
+            day = heatmap_start + timedelta(weeks=week, days=weekday)
+
+            if day > today:
+                week_days.append(None)
+            else:
+                week_days.append(seconds_by_day.get(Database.get_day_key(day), 0))
+
+        weeks.append(week_days)
+
+    return heatmap_start, weeks
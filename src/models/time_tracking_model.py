@@ -1,21 +1,25 @@
 from datetime import datetime
-from random import randint
-from PyQt6.QtCore import *
-from PyQt6.QtWidgets import QListWidgetItem
 
+from .records import ActivityRecord, OpenTimeEntryRecord, TimeEntryRecord
+from .xp_engine import XpEngine
+from ..utils.instrumentation import instrumented
 from ..utils.logger import setup_logger
 from ..utils.constants import (
     MOB_XP_RATES,
-    TIME_FORMAT,
     HISTORY_TIME_FORMAT,
     DEFAULT_HISTORY_ENTRIES_DISPLAYED,
 )
 
 
 class TimeTrackingModel:
-    def __init__(self, database, user_model):
+    def __init__(self, database, user_model, database_worker=None, xp_seed=None):
         self.db = database
-        self.logger = setup_logger()
+        # Runs writes in the background if provided,
+        # otherwise they are done synchronously
+        self.db_worker = database_worker
+        # Seed makes XP rewards reproducible
+        self.xp_engine = XpEngine(xp_seed)
+        self.logger = setup_logger("models")
         self.user_model = user_model
 
         self.is_timer_running = False
@@ -24,61 +28,155 @@ class TimeTrackingModel:
         self.current_entry_id = 0
         # Stores the start time of currenly tracked time entry
         self.start_time = None
-
-        # Keeps track of currently selected item
-        # and its delete button in the history list
-        self.current_selected_item = None
-        self.current_delete_btn = None
+        # Stores activity name of currently tracked time entry
+        self.current_activity_name = None
+        # True while a checkpoint of the tracked entry waits to be saved
+        self.is_checkpoint_pending = False
 
         self.user_has_activities = None
 
-        self.total_history_entries_count = self.count_history_time_entries()
+        # Counted by load_history_entries_count once the window is shown,
+        # afterwards kept up to date on every stop and delete
+        self.total_history_entries_count = 0
 
     # Timer Core Functions
 
-    def start_time_tracking(self, activity_name: str) -> bool:
+    def start_time_tracking(self, activity: ActivityRecord) -> bool:
         if self.is_timer_running:
             return False
 
         user_id = self.user_model.current_user_id
         self.start_time = datetime.now().timestamp()
-        self.current_entry_id = self.db.start_time_entry(activity_name, user_id)
+        self.current_entry_id = self.db.start_time_entry(
+            activity.id, int(self.start_time), user_id
+        )
 
         if self.current_entry_id == -1:
             self.logger.error("Error in timer_model: returned user's ID is -1")
             return False
 
+        self.current_activity_name = activity.name
         self.is_timer_running = True
         return True
 
-    def stop_time_tracking(self) -> None:
+    def stop_time_tracking(self, on_finished=None) -> None:
+        """
+        Stops time tracking and saves the finished time session
+
+        Args:
+            on_finished: If provided, the session is saved on the database
+                worker and on_finished is called once it is saved,
+                otherwise the session is saved synchronously
+                Called with the finished entry as a TimeEntryRecord,
+                or None if saving failed
+        """
         if not self.is_timer_running:
             return False
 
-        end_time = datetime.now().timestamp()
-        duration_seconds = int(end_time - self.start_time)
-        formatted_duration = self._format_duration(duration_seconds)
+        entry_id = self.current_entry_id
+        activity_name = self.current_activity_name
+        start_time = self.start_time
+
+        self.start_time = None
+        self.current_entry_id = None
+        self.current_activity_name = None
+        self.is_timer_running = False
 
-        formatted_start_time = datetime.fromtimestamp(self.start_time).strftime(
-            TIME_FORMAT
+        self._save_time_session(
+            entry_id,
+            activity_name,
+            start_time,
+            datetime.now().timestamp(),
+            on_finished,
         )
-        formatted_end_time = datetime.fromtimestamp(end_time).strftime(TIME_FORMAT)
 
-        self.db.stop_time_entry(
-            self.current_entry_id,
-            formatted_start_time,
-            duration_seconds,
-            formatted_duration,
-            formatted_end_time,
+    # Recovery of Open Time Entries
+
+    def get_open_time_entries(self) -> list:
+        """
+        Returns entries left open by a previous run
+        (e.g. after a crash or quitting while tracking),
+        the currently tracked entry isn't included
+        """
+        open_entries = self.db.get_open_time_entries(self.user_model.current_user_id)
+        return [entry for entry in open_entries if entry.id != self.current_entry_id]
+
+    def resume_time_tracking(self, open_entry: OpenTimeEntryRecord) -> bool:
+        """
+        Continues tracking an open entry from the duration of its last checkpoint
+        Time since that checkpoint (e.g. while the app was closed) isn't counted,
+        the start time is moved forward by it and saved once the entry is stopped
+        """
+        if self.is_timer_running:
+            return False
+
+        self.start_time = datetime.now().timestamp() - (
+            open_entry.checkpoint_seconds or 0
         )
+        self.current_entry_id = open_entry.id
+        self.current_activity_name = open_entry.activity_name
+        self.is_timer_running = True
+        return True
 
-        earned_xp = self._calculate_earned_xp_for_time_session(duration_seconds)
-        self.give_time_session_reward(earned_xp, self.current_entry_id)
+    def close_open_time_entry(
+        self, open_entry: OpenTimeEntryRecord, on_finished=None
+    ) -> None:
+        """
+        Finishes an open entry with the duration of its last checkpoint
+        and rewards it with the provisional XP saved for that duration
+        Entries without a checkpoint are finished without any tracked time
+        on_finished is used the same way as by stop_time_tracking
+        """
+        # Same duration as displayed when recovering and rewarded by the XP
+        end_time = open_entry.start_timestamp + (open_entry.checkpoint_seconds or 0)
+        earned_xp = open_entry.provisional_xp or 0
+
+        self._save_time_session(
+            open_entry.id,
+            open_entry.activity_name,
+            open_entry.start_timestamp,
+            end_time,
+            on_finished,
+            earned_xp,
+        )
 
-        self.start_time = None
-        self.current_entry_id = None
-        self.is_timer_running = False
-        self.total_history_entries_count += 1
+    def discard_open_time_entry(self, open_entry: OpenTimeEntryRecord) -> None:
+        """Deletes an open entry, it has no XP to take back yet"""
+        self._run_database_task(
+            self.db.delete_time_entry,
+            (open_entry.id, self.user_model.current_user_id),
+            self._on_open_time_entry_discarded,
+            in_background=True,
+        )
+
+    def checkpoint_time_tracking(self) -> None:
+        """
+        Saves elapsed duration and provisional XP of the tracked entry
+        on the database worker, so the timer display is never delayed
+        Skipped while the previous checkpoint is still queued,
+        the next one saves the newer values instead
+        """
+        if not self.is_timer_running or self.is_checkpoint_pending:
+            return
+
+        checkpoint_timestamp = int(datetime.now().timestamp())
+        duration_seconds = checkpoint_timestamp - int(self.start_time)
+        provisional_xp = self.xp_engine.provisional_session_xp(
+            duration_seconds, MOB_XP_RATES[self._get_selected_mob()]
+        )
+
+        self.is_checkpoint_pending = True
+        self._run_database_task(
+            self.db.checkpoint_time_entry,
+            (
+                self.current_entry_id,
+                checkpoint_timestamp,
+                duration_seconds,
+                provisional_xp,
+            ),
+            self._on_checkpoint_saved,
+            in_background=True,
+        )
 
     def get_formatted_elapsed_time_since_start(self) -> str:
         """
@@ -89,42 +187,59 @@ class TimeTrackingModel:
             return "0:00:00"
 
         duration = datetime.now().timestamp() - self.start_time
-        return self._format_duration(duration)
+        return self.format_duration(duration)
 
     # Time Entries History Functions
 
     def get_history_time_entries(
-        self, entries_quantity: int = DEFAULT_HISTORY_ENTRIES_DISPLAYED
+        self,
+        page_size: int = DEFAULT_HISTORY_ENTRIES_DISPLAYED,
+        after_entry: TimeEntryRecord = None,
     ) -> list:
         """
-        Retrieve certain number of history time entries from the database
+        Retrieve one page of history time entries from the database
+        The page starts right after after_entry
+        or with the most recent entry if after_entry is None
         """
         self.logger.debug(
-            f"Attempting to retrieve {entries_quantity} history time entries"
+            "Attempting to retrieve %s history time entries after entry: %s",
+            page_size,
+            after_entry,
         )
 
         time_entries: list = self.db.get_history_time_entries(
-            entries_quantity, self.user_model.current_user_id
+            page_size, self.user_model.current_user_id, after_entry
         )
 
         if not time_entries:
             self.logger.info(
-                f"No time entries found for user with ID: {self.user_model.current_user_id}"
+                "No time entries found for user with ID: %s",
+                self.user_model.current_user_id,
             )
             return None
 
         self.logger.debug(
-            f"{len(time_entries)} time entries were returned from the database"
+            "%s time entries were returned from the database", len(time_entries)
         )
         return time_entries
 
-    def convert_start_time_to_history_date(self, start_time: str) -> str:
+    def convert_timestamp_to_history_date(self, timestamp: int) -> str:
         """
-        Converts the database time string to
+        Converts the database start timestamp to
         time entries history date format
         """
-        datetime_object = datetime.strptime(start_time, TIME_FORMAT)
-        return datetime_object.strftime(HISTORY_TIME_FORMAT)
+        return datetime.fromtimestamp(timestamp).strftime(HISTORY_TIME_FORMAT)
+
+    @staticmethod
+    def format_duration(seconds: float) -> str:
+        """Converts exact seconds to formated hours, minutes and seconds"""
+        if seconds <= 0:
+            return "0:00:00"
+
+        hours = int(seconds // 3600)
+        minutes = int((seconds % 3600) // 60)
+        seconds = int(seconds % 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
 
     def get_user_activities(self):
         """
@@ -141,12 +256,35 @@ class TimeTrackingModel:
         self.user_has_activities = True
         return activities
 
-    def delete_history_time_entry(self, entry_id) -> None:
-        """Delete a history time entry from database"""
-        self.db.delete_time_entry(entry_id, self.user_model.current_user_id)
+    def delete_history_time_entry(self, entry_id, on_finished=None) -> None:
+        """
+        Delete a history time entry from database
+        and subtract its XP from user's statistic
+
+        Args:
+            on_finished: If provided, the entry is deleted on the database
+                worker and on_finished is called once user's statistic
+                is updated, otherwise everything is done synchronously
+                Called with True, or with False if deleting failed
+        """
         # Update total entries count
         self.total_history_entries_count -= 1
 
+        self._run_database_task(
+            self.db.delete_time_entry,
+            (entry_id, self.user_model.current_user_id),
+            lambda removed_xp: self._on_time_entry_deleted(removed_xp, on_finished),
+            in_background=on_finished is not None,
+        )
+
+    def load_history_entries_count(self, snapshot=None) -> None:
+        """Takes the count from the startup snapshot if provided"""
+        if snapshot is not None:
+            self.total_history_entries_count = snapshot.history_entries_count
+            return
+
+        self.total_history_entries_count = self.count_history_time_entries()
+
     def count_history_time_entries(self) -> int:
         """Count all the history time entries in the database"""
         user_id = self.user_model.current_user_id
@@ -160,57 +298,40 @@ class TimeTrackingModel:
             entries_count = 0
 
         self.logger.debug(
-            f"Current user has {entries_count} history time entries stored in the database"
+            "Current user has %s history time entries stored in the database",
+            entries_count,
         )
 
         return entries_count
 
     # XP and Rewards Functions
 
-    def give_time_session_reward(self, earned_xp: int, entry_id: int) -> None:
+    def give_time_session_reward(self, earned_xp: int) -> tuple:
         """
         Calculate user's statistic based on earned XP
-        Set new value in the 'users' table
-        Add a new entry to the 'xp_transactions' table
+        Returns new total XP and level as a tuple to be cached
+        The stored total is increased by earned XP when the session is saved
         """
         self.logger.debug("Attempting to give user a time tracking reward")
-        user_id = self.user_model.current_user_id
         user_total_xp = self.user_model.current_user_xp
 
-        # Update user's XP
         new_xp_amount = user_total_xp + earned_xp
-        self.user_model.set_user_xp(new_xp_amount)
-
-        self.logger.debug(f"User's total XP before the reward: {user_total_xp}")
-        self.logger.debug(f"User's total XP after the reward: {new_xp_amount}")
 
-        # Add entry to xp_transactions table
-        self.db.insert_into_xp_transactions(
-            xp_amount=earned_xp,
-            source_type="time_session",
-            source_id=entry_id,
-            user_id=user_id,
-        )
+        self.logger.debug("User's total XP before the reward: %s", user_total_xp)
+        self.logger.debug("User's total XP after the reward: %s", new_xp_amount)
 
-        # Update user's level
         new_user_level = self.user_model.evaluate_level(new_xp_amount)
 
         self.logger.debug(
-            f"User's level before the reward: {self.user_model.current_user_level}"
+            "User's level before the reward: %s", self.user_model.current_user_level
         )
-        self.logger.debug(f"User's level after the reward: {new_user_level}")
+        self.logger.debug("User's level after the reward: %s", new_user_level)
 
-        self.user_model.set_user_level(new_user_level, user_id)
+        return new_xp_amount, new_user_level
 
+    @instrumented()
     def _calculate_earned_xp_for_time_session(self, duration_seconds: int) -> int:
         self.logger.debug("Calculating earned XP for the time session")
-        earned_xp = 0
-
-        if duration_seconds <= 59:
-            return earned_xp
-
-        # Convert seconds to minutes
-        minutes_spent = int(duration_seconds / 60)
 
         selected_mob = self._get_selected_mob()
         xp_rate = MOB_XP_RATES[selected_mob]
@@ -218,50 +339,123 @@ class TimeTrackingModel:
         # If XP rate is a range
         if isinstance(xp_rate, list):
             self.logger.debug(
-                f"XP rate is randomly selected between {xp_rate[0]} and {xp_rate[1]}"
+                "XP rate is randomly selected between %s and %s", xp_rate[0], xp_rate[1]
             )
-            for _ in range(minutes_spent):
-                earned_xp += randint(xp_rate[0], xp_rate[1])
         # If XP rate is static
         else:
-            self.logger.debug(f"XP rate is: {xp_rate}")
-            earned_xp = minutes_spent * xp_rate
+            self.logger.debug("XP rate is: %s", xp_rate)
 
-        self.logger.info(f"XP reward for the time session: {earned_xp} XP")
+        earned_xp = self.xp_engine.session_xp(duration_seconds, xp_rate)
+
+        self.logger.info("XP reward for the time session: %s XP", earned_xp)
         return earned_xp
 
-    # UI Related Functions
+    # Helper Functions
 
-    def show_delete_button(self, item: QListWidgetItem):
+    def _run_database_task(
+        self, function, args: tuple, on_result, in_background: bool
+    ) -> None:
+        """
+        Runs database function on the database worker if in_background is True
+        and the worker is available, otherwise runs it synchronously
+        on_result is called with the function's result in both cases
         """
-        Show delete button of the selected item in the history list
-        Hide previosly showed delete button if any
+        if not in_background or self.db_worker is None:
+            on_result(function(*args))
+            return
+
+        self.db_worker.submit(function, *args, callback=on_result)
+
+    def _save_time_session(
+        self,
+        entry_id: int,
+        activity_name: str,
+        start_time: float,
+        end_time: float,
+        on_finished=None,
+        earned_xp: int = None,
+    ) -> None:
         """
-        # Hide delete button of previously selected item
-        if self.current_selected_item and self.current_delete_button:
-            self.current_delete_button.hide()
+        Rewards a finished session and saves it, see stop_time_tracking
+        The reward is calculated from the duration if earned_xp is None
+        """
+        duration_seconds = int(end_time - start_time)
+        formatted_duration = self.format_duration(duration_seconds)
 
-        # Get the delete button associated with clicked item
-        delete_button = item.data(Qt.ItemDataRole.UserRole)
+        if earned_xp is None:
+            earned_xp = self._calculate_earned_xp_for_time_session(duration_seconds)
 
-        # Show delete button of newly selected item
-        if delete_button:
-            delete_button.show()
-            self.current_selected_item = item
-            self.current_delete_button = delete_button
+        new_xp_amount, new_user_level = self.give_time_session_reward(earned_xp)
 
-    # Helper Functions
+        session = (
+            entry_id,
+            int(start_time),
+            int(end_time),
+            duration_seconds,
+            formatted_duration,
+            earned_xp,
+            self.user_model.current_user_id,
+        )
 
-    def _get_selected_mob(self) -> str:
-        return self.user_model.current_selected_mob
+        # Lets views show the entry without querying it back
+        finished_entry = TimeEntryRecord(
+            entry_id,
+            activity_name,
+            formatted_duration,
+            int(start_time),
+            self.db.get_day_key(datetime.fromtimestamp(start_time)),
+        )
 
-    @staticmethod
-    def _format_duration(seconds: float) -> str:
-        """Converts exact seconds to formated hours, minutes and seconds"""
-        if seconds <= 0:
-            return "0:00:00"
+        # Cached stats are updated right away so that the next session
+        # is rewarded on top of this one even before it is saved
+        self.user_model.apply_user_stats(new_xp_amount, new_user_level)
+        self.total_history_entries_count += 1
 
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = int(seconds % 60)
-        return f"{hours}:{minutes:02d}:{seconds:02d}"
+        # Entry, XP transaction and user's stats are saved in one transaction
+        self._run_database_task(
+            self.db.finish_time_session,
+            session,
+            lambda is_saved: self._on_time_session_saved(
+                is_saved, finished_entry, on_finished
+            ),
+            in_background=on_finished is not None,
+        )
+
+    def _on_time_session_saved(
+        self, is_saved: bool, finished_entry: TimeEntryRecord, on_finished=None
+    ) -> None:
+        if not is_saved:
+            self.logger.error("Failed to save finished time session")
+            # Bring cached stats back in line with the database
+            self.user_model.update_user_stats()
+            finished_entry = None
+
+        if on_finished is not None:
+            on_finished(finished_entry)
+
+    def _on_time_entry_deleted(self, removed_xp: int, on_finished=None) -> None:
+        if removed_xp is None:
+            self.logger.error("Failed to delete history time entry")
+            # The entry is still stored, count it again
+            self.total_history_entries_count = self.count_history_time_entries()
+
+            if on_finished is not None:
+                on_finished(False)
+            return
+
+        self.user_model.apply_xp_delta(
+            -removed_xp, None if on_finished is None else lambda: on_finished(True)
+        )
+
+    def _on_open_time_entry_discarded(self, removed_xp: int) -> None:
+        if removed_xp is None:
+            self.logger.error("Failed to discard unfinished time entry")
+
+    def _on_checkpoint_saved(self, is_saved: bool) -> None:
+        self.is_checkpoint_pending = False
+
+        if not is_saved:
+            self.logger.error("Failed to save checkpoint of the tracked time entry")
+
+    def _get_selected_mob(self) -> str:
+        return self.user_model.current_selected_mob
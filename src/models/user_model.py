@@ -1,5 +1,4 @@
-import math
-
+from .xp_engine import evaluate_level
 from ..utils.logger import setup_logger
 
 
@@ -8,9 +7,12 @@ class UserModel:
     Manages user data, experience points (XP), and levels.
     """
 
-    def __init__(self, database):
+    def __init__(self, database, database_worker=None, snapshot=None):
         self.db = database
-        self.logger = setup_logger()
+        # Runs writes in the background if provided,
+        # otherwise they are done synchronously
+        self.db_worker = database_worker
+        self.logger = setup_logger("models")
 
         self.current_user_id = None
         self.current_user_xp = None
@@ -20,7 +22,16 @@ class UserModel:
         # to calculate XP rate based on it
         self.current_selected_mob = None
 
-        self.initialize_user()
+        # Activities are cached until they are changed,
+        # so the activity list and the selector share one query
+        self.cached_activities = None
+        self.are_activities_cached = False
+
+        # User's data is queried later if it is taken from the startup snapshot
+        if snapshot is None:
+            self.initialize_user()
+        else:
+            self.apply_snapshot(snapshot)
 
     # User Management
 
@@ -32,11 +43,18 @@ class UserModel:
             self.logger.error("Failed to initialize default user")
             raise RuntimeError("Failed to initialize default user")
 
-        self.logger.info(f"Initialized user with ID: {self.current_user_id}")
+        self.logger.info("Initialized user with ID: %s", self.current_user_id)
         # Update user's statistic
         self.update_user_stats()
-        self.logger.info(f"Current user's level: {self.current_user_level}")
-        self.logger.info(f"Current user's XP: {self.current_user_xp}")
+        self.logger.info("Current user's level: %s", self.current_user_level)
+        self.logger.info("Current user's XP: %s", self.current_user_xp)
+
+    def apply_snapshot(self, snapshot) -> None:
+        """Takes user's data from the startup snapshot instead of the database"""
+        self.current_user_id = snapshot.user_id
+        self.apply_user_stats(snapshot.user_xp, snapshot.user_level)
+        self.cached_activities = snapshot.activities
+        self.are_activities_cached = True
 
     # User Stats Management
 
@@ -64,6 +82,14 @@ class UserModel:
         self.db.set_user_level(level, user_id)
         self.current_user_level = level
 
+    def apply_user_stats(self, xp: int, level: int) -> None:
+        """
+        Updates cached XP and level after they have been
+        already saved to the database
+        """
+        self.current_user_xp = xp
+        self.current_user_level = level
+
     def reevaluate_user_xp(self) -> float:
         """
         Summorizes earned XP from xp_transactions table of current user
@@ -72,44 +98,126 @@ class UserModel:
         total_xp = self.db.get_user_total_xp(self.current_user_id)
         return total_xp
 
-    def reevaluate_user_stats(self):
+    def apply_xp_delta(self, xp_delta: int, on_finished=None) -> None:
         """
-        Reevaluates user statiscic
+        Updates user's statistic by XP that has been
+        already added to or subtracted from user's total XP in the database
+        Saves the new level only if it has changed
+
+        Args:
+            xp_delta: Amount of added XP, negative if XP was removed
+            on_finished: Called once cached stats are updated
+        """
+        new_xp_amount = self.current_user_xp + xp_delta
+        new_level = self.evaluate_level(new_xp_amount)
+
+        self.logger.debug("User's XP changed by %s to %s XP", xp_delta, new_xp_amount)
+
+        if new_level != self.current_user_level:
+            self.logger.debug(
+                "User's level changed from %s to %s", self.current_user_level, new_level
+            )
+            if self.db_worker is None:
+                self.db.set_user_level(new_level, self.current_user_id)
+            else:
+                self.db_worker.submit(
+                    self.db.set_user_level, new_level, self.current_user_id
+                )
+
+        self.apply_user_stats(new_xp_amount, new_level)
+
+        if on_finished is not None:
+            on_finished()
+
+    def reconcile_user_stats(self, on_finished=None):
+        """
+        Recalculates user statiscic from scratch
         via summorizing the 'xp_amount' rows from the 'xp_transactions' table
         Updates the 'users' table with the calculated XP and level
+        Regular updates are incremental, this is only needed to repair
+        stored stats that got out of sync with the XP transactions
+
+        Args:
+            on_finished: If provided and the database worker is available,
+                the database is queried and updated in the background
+                and on_finished is called once cached stats are updated
         """
-        self.logger.debug("Reevaluating user's statistic")
+        self.logger.debug("Reconciling user's statistic")
         self.logger.debug(
-            f"User's level before the reevaluation: {self.current_user_level}"
+            "User's level before the reconciliation: %s", self.current_user_level
+        )
+        self.logger.debug(
+            "User's XP before the reconciliation: %s", self.current_user_xp
         )
-        self.logger.debug(f"User's XP before the reevaluation: {self.current_user_xp}")
-
-        # Summorize 'xp amounts' rows from the 'xp_transactions' table
-        self.current_user_xp = self.reevaluate_user_xp()
 
-        # Update the 'users' table with the new XP value
-        self.set_user_xp(self.current_user_xp, self.current_user_id)
+        if on_finished is None or self.db_worker is None:
+            # Summorize 'xp amounts' rows from the 'xp_transactions' table
+            self._apply_reevaluated_xp(self.reevaluate_user_xp())
+            if on_finished is not None:
+                on_finished()
+            return
+
+        def on_total_xp_ready(total_xp):
+            # None if the worker task failed, stats are left as they are
+            if total_xp is not None:
+                self._apply_reevaluated_xp(total_xp)
+            on_finished()
+
+        self.db_worker.submit(
+            self.db.get_user_total_xp, self.current_user_id, callback=on_total_xp_ready
+        )
 
+    def _apply_reevaluated_xp(self, total_xp: int) -> None:
+        """
+        Updates cached and stored XP with the reevaluated value
+        and calculates new level based on it
+        """
+        self.current_user_xp = total_xp
         # Calculate new level based on new XP
         self.current_user_level = self.evaluate_level(self.current_user_xp)
 
-        # Update the 'users' table with the new level
-        self.set_user_level(self.current_user_level, self.current_user_id)
+        # Update the 'users' table with the new XP value and level
+        if self.db_worker is None:
+            self.db.set_user_xp(self.current_user_xp, self.current_user_id)
+            self.db.set_user_level(self.current_user_level, self.current_user_id)
+        else:
+            self.db_worker.submit(
+                self.db.set_user_xp, self.current_user_xp, self.current_user_id
+            )
+            self.db_worker.submit(
+                self.db.set_user_level, self.current_user_level, self.current_user_id
+            )
 
         self.logger.debug(
-            f"User's level after the reevaluation: {self.current_user_level}"
+            "User's level after the reconciliation: %s", self.current_user_level
         )
         self.logger.debug(
-            f"User's XP after the reevaluation: {self.current_user_xp} XP"
+            "User's XP after the reconciliation: %s XP", self.current_user_xp
         )
 
     # Activity Management
 
     def get_user_activities(self):
-        return self.db.get_user_activities(self.current_user_id)
+        if self.are_activities_cached:
+            return self.cached_activities
+
+        activities = self.db.get_user_activities(self.current_user_id)
+
+        # Empty list is returned on a database error, it isn't cached
+        if activities != []:
+            self.cached_activities = activities
+            self.are_activities_cached = True
+
+        return activities
 
     def delete_user_activity(self, activity_id: int) -> None:
         self.db.delete_user_activity(activity_id, self.current_user_id)
+        self.clear_activities_cache()
+
+    def clear_activities_cache(self) -> None:
+        """Makes the next get_user_activities call query the database"""
+        self.cached_activities = None
+        self.are_activities_cached = False
 
     def set_user_xp_rate_mob(self, mob: str):
         self.current_selected_mob = mob
@@ -119,20 +227,7 @@ class UserModel:
     @staticmethod
     def evaluate_level(total_xp) -> int:
         """Evaluates level based on total XP amount and returns it"""
-        if total_xp == None:
-            return 0
-
-        if total_xp <= 0:
-            return 0
-
-        if total_xp <= 352:
-            lvl = math.sqrt(total_xp + 9) - 3
-        elif total_xp <= 1507:
-            lvl = 81 / 10 + math.sqrt(2 / 5 * (total_xp - 7839 / 40))
-        else:
-            lvl = 325 / 18 + math.sqrt(2 / 9 * (total_xp - 54215 / 72))
-
-        return int(lvl)
+        return evaluate_level(total_xp)
 
     @staticmethod
     def calculate_xp_leftover(user_level: int) -> int:
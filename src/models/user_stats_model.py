@@ -8,7 +8,7 @@ class UserStatsModel:
 
         self.currently_selected_activity_item = None
 
-        self.logger = setup_logger()
+        self.logger = setup_logger("models")
 
     # User Stats Management
 
@@ -53,7 +53,8 @@ class UserStatsModel:
 
         user_id = self.user_model.current_user_id
         if self.db.add_new_activity(activity_name, user_id):
-            self.logger.info(f"Added new activity: {activity_name}")
+            self.logger.info("Added new activity: %s", activity_name)
+            self.user_model.clear_activities_cache()
             return True
 
         return False
@@ -62,5 +63,5 @@ class UserStatsModel:
         self.user_model.delete_user_activity(activity_id)
 
     def set_user_xp_rate_mob(self, mob: str):
-        self.logger.info(f"XP rate mob is set to: {mob}")
+        self.logger.info("XP rate mob is set to: %s", mob)
         self.user_model.set_user_xp_rate_mob(mob)
@@ -0,0 +1,168 @@
+import math
+import random
+
+from ..utils.instrumentation import instrumented
+
+# Sessions up to this many minutes are rewarded with exact per-minute draws,
+# longer ones with a single draw from the distribution of the sum
+EXACT_DRAW_MAX_MINUTES = 30
+
+
+class XpEngine:
+    """
+    Calculates XP rewards for time sessions based on XP rates from MOB_XP_RATES
+
+    A static rate is multiplied by the number of minutes
+    A range rate [low, high] gives randint(low, high) XP per minute,
+    their sum is drawn at once instead of once per minute:
+    short sessions draw every minute in one batched call,
+    long sessions draw from the normal approximation of the sum
+    (the sum of many uniform draws), rounded and clamped to its possible range
+
+    Args:
+        seed: Seed of the random generator to make rewards reproducible
+    """
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    # Public interface methods
+
+    @instrumented()
+    def session_xp(self, duration_seconds: int, xp_rate) -> int:
+        """Returns XP reward for a single session"""
+        return self.minutes_xp(self.count_rewarded_minutes(duration_seconds), xp_rate)
+
+    @instrumented()
+    def batch_session_xp(self, durations_seconds, xp_rates) -> list:
+        """
+        Returns XP rewards for many sessions in one pass,
+        in the same order as the passed durations
+        Every exact-draw minute of all sessions is drawn by a single
+        choices call, longer sessions with range rates are drawn
+        from the normal approximation of the sum
+
+        Args:
+            durations_seconds: Durations of the sessions
+            xp_rates: XP rate of every session, in the same order
+        """
+        minutes = [
+            self.count_rewarded_minutes(duration) for duration in durations_seconds
+        ]
+        rewards = [0] * len(minutes)
+        # (index, minutes, low, high) of sessions rewarded by exact draws
+        exact_draw_sessions = []
+
+        for index, (session_minutes, xp_rate) in enumerate(zip(minutes, xp_rates)):
+            if session_minutes <= 0:
+                continue
+
+            # If XP rate is static
+            if not isinstance(xp_rate, list):
+                rewards[index] = session_minutes * xp_rate
+                continue
+
+            low, high = xp_rate
+
+            if session_minutes <= EXACT_DRAW_MAX_MINUTES:
+                exact_draw_sessions.append((index, session_minutes, low, high))
+            else:
+                rewards[index] = self._draw_range_sum(session_minutes, low, high)
+
+        if not exact_draw_sessions:
+            return rewards
+
+        # Every range size divides the size of the drawn population,
+        # so a drawn value modulo the range size is uniform within the range
+        population_size = 1
+        for _, _, low, high in exact_draw_sessions:
+            values_count = high - low + 1
+            population_size = (
+                population_size
+                * values_count
+                // math.gcd(population_size, values_count)
+            )
+
+        draws = self.rng.choices(
+            range(population_size),
+            k=sum(session[1] for session in exact_draw_sessions),
+        )
+
+        draw_index = 0
+        for index, session_minutes, low, high in exact_draw_sessions:
+            values_count = high - low + 1
+            session_draws = draws[draw_index : draw_index + session_minutes]
+            rewards[index] = session_minutes * low + sum(
+                draw % values_count for draw in session_draws
+            )
+            draw_index += session_minutes
+
+        return rewards
+
+    def provisional_session_xp(self, duration_seconds: int, xp_rate) -> int:
+        """
+        Returns XP expected for a session that is still running
+        Nothing is drawn, so the final rewards stay reproducible
+        """
+        minutes = self.count_rewarded_minutes(duration_seconds)
+
+        if not isinstance(xp_rate, list):
+            return minutes * xp_rate
+
+        return round(minutes * (xp_rate[0] + xp_rate[1]) / 2)
+
+    def minutes_xp(self, minutes: int, xp_rate) -> int:
+        """Returns XP reward for the given number of minutes"""
+        if minutes <= 0:
+            return 0
+
+        # If XP rate is static
+        if not isinstance(xp_rate, list):
+            return minutes * xp_rate
+
+        low, high = xp_rate
+
+        if minutes <= EXACT_DRAW_MAX_MINUTES:
+            return sum(self.rng.choices(range(low, high + 1), k=minutes))
+
+        return self._draw_range_sum(minutes, low, high)
+
+    @staticmethod
+    def count_rewarded_minutes(duration_seconds: int) -> int:
+        """Only complete minutes are rewarded"""
+        if duration_seconds <= 59:
+            return 0
+        return int(duration_seconds / 60)
+
+    # Private helper methods
+
+    def _draw_range_sum(self, minutes: int, low: int, high: int) -> int:
+        """
+        Draws the sum of per-minute randint(low, high) rewards
+        from its normal approximation
+        """
+        values_count = high - low + 1
+        mean = minutes * (low + high) / 2
+        # Variance of a discrete uniform distribution is (n^2 - 1) / 12
+        standard_deviation = math.sqrt(minutes * (values_count**2 - 1) / 12)
+
+        xp = round(self.rng.gauss(mean, standard_deviation))
+        return min(max(xp, minutes * low), minutes * high)
+
+
+def evaluate_level(total_xp) -> int:
+    """Evaluates level based on total XP amount and returns it"""
+    if total_xp == None:
+        return 0
+
+    if total_xp <= 0:
+        return 0
+
+    if total_xp <= 352:
+        lvl = math.sqrt(total_xp + 9) - 3
+    elif total_xp <= 1507:
+        lvl = 81 / 10 + math.sqrt(2 / 5 * (total_xp - 7839 / 40))
+    else:
+        lvl = 325 / 18 + math.sqrt(2 / 9 * (total_xp - 54215 / 72))
+
+    return int(lvl)
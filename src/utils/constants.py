@@ -3,15 +3,50 @@ DB_NAME = "test.db"
 
 DEBUG_MODE = False
 
+# Collects call counts and latencies of database and UI hot paths
+ENABLE_INSTRUMENTATION = DEBUG_MODE
+# Collected metrics are written to this file on shutdown
+METRICS_FILE_NAME = "metrics.json"
+
+# Last known user's data written on shutdown
+# and displayed on the next startup before the database is queried
+SNAPSHOT_FILE_NAME = "startup_snapshot.json"
+
 # How time is saved in the database
 TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 # How time is displayed in the time entries history
 HISTORY_TIME_FORMAT = "%a, %d %b"
 
+# How often the tracked time entry is saved while the timer is running,
+# at most this much tracked time is lost if the application exits
+CHECKPOINT_INTERVAL_MINUTES = 5
+
+# How the start of an unfinished time entry is displayed when it is recovered
+OPEN_ENTRY_TIME_FORMAT = "%a, %d %b at %H:%M"
+# Actions offered for time entries left open by a previous run
+OPEN_ENTRY_RESUME = "resume"
+OPEN_ENTRY_CLOSE = "close"
+OPEN_ENTRY_DISCARD = "discard"
+
 # How many history time entries will
 # be displayed by default
 DEFAULT_HISTORY_ENTRIES_DISPLAYED = 10
 
+# How many weeks the statistics heatmap displays
+STATISTICS_HEATMAP_WEEKS = 26
+
 # List instead of an integer will give call
 # randint(index_zero, index_one)
 MOB_XP_RATES = {"Chicken": [1, 3], "Zombie": 5, "Blaze": 10}
+
+# Logging
+LOG_FILE_NAME = "log.log"
+# Log file is rotated when it grows over this size
+LOG_FILE_MAX_BYTES = 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 3
+# Levels of separate subsystems ("database", "models", "views"),
+# subsystems missing here use the main logger level
+# (DEBUG if DEBUG_MODE is True, otherwise INFO)
+SUBSYSTEM_LOG_LEVELS = {
+    "database": "INFO",
+}
@@ -0,0 +1,197 @@
+"""
+Lightweight in-memory instrumentation of hot paths
+
+Functions decorated with @instrumented() and blocks wrapped in timed()
+record call count, latency histogram and number of returned rows
+Recording is skipped entirely while instrumentation is disabled,
+so the only cost left is a flag check per call
+
+Usage:
+    metrics.enable()
+    ...
+    metrics.snapshot()["Database.get_user_xp"]["p95_ms"]
+    metrics.dump_json("metrics.json")
+"""
+
+import functools
+import json
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+from .constants import ENABLE_INSTRUMENTATION
+
+# Upper bounds of latency histogram buckets in milliseconds
+LATENCY_BUCKETS_MS = (
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    float("inf"),
+)
+
+
+class MetricStats:
+    """Collected statistic of a single instrumented function or block"""
+
+    __slots__ = ("calls", "total_ms", "max_ms", "rows", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        # Total number of rows returned, only counted for list results
+        self.rows = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def record(self, elapsed_ms: float, rows: int) -> None:
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+
+        for bucket_index, upper_bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= upper_bound:
+                self.buckets[bucket_index] += 1
+                break
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns upper bound of the histogram bucket containing the percentile
+        The largest recorded latency is returned for the last bucket
+        """
+        if self.calls == 0:
+            return 0.0
+
+        threshold = self.calls * percent / 100
+        cumulative_calls = 0
+
+        for bucket_index, bucket_calls in enumerate(self.buckets):
+            cumulative_calls += bucket_calls
+            if cumulative_calls >= threshold:
+                return min(LATENCY_BUCKETS_MS[bucket_index], self.max_ms)
+
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "total_ms": self.total_ms,
+            "mean_ms": self.total_ms / self.calls if self.calls else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "rows": self.rows,
+            "histogram": {
+                str(upper_bound): calls
+                for upper_bound, calls in zip(LATENCY_BUCKETS_MS, self.buckets)
+            },
+        }
+
+
+class Metrics:
+    """Registry of collected metrics, shared by the whole application"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._stats = {}
+        # Database worker records from its own thread
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+    def record(self, name: str, elapsed_ms: float, rows: int = 0) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+
+            if stats is None:
+                stats = MetricStats()
+                self._stats[name] = stats
+
+            stats.record(elapsed_ms, rows)
+
+    def snapshot(self) -> dict:
+        """Returns a copy of collected metrics as a dictionary keyed by name"""
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+    def total_calls(self, prefix: str = "") -> int:
+        """Returns number of recorded calls of metrics starting with the prefix"""
+        with self._lock:
+            return sum(
+                stats.calls
+                for name, stats in self._stats.items()
+                if name.startswith(prefix)
+            )
+
+    def dump_json(self, file_path: str) -> None:
+        with open(file_path, "w") as file:
+            json.dump(self.snapshot(), file, indent=2)
+
+
+metrics = Metrics(ENABLE_INSTRUMENTATION)
+
+
+def instrumented(name: str = None):
+    """
+    Decorator recording every call of the function into metrics
+    Metric name defaults to the function's qualified name (e.g. "Database.get_user_xp")
+    """
+
+    def decorator(function):
+        metric_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+
+            start = perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                elapsed_ms = (perf_counter() - start) * 1000
+
+            rows = len(result) if isinstance(result, list) else 0
+            metrics.record(metric_name, elapsed_ms, rows)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def timed(name: str):
+    """Context manager recording execution time of the block into metrics"""
+    if not metrics.enabled:
+        yield
+        return
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record(name, (perf_counter() - start) * 1000)
@@ -1,31 +1,102 @@
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
+from .constants import (
+    DEBUG_MODE,
+    LOG_FILE_BACKUP_COUNT,
+    LOG_FILE_MAX_BYTES,
+    LOG_FILE_NAME,
+    SUBSYSTEM_LOG_LEVELS,
+)
 
-def setup_logger():
-    """Returns created logger"""
+ROOT_LOGGER_NAME = "logger"
+
+# Writes queued log records to the file and console on its own thread
+_queue_listener = None
+
+
+def setup_logger(subsystem: str = None):
+    """
+    Returns created logger
+    Logger of a subsystem (e.g. "database") is a child of the main logger,
+    its level can be set separately in SUBSYSTEM_LOG_LEVELS
+
+    Records are only put into a queue by the calling thread,
+    formatting and writing happens on the listener thread
+    Use %-style arguments (logger.debug("XP: %s", xp))
+    so that messages below the logger level are never formatted,
+    arguments are formatted later, so they shouldn't be mutated after logging
+    """
     # Get or create logger
-    logger = logging.getLogger("logger")
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
 
     # Only add handlers if the logger doesn't have any
     if not logger.handlers:
-        # Minimum level of messages to capture
-        logger.setLevel(logging.DEBUG)
+        _configure_root_logger(logger)
+
+    if subsystem is None:
+        return logger
+
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem}")
+
+
+class _UnformattedQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records as they are,
+    the default one formats every record on the calling thread
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def stop_logging() -> None:
+    """Writes remaining queued records and stops the listener thread"""
+    global _queue_listener
+
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+def _configure_root_logger(logger: logging.Logger) -> None:
+    global _queue_listener
+
+    # Minimum level of messages to capture
+    logger.setLevel(logging.DEBUG if DEBUG_MODE else logging.INFO)
+
+    for subsystem, level in SUBSYSTEM_LOG_LEVELS.items():
+        logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem}").setLevel(level)
 
-        # File handler
-        file_handler = logging.FileHandler("log.log", "w")
-        file_handler.setLevel(logging.DEBUG)
+    # File handler, rotated when it grows over the size limit
+    file_handler = RotatingFileHandler(
+        LOG_FILE_NAME,
+        maxBytes=LOG_FILE_MAX_BYTES,
+        backupCount=LOG_FILE_BACKUP_COUNT,
+        delay=True,
+    )
+    file_handler.setLevel(logging.DEBUG)
 
-        # Console handler to show logs in terminal
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
+    # Console handler to show logs in terminal
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
 
-        # Format for log messages
-        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
+    # Format for log messages
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    file_handler.setFormatter(formatter)
+    console_handler.setFormatter(formatter)
 
-        # Add both handlers to the logger
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+    # Logging calls only enqueue records,
+    # the listener thread does the formatting and I/O
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(_UnformattedQueueHandler(log_queue))
 
-    return logger
+    _queue_listener = QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _queue_listener.start()
+    atexit.register(stop_logging)
@@ -0,0 +1,37 @@
+import sys
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+
+def get_rss_mb():
+    """
+    Returns current resident memory of the process in megabytes
+    Falls back to the peak resident memory where the current one isn't available
+    Returns None if neither can be read
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, AttributeError, IndexError, ValueError):
+        return get_peak_rss_mb()
+
+
+def get_peak_rss_mb():
+    """
+    Returns peak resident memory of the process in megabytes
+    Returns None if it can't be read
+    """
+    if resource is None:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak_rss / (1024 * 1024)
+    return peak_rss / 1024
@@ -0,0 +1,58 @@
+from time import perf_counter
+
+from .instrumentation import metrics
+from .logger import setup_logger
+
+
+class StartupTimer:
+    """
+    Measures duration of application startup phases
+
+    Every mark() closes the phase started by the previous one,
+    report() logs every phase with the time elapsed since the start
+    and records them into metrics as "startup.<phase>"
+
+    Args:
+        start_time: perf_counter() value the startup began at,
+            defaults to the creation of the timer
+    """
+
+    def __init__(self, start_time: float = None):
+        self.logger = setup_logger("startup")
+        self.start_time = perf_counter() if start_time is None else start_time
+        self.last_mark_time = self.start_time
+        # List of (phase name, phase duration ms, elapsed since start ms)
+        self.phases = []
+
+    # Public interface methods
+
+    def mark(self, phase: str) -> None:
+        """Marks the end of the phase"""
+        now = perf_counter()
+        self.phases.append(
+            (
+                phase,
+                (now - self.last_mark_time) * 1000,
+                (now - self.start_time) * 1000,
+            )
+        )
+        self.last_mark_time = now
+
+    def elapsed_ms(self, phase: str):
+        """Returns time from the start to the end of the phase, None if not marked"""
+        for name, _, elapsed_ms in self.phases:
+            if name == phase:
+                return elapsed_ms
+        return None
+
+    def report(self) -> None:
+        for phase, duration_ms, elapsed_ms in self.phases:
+            self.logger.info(
+                "Startup phase %-16s %8.1f ms (at %8.1f ms)",
+                phase,
+                duration_ms,
+                elapsed_ms,
+            )
+
+            if metrics.enabled:
+                metrics.record(f"startup.{phase}", duration_ms)
@@ -0,0 +1,167 @@
+from PyQt6.QtCore import QEvent, QPersistentModelIndex, QRect, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPainter, QPalette
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem
+
+from .history_list_model import ENTRY_ROW, HistoryListModel
+
+# Geometry of an entry row, matches the look of the former entry widget
+ENTRY_MARGIN = 3
+ENTRY_HEIGHT = 50
+ENTRY_RADIUS = 15
+ENTRY_PADDING = 10
+DELETE_BUTTON_SIZE = 30
+DURATION_WIDTH = 70
+# Vertical padding of date and button rows
+TEXT_ROW_PADDING = 8
+
+
+class HistoryItemDelegate(QStyledItemDelegate):
+    """
+    Paints rows of the history list
+    Entries are painted as rounded cards with activity name and duration
+    Clicked entry shows a delete button, clicking it again emits delete_requested
+
+    Attributes:
+        delete_requested: Emitted with the entry ID when delete button is clicked
+    """
+
+    delete_requested = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Entry showing the delete button
+        self.active_index = QPersistentModelIndex()
+
+    # Qt delegate interface
+
+    def sizeHint(self, option: QStyleOptionViewItem, index) -> QSize:
+        if index.data(Qt.ItemDataRole.UserRole) == ENTRY_ROW:
+            return QSize(option.rect.width(), ENTRY_HEIGHT + 2 * ENTRY_MARGIN)
+
+        height = option.fontMetrics.height() + 2 * TEXT_ROW_PADDING
+        return QSize(option.rect.width(), height)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index) -> None:
+        if index.data(Qt.ItemDataRole.UserRole) != ENTRY_ROW:
+            self._paint_text_row(painter, option, index)
+            return
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        card_rect = self._card_rect(option.rect)
+
+        # Background of the entry
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("white"))
+        painter.drawRoundedRect(card_rect, ENTRY_RADIUS, ENTRY_RADIUS)
+
+        content_rect = card_rect.adjusted(ENTRY_PADDING, 0, -ENTRY_PADDING, 0)
+        is_active = QPersistentModelIndex(index) == self.active_index
+
+        if is_active:
+            delete_rect = self._delete_button_rect(option.rect)
+            content_rect.setRight(delete_rect.left() - ENTRY_PADDING)
+            self._paint_delete_button(painter, delete_rect)
+
+        # Duration on the right, activity name takes the rest of the space
+        duration_rect = QRect(content_rect)
+        duration_rect.setLeft(content_rect.right() - DURATION_WIDTH)
+        name_rect = QRect(content_rect)
+        name_rect.setRight(duration_rect.left() - ENTRY_PADDING)
+
+        painter.setPen(QColor("black"))
+        painter.setFont(option.font)
+
+        activity_name = option.fontMetrics.elidedText(
+            index.data(Qt.ItemDataRole.DisplayRole),
+            Qt.TextElideMode.ElideRight,
+            name_rect.width(),
+        )
+        painter.drawText(
+            name_rect,
+            Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft,
+            activity_name,
+        )
+        painter.drawText(
+            duration_rect,
+            Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignRight,
+            index.data(HistoryListModel.DurationRole),
+        )
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option: QStyleOptionViewItem, index) -> bool:
+        """
+        Handles clicks on entries
+        First click shows the delete button of the entry,
+        click on the shown delete button requests deletion
+        """
+        if event.type() != QEvent.Type.MouseButtonRelease:
+            return False
+
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+
+        if index.data(Qt.ItemDataRole.UserRole) != ENTRY_ROW:
+            return False
+
+        is_active = QPersistentModelIndex(index) == self.active_index
+        delete_rect = self._delete_button_rect(option.rect)
+
+        if is_active and delete_rect.contains(event.position().toPoint()):
+            self.delete_requested.emit(index.data(HistoryListModel.EntryIdRole))
+            return True
+
+        previous_index = QPersistentModelIndex(self.active_index)
+        self.active_index = QPersistentModelIndex(index)
+
+        # Repaint both entries to move the delete button
+        if option.widget is not None:
+            if previous_index.isValid():
+                option.widget.update(model.index(previous_index.row(), 0))
+            option.widget.update(index)
+
+        return False
+
+    # Private helper methods
+
+    def _paint_text_row(self, painter: QPainter, option, index) -> None:
+        """Paints date, "Show more" and empty history rows as centered text"""
+        painter.save()
+        painter.setPen(option.palette.color(QPalette.ColorRole.Text))
+        painter.drawText(
+            option.rect,
+            Qt.AlignmentFlag.AlignCenter,
+            index.data(Qt.ItemDataRole.DisplayRole),
+        )
+        painter.restore()
+
+    def _paint_delete_button(self, painter: QPainter, rect: QRect) -> None:
+        """Paints a circular delete button"""
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("black"))
+        painter.drawEllipse(rect)
+
+        font = QFont(painter.font())
+        font.setBold(True)
+        font.setPixelSize(16)
+        painter.setFont(font)
+        painter.setPen(QColor("white"))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, "X")
+
+    @staticmethod
+    def _card_rect(row_rect: QRect) -> QRect:
+        return row_rect.adjusted(
+            ENTRY_MARGIN, ENTRY_MARGIN, -ENTRY_MARGIN, -ENTRY_MARGIN
+        )
+
+    def _delete_button_rect(self, row_rect: QRect) -> QRect:
+        """Area of the delete button, used for painting and hit-testing"""
+        card_rect = self._card_rect(row_rect)
+        return QRect(
+            card_rect.right() - ENTRY_PADDING - DELETE_BUTTON_SIZE,
+            card_rect.center().y() - DELETE_BUTTON_SIZE // 2,
+            DELETE_BUTTON_SIZE,
+            DELETE_BUTTON_SIZE,
+        )
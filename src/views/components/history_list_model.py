@@ -0,0 +1,172 @@
+from collections import namedtuple
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+# Kinds of rows in the history list
+DATE_ROW = "date"
+ENTRY_ROW = "entry"
+SHOW_MORE_ROW = "show_more_entries"
+EMPTY_HISTORY_ROW = "empty_history"
+
+# Single row of the history list
+# duration and entry_id are only set for entry rows,
+# day_key is set for both date and entry rows
+HistoryRow = namedtuple(
+    "HistoryRow", ["kind", "text", "duration", "entry_id", "day_key"]
+)
+
+
+class HistoryListModel(QAbstractListModel):
+    """
+    Model of the time entries history list
+    Holds plain rows (dates, entries, "Show more" button)
+    which are painted by HistoryItemDelegate,
+    so no widgets are created per history entry
+
+    Roles:
+        DisplayRole: Date, activity name or button text
+        UserRole: Kind of the row
+        DurationRole: Formatted duration of an entry
+        EntryIdRole: Database ID of an entry
+    """
+
+    DurationRole = Qt.ItemDataRole.UserRole + 1
+    EntryIdRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        # Number of entry rows, kept up to date on every change
+        self.entry_count = 0
+
+    # Qt model interface
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = self._rows[index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row.text
+        if role == Qt.ItemDataRole.UserRole:
+            return row.kind
+        if role == self.DurationRole:
+            return row.duration
+        if role == self.EntryIdRole:
+            return row.entry_id
+
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+
+        # Only entries can be selected to show their delete button
+        if self._rows[index.row()].kind == ENTRY_ROW:
+            return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+        return Qt.ItemFlag.ItemIsEnabled
+
+    # Row constructors
+
+    @staticmethod
+    def date_row(date: str, day_key: int) -> HistoryRow:
+        return HistoryRow(DATE_ROW, date, None, None, day_key)
+
+    @staticmethod
+    def entry_row(time_entry_data) -> HistoryRow:
+        return HistoryRow(
+            ENTRY_ROW,
+            time_entry_data.activity_name,
+            time_entry_data.duration,
+            time_entry_data.id,
+            time_entry_data.day_key,
+        )
+
+    # Public interface methods
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._rows = []
+        self.entry_count = 0
+        self.endResetModel()
+
+    def append_rows(self, rows: list) -> None:
+        """Appends rows to the end of the list with a single insertion"""
+        self.insert_rows(len(self._rows), rows)
+
+    def insert_rows(self, position: int, rows: list) -> None:
+        """Inserts rows before the given position with a single insertion"""
+        if not rows:
+            return
+
+        self.beginInsertRows(QModelIndex(), position, position + len(rows) - 1)
+        self._rows[position:position] = rows
+        self.entry_count += sum(1 for row in rows if row.kind == ENTRY_ROW)
+        self.endInsertRows()
+
+    def remove_rows(self, position: int, count: int = 1) -> None:
+        last_row = position + count - 1
+        self.beginRemoveRows(QModelIndex(), position, last_row)
+        removed_rows = self._rows[position : last_row + 1]
+        del self._rows[position : last_row + 1]
+        self.entry_count -= sum(1 for row in removed_rows if row.kind == ENTRY_ROW)
+        self.endRemoveRows()
+
+    def insert_entry_at_top(self, date_row: HistoryRow, entry_row: HistoryRow):
+        """
+        Inserts entry as the most recent one
+        Its date row is only inserted if the list doesn't start with that day
+        """
+        if self._rows and self._rows[0].kind == DATE_ROW:
+            if self._rows[0].day_key == entry_row.day_key:
+                self.insert_rows(1, [entry_row])
+                return
+
+        self.insert_rows(0, [date_row, entry_row])
+
+    def remove_entry(self, entry_id: int) -> bool:
+        """
+        Removes entry row and its date row if no other entries of that day are left
+        Returns False if the entry isn't in the list
+        """
+        row = self.find_entry_row(entry_id)
+
+        if row == -1:
+            return False
+
+        # Entries of the same day directly follow each other after their date row
+        is_first_of_day = self._rows[row - 1].kind == DATE_ROW
+        is_last_of_day = (
+            row + 1 >= len(self._rows) or self._rows[row + 1].kind != ENTRY_ROW
+        )
+
+        if is_first_of_day and is_last_of_day:
+            self.remove_rows(row - 1, 2)
+        else:
+            self.remove_rows(row)
+
+        return True
+
+    def last_day_key(self):
+        """Returns day key of the last entry in the list or None if there are none"""
+        for row in reversed(self._rows):
+            if row.kind == ENTRY_ROW:
+                return row.day_key
+        return None
+
+    def row_kind(self, row: int) -> str:
+        return self._rows[row].kind
+
+    def find_entry_row(self, entry_id: int) -> int:
+        """Returns row number of an entry or -1 if it isn't in the list"""
+        for row_number, row in enumerate(self._rows):
+            if row.kind == ENTRY_ROW and row.entry_id == entry_id:
+                return row_number
+        return -1
@@ -0,0 +1,165 @@
+from PyQt6.QtCore import QPointF, QRectF, QSize, Qt
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+# Geometry of heatmap cells
+HEATMAP_CELL_SIZE = 12
+HEATMAP_CELL_SPACING = 2
+HEATMAP_CELL_RADIUS = 2
+# Colors of cells without tracked time and with the most tracked time
+HEATMAP_EMPTY_COLOR = QColor("#ebedf0")
+HEATMAP_FULL_COLOR = QColor("#216e39")
+
+CHART_MIN_HEIGHT = 120
+CHART_PADDING = 6
+CHART_LINE_COLOR = QColor("#4a8f3c")
+CHART_AXIS_COLOR = QColor("#8f8f91")
+
+
+class HeatmapWidget(QWidget):
+    """
+    Paints a grid of values as colored cells
+    Columns are painted from left to right, each column from top to bottom,
+    the more a value approaches the largest one, the darker is its cell
+    None values (e.g. days after today) aren't painted
+    """
+
+    def __init__(self, rows_count: int, parent=None):
+        super().__init__(parent)
+        self.rows_count = rows_count
+        self.columns = []
+        self.max_value = 0
+
+        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+
+    # Public interface methods
+
+    def set_columns(self, columns: list) -> None:
+        """
+        Args:
+            columns: List of columns, each is a list of rows_count values
+        """
+        self.columns = columns
+        self.max_value = max(
+            (value for column in columns for value in column if value), default=0
+        )
+        self.updateGeometry()
+        self.update()
+
+    # Qt widget interface
+
+    def sizeHint(self) -> QSize:
+        step = HEATMAP_CELL_SIZE + HEATMAP_CELL_SPACING
+        return QSize(len(self.columns) * step, self.rows_count * step)
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+
+        step = HEATMAP_CELL_SIZE + HEATMAP_CELL_SPACING
+
+        for column_index, column in enumerate(self.columns):
+            for row_index, value in enumerate(column):
+                if value is None:
+                    continue
+
+                painter.setBrush(self._cell_color(value))
+                painter.drawRoundedRect(
+                    QRectF(
+                        column_index * step,
+                        row_index * step,
+                        HEATMAP_CELL_SIZE,
+                        HEATMAP_CELL_SIZE,
+                    ),
+                    HEATMAP_CELL_RADIUS,
+                    HEATMAP_CELL_RADIUS,
+                )
+
+    # Private helper methods
+
+    def _cell_color(self, value) -> QColor:
+        if not value or not self.max_value:
+            return HEATMAP_EMPTY_COLOR
+
+        # Lightest non-empty cell is still distinguishable from an empty one
+        ratio = 0.25 + 0.75 * value / self.max_value
+
+        return QColor(
+            round(_blend(HEATMAP_EMPTY_COLOR.red(), HEATMAP_FULL_COLOR.red(), ratio)),
+            round(
+                _blend(HEATMAP_EMPTY_COLOR.green(), HEATMAP_FULL_COLOR.green(), ratio)
+            ),
+            round(_blend(HEATMAP_EMPTY_COLOR.blue(), HEATMAP_FULL_COLOR.blue(), ratio)),
+        )
+
+
+class LineChartWidget(QWidget):
+    """
+    Paints values as a line stretched over the widget
+    Values are reduced to at most one point per pixel of width,
+    so painting doesn't depend on the number of values
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values = []
+
+        self.setMinimumHeight(CHART_MIN_HEIGHT)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+    # Public interface methods
+
+    def set_values(self, values: list) -> None:
+        self.values = values
+        self.update()
+
+    # Qt widget interface
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        chart_rect = QRectF(self.rect()).adjusted(
+            CHART_PADDING, CHART_PADDING, -CHART_PADDING, -CHART_PADDING
+        )
+
+        painter.setPen(QPen(CHART_AXIS_COLOR, 1))
+        painter.drawLine(chart_rect.bottomLeft(), chart_rect.bottomRight())
+
+        if len(self.values) < 2:
+            return
+
+        values = self._reduce_values(max(int(chart_rect.width()), 2))
+        max_value = max(values) or 1
+        x_step = chart_rect.width() / (len(values) - 1)
+
+        line = QPolygonF(
+            [
+                QPointF(
+                    chart_rect.left() + index * x_step,
+                    chart_rect.bottom() - chart_rect.height() * value / max_value,
+                )
+                for index, value in enumerate(values)
+            ]
+        )
+
+        painter.setPen(QPen(CHART_LINE_COLOR, 2))
+        painter.drawPolyline(line)
+
+    # Private helper methods
+
+    def _reduce_values(self, points_count: int) -> list:
+        """Takes evenly spread values, always keeping the first and the last one"""
+        if len(self.values) <= points_count:
+            return self.values
+
+        last_index = len(self.values) - 1
+        return [
+            self.values[round(point * last_index / (points_count - 1))]
+            for point in range(points_count)
+        ]
+
+
+def _blend(start: int, end: int, ratio: float) -> float:
+    return start + (end - start) * ratio
@@ -2,8 +2,7 @@ from PyQt6.QtWidgets import (
     QComboBox,
     QHBoxLayout,
     QLabel,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QPushButton,
     QVBoxLayout,
     QWidget,
@@ -12,7 +11,13 @@ from PyQt6.QtCore import Qt
 
 from ...utils.logger import setup_logger
 from ...utils.constants import DEBUG_MODE
-from .history_time_entry import HistoryTimeEntry
+from .history_item_delegate import HistoryItemDelegate
+from .history_list_model import (
+    EMPTY_HISTORY_ROW,
+    SHOW_MORE_ROW,
+    HistoryListModel,
+    HistoryRow,
+)
 
 
 class TimeTrackingPanel(QWidget):
@@ -25,7 +30,7 @@ class TimeTrackingPanel(QWidget):
     def __init__(self, time_tracking_controller):
         super().__init__()
         self.controller = time_tracking_controller
-        self.logger = setup_logger()
+        self.logger = setup_logger("views")
         self.initUI()
 
     def initUI(self) -> None:
@@ -42,43 +47,66 @@ class TimeTrackingPanel(QWidget):
 
     # Public interface methods
 
+    def clear_history(self) -> None:
+        """Removes every row from the history list"""
+        self.history_model.clear()
+
     def show_empty_history_message(self) -> None:
         """Displays a message when no history time entries are in database"""
-        empty_list_message = QListWidgetItem(
-            "Currently there are no history time entries."
+        self.history_model.append_rows(
+            [
+                HistoryRow(
+                    EMPTY_HISTORY_ROW,
+                    "Currently there are no history time entries.",
+                    None,
+                    None,
+                    None,
+                )
+            ]
         )
-        empty_list_message.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
 
-        self.time_entries_history_list.addItem(empty_list_message)
+    def append_history_rows(self, rows: list) -> None:
+        """
+        Adds date and entry rows to the end of the history list
+        Rows are created with HistoryListModel.date_row and entry_row
+        """
+        self.history_model.append_rows(rows)
 
-    def create_history_time_entry(self, time_entry_data: dict) -> None:
+    def insert_history_time_entry_at_top(self, time_entry_data, date: str) -> None:
         """
-        Creates and adds a time entry to the history list
+        Adds the most recent entry to the beginning of the history list
+        Replaces the empty history message if it is displayed
         """
-        entry_widget = HistoryTimeEntry(time_entry_data)
-        list_item = entry_widget.list_item
+        if self.history_model.rowCount() > 0:
+            if self.history_model.row_kind(0) == EMPTY_HISTORY_ROW:
+                self.history_model.remove_rows(0)
 
-        entry_widget.setup_delete_action(
-            time_entry_data["id"], self.controller.delete_history_time_entry
+        self.history_model.insert_entry_at_top(
+            self.history_model.date_row(date, time_entry_data.day_key),
+            self.history_model.entry_row(time_entry_data),
         )
 
-        self.time_entries_history_list.addItem(list_item)
-        self.time_entries_history_list.setItemWidget(list_item, entry_widget)
-
-    def create_date_item_for_time_entries_history(self, date: str):
-        date_item = QListWidgetItem(date)
-        date_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.time_entries_history_list.addItem(date_item)
+    def remove_history_time_entry(self, entry_id: int) -> bool:
+        """
+        Removes an entry row and its date row if it was the last one of the day
+        Returns False if the entry isn't displayed
+        """
+        return self.history_model.remove_entry(entry_id)
 
     def display_show_more_entries_button(self) -> None:
-        show_more_button = QListWidgetItem("Show more")
-        show_more_button.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.history_model.append_rows(
+            [HistoryRow(SHOW_MORE_ROW, "Show more", None, None, None)]
+        )
 
-        show_more_button.setData(Qt.ItemDataRole.UserRole, "show_more_entries")
+    def remove_show_more_entries_button(self) -> None:
+        """Removes "Show more" button from the end of the history list"""
+        last_row = self.history_model.rowCount() - 1
 
-        self.time_entries_history_list.addItem(show_more_button)
+        if last_row < 0:
+            return
 
-        return show_more_button
+        if self.history_model.row_kind(last_row) == SHOW_MORE_ROW:
+            self.history_model.remove_rows(last_row)
 
     def refresh_activity_selector(self) -> None:
         self.activity_selector.clear()
@@ -91,7 +119,17 @@ class TimeTrackingPanel(QWidget):
             return
 
         for activity in activities:
-            self.activity_selector.addItem(activity["name"])
+            # The record is passed to the controller once tracking starts
+            self.activity_selector.addItem(activity.name, activity)
+
+    def select_activity(self, activity_id: int) -> None:
+        """Selects the activity with the given ID if it is in the selector"""
+        for index in range(self.activity_selector.count()):
+            activity = self.activity_selector.itemData(index)
+
+            if activity is not None and activity.id == activity_id:
+                self.activity_selector.setCurrentIndex(index)
+                return
 
     def update_timer_state(self, is_running: bool):
         """
@@ -110,31 +148,37 @@ class TimeTrackingPanel(QWidget):
 
     def handle_timer_toggle(self) -> None:
         """Handles the start/stop button click event"""
-        activity_name = self.activity_selector.currentText()
-        self.controller.handle_start_stop_button_clicked(activity_name)
+        activity = self.activity_selector.currentData()
+        self.controller.handle_start_stop_button_clicked(activity)
 
     # Private helper methods
 
     def _create_time_entries_history_list(self) -> QWidget:
-        """Creates a scrollable list view for displaying activity history"""
-        time_entries_list = QListWidget()
-        time_entries_list.itemClicked.connect(
-            self.controller.handle_time_entry_selection
+        """
+        Creates a scrollable list view for displaying activity history
+        Rows are painted by the delegate, only visible rows cost anything
+        """
+        self.history_model = HistoryListModel(self)
+        self.history_delegate = HistoryItemDelegate(self)
+        # Queued, so the row is removed after the view finishes handling the click
+        self.history_delegate.delete_requested.connect(
+            self.controller.delete_history_time_entry,
+            Qt.ConnectionType.QueuedConnection,
         )
+
+        time_entries_list = QListView()
+        time_entries_list.setModel(self.history_model)
+        time_entries_list.setItemDelegate(self.history_delegate)
+        time_entries_list.clicked.connect(self.controller.handle_history_row_click)
         time_entries_list.setVerticalScrollBarPolicy(
             Qt.ScrollBarPolicy.ScrollBarAlwaysOff
         )
+        # Lays out long histories in chunks without blocking the event loop
+        time_entries_list.setLayoutMode(QListView.LayoutMode.Batched)
         time_entries_list.setStyleSheet(
             """
-            QListWidget {
-                border: none;
-            }
-            QListWidget::item {
+            QListView {
                 border: none;
-                padding: 0px;
-            }
-            QListWidget::item:selected {
-                color: black;
             }
             """
         )
@@ -150,7 +194,8 @@ class TimeTrackingPanel(QWidget):
         control_panel.setContentsMargins(0, 0, 0, 0)
 
         self.activity_selector = QComboBox()
-        self.refresh_activity_selector()
+        # Enabled once activities are loaded
+        self.activity_selector.setDisabled(True)
         control_panel.addWidget(self.activity_selector, stretch=5)
 
         self.elapsed_time_display = QLabel("0:00:00")
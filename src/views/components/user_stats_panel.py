@@ -5,6 +5,7 @@ from PyQt6.QtWidgets import (
     QLineEdit,
     QListWidget,
     QListWidgetItem,
+    QPushButton,
     QSizePolicy,
     QToolButton,
     QVBoxLayout,
@@ -30,7 +31,7 @@ class UserStatsPanel(QWidget):
     def __init__(self, user_stats_controller):
         super().__init__()
         self.user_stats_controller = user_stats_controller
-        self.logger = setup_logger()
+        self.logger = setup_logger("views")
         self.initUI()
 
     def initUI(self) -> None:
@@ -53,8 +54,8 @@ class UserStatsPanel(QWidget):
             return
 
         for activity in activities:
-            item = QListWidgetItem(activity["name"])
-            item.setData(Qt.ItemDataRole.UserRole, {"activity_id": activity["id"]})
+            item = QListWidgetItem(activity.name)
+            item.setData(Qt.ItemDataRole.UserRole, {"activity_id": activity.id})
 
             self.activity_list.addItem(item)
 
@@ -142,9 +143,6 @@ class UserStatsPanel(QWidget):
             self.user_stats_controller.handle_delete_press_activity_list
         )
 
-        # Add activities from database if any
-        self.refresh_activity_list()
-
         # Item for adding new activities
         add_new_activity_item = QListWidgetItem("Add new activity")
         add_new_activity_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -288,8 +286,17 @@ class UserStatsPanel(QWidget):
         stats_widget = QWidget()
         stats_layout = QHBoxLayout(stats_widget)
 
+        # Opens the window with detailed statistics
+        statistics_button = QPushButton("Statistics")
+        statistics_button.clicked.connect(
+            self.user_stats_controller.handle_statistics_button_clicked
+        )
+
         # Add displays to layout
         stats_layout.addWidget(self.level_display)
         stats_layout.addWidget(self.xp_display)
+        stats_layout.addWidget(
+            statistics_button, alignment=Qt.AlignmentFlag.AlignBottom
+        )
 
         return stats_widget
@@ -1,34 +1,57 @@
+from time import perf_counter
+
 from PyQt6.QtWidgets import (
+    QApplication,
     QHBoxLayout,
+    QHeaderView,
     QLabel,
     QLineEdit,
     QMainWindow,
     QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
     QVBoxLayout,
     QWidget,
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
+
+from ..utils.instrumentation import metrics
+from ..utils.process_stats import get_rss_mb
+
+# How often the performance view is refreshed
+PERFORMANCE_REFRESH_INTERVAL_MS = 1000
+# Interval of the timer measuring event loop lag
+EVENT_LOOP_PROBE_INTERVAL_MS = 50
+
+DATABASE_METRICS_PREFIX = "Database."
+LATENCY_TABLE_HEADERS = ["Method", "Calls", "p50 ms", "p95 ms", "p99 ms"]
 
 
 class DebugWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.app_window = None
 
     def initUI(self) -> None:
         self.setWindowTitle("Debug")
-        self.setGeometry(0, 0, 300, 300)
+        self.setGeometry(0, 0, 500, 600)
 
         central_widget = QWidget()
         self.window_layout = QVBoxLayout(central_widget)
         self.window_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
 
         self._create_timer_debuger()
+        self._create_performance_view()
 
         self.setCentralWidget(central_widget)
 
     def initialize_model_access(self, time_tracking_model):
         self.time_tracking_model = time_tracking_model
 
+    def initialize_window_access(self, app_window):
+        """Gives the performance view access to the widgets of the main window"""
+        self.app_window = app_window
+
     def _create_timer_debuger(self):
         label = QLabel("Timer debugger:")
 
@@ -47,6 +70,117 @@ class DebugWindow(QMainWindow):
         self.window_layout.addWidget(label)
         self.window_layout.addWidget(input_with_button_widget)
 
+    def _create_performance_view(self):
+        """
+        Creates live view of collected metrics and process statistics,
+        refreshed every PERFORMANCE_REFRESH_INTERVAL_MS
+        """
+        # The view has nothing to show without collected metrics
+        metrics.enable()
+
+        label = QLabel("Performance:")
+        self.performance_summary_label = QLabel()
+
+        self.latency_table = QTableWidget(0, len(LATENCY_TABLE_HEADERS))
+        self.latency_table.setHorizontalHeaderLabels(LATENCY_TABLE_HEADERS)
+        self.latency_table.verticalHeader().setVisible(False)
+        self.latency_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.latency_table.horizontalHeader().setSectionResizeMode(
+            0, QHeaderView.ResizeMode.Stretch
+        )
+
+        self.window_layout.addWidget(label)
+        self.window_layout.addWidget(self.performance_summary_label)
+        self.window_layout.addWidget(self.latency_table)
+
+        self.last_refresh_time = perf_counter()
+        self.last_database_calls = metrics.total_calls(DATABASE_METRICS_PREFIX)
+
+        # A timeout arriving later than its interval means
+        # the event loop was blocked for the difference
+        self.max_event_loop_lag_ms = 0.0
+        self.last_probe_time = perf_counter()
+        self.event_loop_probe = QTimer(self)
+        self.event_loop_probe.timeout.connect(self.handle_event_loop_probe)
+        self.event_loop_probe.start(EVENT_LOOP_PROBE_INTERVAL_MS)
+
+        self.performance_timer = QTimer(self)
+        self.performance_timer.timeout.connect(self.refresh_performance_view)
+        self.performance_timer.start(PERFORMANCE_REFRESH_INTERVAL_MS)
+
+        self.refresh_performance_view()
+
+    def handle_event_loop_probe(self):
+        now = perf_counter()
+        lag_ms = (now - self.last_probe_time) * 1000 - EVENT_LOOP_PROBE_INTERVAL_MS
+        self.max_event_loop_lag_ms = max(self.max_event_loop_lag_ms, lag_ms)
+        self.last_probe_time = now
+
+    def refresh_performance_view(self):
+        now = perf_counter()
+        elapsed_seconds = now - self.last_refresh_time
+        database_calls = metrics.total_calls(DATABASE_METRICS_PREFIX)
+
+        queries_per_second = (
+            (database_calls - self.last_database_calls) / elapsed_seconds
+            if elapsed_seconds > 0
+            else 0.0
+        )
+
+        self.last_refresh_time = now
+        self.last_database_calls = database_calls
+
+        rss_mb = get_rss_mb()
+        summary_lines = [
+            f"Database queries/s: {queries_per_second:.1f}",
+            f"Max event loop lag: {self.max_event_loop_lag_ms:.1f} ms",
+            f"RSS memory: {f'{rss_mb:.1f} MB' if rss_mb is not None else 'n/a'}",
+            f"Live widgets: {len(QApplication.allWidgets())}",
+        ]
+        summary_lines.extend(self._get_history_summary())
+
+        self.performance_summary_label.setText("\n".join(summary_lines))
+        self.max_event_loop_lag_ms = 0.0
+
+        self._refresh_latency_table()
+
+    def _get_history_summary(self) -> list:
+        """
+        History is displayed by a single list view,
+        so its size is the number of rows in the history model
+        """
+        time_tracking_panel = getattr(self.app_window, "time_tracking_panel", None)
+
+        if time_tracking_panel is None:
+            return []
+
+        history_model = time_tracking_panel.history_model
+        return [
+            f"History rows: {history_model.rowCount()}"
+            f" ({history_model.entry_count} entries)"
+        ]
+
+    def _refresh_latency_table(self):
+        database_metrics = sorted(
+            (name, stats)
+            for name, stats in metrics.snapshot().items()
+            if name.startswith(DATABASE_METRICS_PREFIX)
+        )
+
+        self.latency_table.setRowCount(len(database_metrics))
+
+        for row, (name, stats) in enumerate(database_metrics):
+            cells = [
+                name[len(DATABASE_METRICS_PREFIX) :],
+                str(stats["calls"]),
+                f"{stats['p50_ms']:.2f}",
+                f"{stats['p95_ms']:.2f}",
+                f"{stats['p99_ms']:.2f}",
+            ]
+
+            for column, text in enumerate(cells):
+                self.latency_table.setItem(row, column, QTableWidgetItem(text))
+
     def handle_button_click(self):
         seconds = int(self.seconds_input.text())
 
@@ -1,9 +1,11 @@
 from PyQt6.QtWidgets import QWidget, QMessageBox, QMainWindow, QHBoxLayout
 from PyQt6.QtCore import QSize, pyqtSignal
 
+from ..utils.constants import OPEN_ENTRY_CLOSE, OPEN_ENTRY_DISCARD, OPEN_ENTRY_RESUME
 from ..utils.logger import setup_logger
 from .components.time_tracking_panel import TimeTrackingPanel
 from .components.user_stats_panel import UserStatsPanel
+from .statistics_window import StatisticsWindow
 
 
 class ApplicationWindow(QMainWindow):
@@ -14,10 +16,13 @@ class ApplicationWindow(QMainWindow):
     # Initialize
 
     ui_initialized = pyqtSignal()
+    # Emitted once the window is painted for the first time
+    first_painted = pyqtSignal()
 
     def __init__(self):
         super().__init__()
-        self.logger = setup_logger()
+        self.logger = setup_logger("views")
+        self.is_painted = False
 
     def initUI(self) -> None:
         """Initializes and arranges all UI components"""
@@ -33,14 +38,19 @@ class ApplicationWindow(QMainWindow):
         self.ui_initialized.emit()
 
     def register_controllers(
-        self, time_tracking_controller, user_stats_controller
+        self, time_tracking_controller, user_stats_controller, statistics_controller
     ) -> None:
         """Links the window with its corresponding controllers"""
         self.time_tracking_controller = time_tracking_controller
         self.user_stats_controller = user_stats_controller
+        self.statistics_controller = statistics_controller
 
     # Public interface methods
 
+    def create_statistics_window(self) -> StatisticsWindow:
+        """Statistics window is only created once it is opened"""
+        return StatisticsWindow(self.statistics_controller, self)
+
     def display_error_message(self, message: str) -> None:
         """Shows an error popup with the specified message"""
         QMessageBox.warning(self, "Error", message)
@@ -55,6 +65,59 @@ class ApplicationWindow(QMainWindow):
         else:
             return False
 
+    def ask_open_time_entry_action(
+        self, activity_name: str, started_at: str, saved_duration: str, can_resume: bool
+    ) -> str:
+        """
+        Asks what to do with a time entry left open by a previous run
+        saved_duration is the tracked time kept if the entry is stopped
+        Returns OPEN_ENTRY_RESUME, OPEN_ENTRY_CLOSE or OPEN_ENTRY_DISCARD,
+        closing the popup keeps the tracked time (OPEN_ENTRY_CLOSE)
+        """
+        message_box = QMessageBox(self)
+        message_box.setIcon(QMessageBox.Icon.Question)
+        message_box.setWindowTitle("Unfinished Time Entry")
+        message_box.setText(
+            f"{activity_name} was started on {started_at} and was never stopped"
+        )
+        message_box.setInformativeText(
+            f"Tracked time saved before that: {saved_duration}\n"
+            "Resuming continues from the saved time, "
+            "time since then isn't counted"
+        )
+
+        actions = {}
+
+        if can_resume:
+            resume_button = message_box.addButton(
+                "Resume", QMessageBox.ButtonRole.AcceptRole
+            )
+            actions[resume_button] = OPEN_ENTRY_RESUME
+
+        close_button = message_box.addButton(
+            "Stop and save", QMessageBox.ButtonRole.ApplyRole
+        )
+        actions[close_button] = OPEN_ENTRY_CLOSE
+
+        discard_button = message_box.addButton(
+            "Discard", QMessageBox.ButtonRole.DestructiveRole
+        )
+        actions[discard_button] = OPEN_ENTRY_DISCARD
+
+        message_box.setEscapeButton(close_button)
+        message_box.exec()
+
+        return actions.get(message_box.clickedButton(), OPEN_ENTRY_CLOSE)
+
+    # Event handlers
+
+    def paintEvent(self, event) -> None:
+        super().paintEvent(event)
+
+        if not self.is_painted:
+            self.is_painted = True
+            self.first_painted.emit()
+
     # Private helper methods (with _prefix)
 
     def _create_main_window(self) -> QHBoxLayout:
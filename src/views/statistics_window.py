@@ -0,0 +1,191 @@
+from PyQt6.QtWidgets import (
+    QAbstractItemView,
+    QGridLayout,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+from PyQt6.QtCore import Qt
+
+from ..utils.logger import setup_logger
+from .components.statistics_charts import HeatmapWidget, LineChartWidget
+
+ACTIVITY_TABLE_HEADERS = ["Activity", "Time", "Sessions", "XP"]
+
+
+class StatisticsWindow(QWidget):
+    """
+    Window with user's statistics:
+    totals and streaks, time per activity,
+    daily and weekly heatmaps and XP earned over time
+    """
+
+    # Initialize
+
+    def __init__(self, statistics_controller, parent=None):
+        # Separate window, closed together with its parent
+        super().__init__(parent, Qt.WindowType.Window)
+        self.statistics_controller = statistics_controller
+        self.logger = setup_logger("views")
+        self.initUI()
+
+    def initUI(self) -> None:
+        """Sets up the complete statistics window interface"""
+        self.setWindowTitle("Statistics")
+        self.setGeometry(0, 0, 520, 640)
+
+        self.window_layout = QVBoxLayout(self)
+
+        self.status_label = QLabel("")
+        self.window_layout.addWidget(self.status_label)
+
+        self.window_layout.addWidget(self._create_summary_section())
+        self.window_layout.addWidget(self._create_activity_section(), stretch=1)
+        self.window_layout.addWidget(self._create_heatmap_section())
+        self.window_layout.addWidget(self._create_xp_section(), stretch=1)
+
+    # Public interface methods
+
+    def display_loading(self, is_loading: bool) -> None:
+        self.status_label.setText("Loading statistics..." if is_loading else "")
+
+    def display_error(self, message: str) -> None:
+        """Shown in place of the loading status, until the next load starts"""
+        self.status_label.setText(message)
+
+    def display_summary(
+        self,
+        total_time: str,
+        total_sessions: int,
+        total_xp: int,
+        current_streak: int,
+        longest_streak: int,
+    ) -> None:
+        self.total_time_display.setText(f"Total time: {total_time}")
+        self.total_sessions_display.setText(f"Sessions: {total_sessions}")
+        self.total_xp_display.setText(f"Total XP: {total_xp}")
+        self.current_streak_display.setText(
+            f"Current streak: {self._format_days(current_streak)}"
+        )
+        self.longest_streak_display.setText(
+            f"Longest streak: {self._format_days(longest_streak)}"
+        )
+
+    def display_activity_totals(self, rows: list) -> None:
+        """
+        Args:
+            rows: (activity name, time, sessions, XP) tuples
+        """
+        self.activity_table.setRowCount(len(rows))
+
+        for row_index, row in enumerate(rows):
+            for column_index, value in enumerate(row):
+                item = QTableWidgetItem(str(value))
+
+                if column_index > 0:
+                    item.setTextAlignment(
+                        Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+                    )
+
+                self.activity_table.setItem(row_index, column_index, item)
+
+    def display_heatmaps(
+        self, daily_columns: list, weekly_values: list, period: str
+    ) -> None:
+        """
+        Args:
+            daily_columns: Tracked seconds of every week from Monday to Sunday
+            weekly_values: Tracked seconds of the same weeks
+            period: Text describing the displayed weeks
+        """
+        self.heatmap_label.setText(f"Tracked time per day and week ({period}):")
+        self.daily_heatmap.set_columns(daily_columns)
+        self.weekly_heatmap.set_columns([[value] for value in weekly_values])
+
+    def display_xp_over_time(self, values: list, period: str) -> None:
+        self.xp_label.setText(
+            f"XP over time ({period}):" if period else "XP over time:"
+        )
+        self.xp_chart.set_values(values)
+
+    # Private helper methods (with _prefix)
+
+    @staticmethod
+    def _format_days(days_count: int) -> str:
+        return f"{days_count} day" if days_count == 1 else f"{days_count} days"
+
+    def _create_summary_section(self) -> QWidget:
+        section = QWidget()
+        layout = QGridLayout(section)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.total_time_display = QLabel("")
+        self.total_sessions_display = QLabel("")
+        self.total_xp_display = QLabel("")
+        self.current_streak_display = QLabel("")
+        self.longest_streak_display = QLabel("")
+
+        layout.addWidget(self.total_time_display, 0, 0)
+        layout.addWidget(self.total_sessions_display, 0, 1)
+        layout.addWidget(self.total_xp_display, 0, 2)
+        layout.addWidget(self.current_streak_display, 1, 0)
+        layout.addWidget(self.longest_streak_display, 1, 1)
+
+        return section
+
+    def _create_activity_section(self) -> QWidget:
+        section = QWidget()
+        layout = QVBoxLayout(section)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        layout.addWidget(QLabel("Time per activity:"))
+
+        self.activity_table = QTableWidget(0, len(ACTIVITY_TABLE_HEADERS))
+        self.activity_table.setHorizontalHeaderLabels(ACTIVITY_TABLE_HEADERS)
+        self.activity_table.verticalHeader().setVisible(False)
+        self.activity_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.NoEditTriggers
+        )
+        self.activity_table.horizontalHeader().setSectionResizeMode(
+            0, QHeaderView.ResizeMode.Stretch
+        )
+        layout.addWidget(self.activity_table)
+
+        return section
+
+    def _create_heatmap_section(self) -> QWidget:
+        section = QWidget()
+        layout = QVBoxLayout(section)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.heatmap_label = QLabel("Tracked time per day and week:")
+        layout.addWidget(self.heatmap_label)
+
+        # Weeks are columns, days of the week are rows
+        self.daily_heatmap = HeatmapWidget(rows_count=7)
+        self.weekly_heatmap = HeatmapWidget(rows_count=1)
+
+        for heatmap in (self.daily_heatmap, self.weekly_heatmap):
+            heatmap_row = QHBoxLayout()
+            heatmap_row.addWidget(heatmap)
+            heatmap_row.addStretch()
+            layout.addLayout(heatmap_row)
+
+        return section
+
+    def _create_xp_section(self) -> QWidget:
+        section = QWidget()
+        layout = QVBoxLayout(section)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.xp_label = QLabel("XP over time:")
+        self.xp_chart = LineChartWidget()
+
+        layout.addWidget(self.xp_label)
+        layout.addWidget(self.xp_chart)
+
+        return section